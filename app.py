@@ -1,30 +1,121 @@
 import os
-import requests
+import functools
+import logging
 import pandas as pd
 import dash
+import flask
 import dash_bootstrap_components as dbc
-from dash import Dash, html, dcc
-import plotly.express as px
-from pathlib import Path
-from typing import Tuple, Optional
-from dash.dependencies import Input, Output
+from dash import html, dcc
+from dash.dependencies import ClientsideFunction, Input, Output, State
 from dash.exceptions import PreventUpdate
 
+from src.data.columnar import load_table, load_trends
+from src.data.loader import run_concurrently
+from src.data.partitions import PartitionStore
+from src.features.efficiency import EfficiencyMatrix
+from src.features.simulator import RATIO_GRID, SalarySimulator
+from src.features.attendance import AttendanceCube, season_options, team_options
+from src.features.leaderboard import (
+    LEAGUES,
+    PLAYER_COLUMNS,
+    LeaderboardIndex,
+    encode_stat_arrays,
+)
+from src.features.stats_cube import NORMALIZATIONS, normalized
+from src.features.trends import (
+    ALL_GAME_TYPES,
+    ALL_VENUES,
+    LEAGUE,
+    VENUES,
+    AttendanceTrends,
+)
+from src.visualization.figure_cache import DEFAULT_PATH, FigureCache, data_version
+from src.web.api import make_api
+from src.web.metrics import DEFAULT_DIR, Metrics, figure_cache_collector
+
+logger = logging.getLogger(__name__)
+if __name__ == "__main__":
+    # run as a script; under gunicorn, gunicorn.conf.py configures logging
+    from src.web.log import configure_logging
+
+    configure_logging()
+
 ########################################################
 # LOAD DATA
 ########################################################
 
 #dirname = os.path.dirname(__file__)
 #path = os.path.join(dirname, "data/")
-data_nba_wnba = pd.read_csv("data/statspergame_salary_wnba_nba_2019.csv")
-league_rev = pd.read_csv("data/league_revenue.csv")
-wnba_attendance_df = pd.read_csv("data/wnba_attendance.csv")
+data_files = [
+    "data/statspergame_salary_wnba_nba_2019.csv",
+    "data/stats_cube_wnba_nba_2019.csv",
+    "data/league_revenue.csv",
+    "data/wnba_attendance.csv",
+]
+# player stats/salaries, their stats cube and revenue by league and season,
+# loaded when asked
+partitions = PartitionStore(
+    max_partitions=int(os.environ.get("MAX_PARTITIONS", 16))
+)
+player_seasons = partitions.seasons("players")
+if not player_seasons:
+    raise RuntimeError(
+        f"no player partitions in {partitions.root}; build the data store "
+        "with `make store` (python -m src.data.columnar)"
+    )
+default_player_season = player_seasons[-1]
+
+# "memory" serves the leaderboard and attendance from frames held by each
+# worker, "sqlite" queries the indexed store of src/data/sqlstore.py
+data_backend = os.environ.get("DATA_BACKEND", "memory")
 
-# create a new attendance dataframe with only the 2019 season
-season_2019_df = wnba_attendance_df[wnba_attendance_df.season.isin([2019])]
-season_2019_df = season_2019_df.loc[
-    (season_2019_df["team"] != "Team Wilson")
-].sort_values(by="team")
+# The startup reads are independent, so they overlap in a thread pool:
+# the attendance table (memory-mapped from data/store when built, shared
+# by all workers), its trend table, the data version hash and the default
+# season partitions
+startup = run_concurrently(
+    {
+        "wnba_attendance": (
+            (lambda: None) if data_backend == "sqlite"
+            else lambda: load_table("wnba_attendance")
+        ),
+        "attendance_trends": load_trends,
+        "data_version": lambda: data_version(*data_files),
+        **{
+            f"{table}/{league}": functools.partial(
+                partitions.get, table, league, default_player_season
+            )
+            for table in ("players", "stats_cube", "revenue")
+            for league in partitions.leagues(table)
+        },
+    },
+    label="startup inputs",
+)
+wnba_attendance_df = startup["wnba_attendance"]
+
+# Figures shared by all workers, keyed on callback inputs + data version
+figure_cache = FigureCache(
+    path=os.environ.get("FIGURE_CACHE_PATH", DEFAULT_PATH),
+    max_entries=int(os.environ.get("FIGURE_CACHE_ENTRIES", 256)),
+    version=startup["data_version"],
+)
+
+if data_backend == "sqlite":
+    from src.data.sqlstore import DEFAULT_URL as SQL_STORE_URL, SqlBackend
+
+    sql_backend = SqlBackend(
+        os.environ.get("SQL_STORE_URL", SQL_STORE_URL),
+        pool_size=int(os.environ.get("SQL_POOL_SIZE", 5)),
+    )
+    # same interface as the cube, queried per selection
+    attendance = sql_backend.attendance
+else:
+    # attendance of every season, pre-sliced by (season, team)
+    attendance = AttendanceCube(wnba_attendance_df)
+default_season = 2019
+# attendance series of every team and season, precomputed per data version
+# in data/store/attendance_trends
+trends = AttendanceTrends(startup["attendance_trends"])
 
 
 ## MODIFY NUMBER FORMAT
@@ -86,26 +177,228 @@ drop_stats = dcc.Dropdown(
     style={"margin": "4px", "box-shadow": "0px 0px #ebb36a", "border-color": "#ebb36a"},
 )
 
+stat_names = [option["value"] for option in drop_stats.options]
+league_names = {0: ["WNBA"], 1: ["NBA"], 2: ["WNBA", "NBA"]}
+
+# How the leaderboard stats are normalized, read from the stats cube
+radio_norm = dbc.RadioItems(
+    id="radio_norm",
+    className="radio",
+    options=[dict(label=label, value=norm) for norm, label in NORMALIZATIONS.items()],
+    value="per_game",
+    inline=True,
+)
+
+
+# Sorted order of every stat for a league, season and normalization, built
+# on first use; the lru_cache bounds how many seasons stay indexed. The
+# normalized stats are columns of the stats cube partition, precomputed
+# by the pipeline, swapped in for the per-game ones.
+@functools.lru_cache(maxsize=16)
+def leaderboard_for(league, season, norm="per_game"):
+    players = partitions.get("players", league, season)
+    if norm != "per_game" or partitions.has("stats_cube", league, season):
+        cube = partitions.get("stats_cube", league, season)
+        players = players.assign(**normalized(cube, stat_names, norm))
+    return LeaderboardIndex(players, stat_names)
+
+
+def leaderboard_leagues(leagues, season, norm="per_game"):
+    # leagues without the season (or its stats cube) are left out
+    tables = ["players"] if norm == "per_game" else ["players", "stats_cube"]
+    return [
+        league
+        for league in leagues
+        if all(partitions.has(table, league, season) for table in tables)
+    ]
+
+
+def top_players(leagues, stat, season, n=10, norm="per_game"):
+    # the SQLite store holds the per-game table only
+    if data_backend == "sqlite" and norm == "per_game":
+        return sql_backend.top_players(leagues, stat, season, n)
+    frames = [
+        leaderboard_for(league, season, norm).top(league, stat, n)
+        for league in leaderboard_leagues(leagues, season, norm)
+    ]
+    if not frames:
+        return pd.DataFrame(columns=PLAYER_COLUMNS + [stat])
+    return pd.concat(frames, ignore_index=True)
+
+
+# Pay against production of every player and stat of a season, both
+# leagues at once
+@functools.lru_cache(maxsize=16)
+def efficiency_for(season):
+    return EfficiencyMatrix(
+        pd.concat(
+            [
+                partitions.get("players", league, season)
+                for league in partitions.leagues("players")
+                if partitions.has("players", league, season)
+            ],
+            ignore_index=True,
+        ),
+        stat_names,
+    )
+
+
+# Drop down menu for player season
+drop_player_season = dcc.Dropdown(
+    id="drop_player_season",
+    clearable=False,
+    searchable=False,
+    options=season_options(player_seasons),
+    value=default_player_season,
+    style={"margin": "4px", "box-shadow": "0px 0px #ebb36a", "border-color": "#ebb36a"},
+)
+
+# "clientside" ships the stat arrays once and ranks players in the browser
+# (assets/leaderboard.js), "server" answers every change with a callback.
+# The clientside arrays hold every player season and normalization, so the
+# season and normalization selectors work in both modes.
+leaderboard_mode = os.environ.get("LEADERBOARD_MODE", "server")
+stat_arrays = dcc.Store(id="stat_arrays")
+if leaderboard_mode == "clientside":
+    from src.visualization.figures import TEMPLATE
+
+    def leaderboard_arrays(season, norm):
+        frames = [
+            leaderboard_for(league, season, norm).df
+            for league in leaderboard_leagues(LEAGUES, season, norm)
+        ]
+        if not frames:
+            frames = [pd.DataFrame(columns=PLAYER_COLUMNS + stat_names)]
+        players = pd.concat(frames, ignore_index=True)
+        return encode_stat_arrays(players, stat_names)["leagues"]
+
+    stat_arrays.data = {
+        "stats": stat_names,
+        "norm_labels": NORMALIZATIONS,
+        "template": TEMPLATE.to_plotly_json(),
+        "seasons": {
+            season: {
+                norm: leaderboard_arrays(season, norm)
+                for norm in NORMALIZATIONS
+            }
+            for season in player_seasons
+        },
+    }
+
+# WNBA salaries under another revenue share, precomputed over RATIO_GRID
+@functools.lru_cache(maxsize=16)
+def simulator_for(season):
+    if not all(
+        partitions.has(table, league, season)
+        for table in ("players", "revenue")
+        for league in ("WNBA", "NBA")
+    ):
+        return None
+    revenue = partitions.get("revenue", "WNBA", season)
+    return SalarySimulator(
+        partitions.get("players", "WNBA", season),
+        partitions.get("players", "NBA", season),
+        revenue["total_year_revenue"][0],
+        stat_names,
+    )
+
+
+def league_revenue(league, season):
+    """ (revenue, share ratio) of a league and season. """
+    revenue = partitions.get("revenue", league, season)
+    return revenue["total_year_revenue"][0], revenue["revenue_share_ratio"][0]
+
+
+wnba_revenue, wnba_ratio = league_revenue("WNBA", default_player_season)
+nba_ratio = league_revenue("NBA", default_player_season)[1]
+
+# Simulator controls: what each player's share is based on, the share ratio
+# and the revenue in millions
+drop_basis = dcc.Dropdown(
+    id="drop_basis",
+    clearable=False,
+    searchable=False,
+    options=[{"value": "salary", "label": "Current salary"}] + drop_stats.options,
+    value="salary",
+    style={"margin": "4px", "box-shadow": "0px 0px #ebb36a", "border-color": "#ebb36a"},
+)
+slider_ratio = dcc.Slider(
+    id="slider_ratio",
+    min=float(RATIO_GRID[0]),
+    max=float(RATIO_GRID[-1]),
+    step=float(RATIO_GRID[1] - RATIO_GRID[0]),
+    value=float(wnba_ratio),
+    marks={
+        float(RATIO_GRID[0]): "5%",
+        float(wnba_ratio): "WNBA",
+        float(nba_ratio): "NBA",
+        float(RATIO_GRID[-1]): "60%",
+    },
+    updatemode="drag",
+)
+slider_revenue = dcc.Slider(
+    id="slider_revenue",
+    min=20,
+    max=500,
+    step=5,
+    value=float(wnba_revenue) / 1e6,
+    marks={20: "$20M", 100: "$100M", 250: "$250M", 500: "$500M"},
+    updatemode="drag",
+)
+
+# Drop down menu for attendance season
+drop_season = dcc.Dropdown(
+    id="drop_season",
+    clearable=False,
+    searchable=False,
+    options=season_options(attendance.seasons),
+    value=default_season,
+    style={"width": "50%"},
+)
+
 # Drop down menu for attendance
 drop_attendance = dcc.Dropdown(
     id="drop_attendance",
-    clearable=False,
     searchable=False,
+    options=team_options(attendance.teams(default_season)),
+    placeholder="All teams",
+    style={"width": "50%"},
+)
+
+# With no team selected: one bar per team (attendance.overview), or every
+# game of the season
+radio_attendance_view = dbc.RadioItems(
+    id="radio_attendance_view",
+    className="radio",
     options=[
-        {"label": "Atlanta Dream", "value": "Atlanta Dream"},
-        {"label": "Chicago Sky", "value": "Chicago Sky"},
-        {"label": "Connecticut Sun", "value": "Connecticut Sun"},
-        {"label": "Dallas Wings", "value": "Dallas Wings"},
-        {"label": "Indiana Fever", "value": "Indiana Fever"},
-        {"label": "Las Vegas Aces", "value": "Las Vegas Aces"},
-        {"label": "Los Angeles Sparks", "value": "Los Angeles Sparks"},
-        {"label": "Minnesota Lynx", "value": "Minnesota Lynx"},
-        {"label": "New York Liberty", "value": "New York Liberty"},
-        {"label": "Phoenix Mercury", "value": "Phoenix Mercury"},
-        {"label": "Seattle Storm", "value": "Seattle Storm"},
-        {"label": "Washington Mystics", "value": "Washington Mystics"},
+        dict(label="Team summary", value="summary"),
+        dict(label="Every game", value="games"),
     ],
-    placeholder="Select A Team",
+    value="summary",
+    inline=True,
+)
+
+# Controls of the attendance trend chart
+drop_trend_team = dcc.Dropdown(
+    id="drop_trend_team",
+    clearable=False,
+    options=team_options(trends.teams),
+    value=LEAGUE,
+    style={"width": "50%"},
+)
+radio_trend_venue = dbc.RadioItems(
+    id="radio_trend_venue",
+    className="radio",
+    options=[dict(label=label, value=venue) for venue, label in VENUES.items()],
+    value=ALL_VENUES,
+    inline=True,
+)
+drop_trend_game_type = dcc.Dropdown(
+    id="drop_trend_game_type",
+    clearable=False,
+    searchable=False,
+    options=[dict(label=t, value=t) for t in trends.game_types],
+    value=ALL_GAME_TYPES,
     style={"width": "50%"},
 )
 
@@ -129,7 +422,7 @@ def Header(name, app):
             """
         ),
         html.P(
-            "Note: Data presented here corresponds to 2019 season.",
+            "Note: Player data presented here corresponds to the selected season.",
             style={"font-size": 12, "font-style": "italic"},
         ),
     ]
@@ -148,17 +441,36 @@ def Header(name, app):
 
 
 # Start the app
-app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
+# compress=True gzip/brotli-encodes responses, callback JSON included
+app = dash.Dash(
+    __name__, external_stylesheets=[dbc.themes.BOOTSTRAP], compress=True
+)
 server = app.server
 
+# Per-callback latency/payload histograms, served on /metrics
+metrics = Metrics(shared_dir=os.environ.get("METRICS_DIR", DEFAULT_DIR))
+metrics.add_collector(figure_cache_collector(figure_cache))
+metrics.instrument(app)
+
+def revenue_cards(season):
+    """ Revenue and share ratio of each league for the cards. """
+    values = []
+    for league in ("WNBA", "NBA"):
+        if partitions.has("revenue", league, season):
+            revenue = partitions.get("revenue", league, season)
+            values.append(human_format(revenue["total_year_revenue"][0]))
+            values.append(revenue["revenue_share_ratio"][0])
+        else:
+            values += ["n/a", "n/a"]
+    return values
+
+
 # Card components
+card_values = revenue_cards(default_player_season)
 cards = [
     dbc.Card(
         [
-            html.H2(
-                human_format(league_rev["total_year_revenue"][0]),
-                className="card-title",
-            ),
+            html.H2(card_values[0], id="wnba_revenue", className="card-title"),
             html.P("WNBA Total Revenue", className="card-text"),
         ],
         body=True,
@@ -168,7 +480,7 @@ cards = [
     ),
     dbc.Card(
         [
-            html.H2(league_rev["revenue_share_ratio"][0], className="card-title"),
+            html.H2(card_values[1], id="wnba_ratio", className="card-title"),
             html.P("WNBA Share Ratio to Players Salaries", className="card-text"),
         ],
         body=True,
@@ -178,10 +490,7 @@ cards = [
     ),
     dbc.Card(
         [
-            html.H2(
-                human_format(league_rev["total_year_revenue"][1]),
-                className="card-title",
-            ),
+            html.H2(card_values[2], id="nba_revenue", className="card-title"),
             html.P("NBA Total Revenue", className="card-text"),
         ],
         body=True,
@@ -191,7 +500,7 @@ cards = [
     ),
     dbc.Card(
         [
-            html.H2(league_rev["revenue_share_ratio"][1], className="card-title"),
+            html.H2(card_values[3], id="nba_ratio", className="card-title"),
             html.P("NBA Share Ratio to Players Salaries", className="card-text"),
         ],
         body=True,
@@ -201,7 +510,6 @@ cards = [
     ),
 ]
 
-
 app.layout = dbc.Container(
     [
         Header("WNBA/NBA Salary Gap", app),
@@ -226,6 +534,16 @@ app.layout = dbc.Container(
                         [
                             html.Label("Choose stat: "),
                             drop_stats,
+                            radio_norm,
+                        ],
+                        className="box",
+                    )
+                ),
+                dbc.Col(
+                    html.Div(
+                        [
+                            html.Label("Choose season: "),
+                            drop_player_season,
                         ],
                         className="box",
                     )
@@ -250,17 +568,74 @@ app.layout = dbc.Container(
                 ),
             ]
         ),
+        dbc.Row(
+            [
+                html.H3("Pay vs Production"),
+                html.P(
+                    "Each player's percentile of the chosen stat within their "
+                    "league against their salary percentile. Players below the "
+                    "line are paid less than their production ranks.",
+                    style={"font-size": 12, "font-style": "italic"},
+                ),
+                dcc.Graph(id="efficiency"),
+            ]
+        ),
         html.Hr(),
         dbc.Row(
             [
-                html.H3("2019 WNBA Attendance"),
+                html.H3("Revenue Share What-If"),
+                html.P(
+                    "The WNBA salary pool for a share ratio and revenue, split "
+                    "over the players in proportion to the chosen basis, next "
+                    "to the NBA salary at the same percentile.",
+                    style={"font-size": 12, "font-style": "italic"},
+                ),
             ]
         ),
+        dbc.Row(
+            [
+                dbc.Col(
+                    html.Div(
+                        [html.Label("Split the pool by: "), drop_basis],
+                        className="box",
+                    )
+                ),
+                dbc.Col(
+                    html.Div(
+                        [html.Label("WNBA share ratio: "), slider_ratio],
+                        className="box",
+                    )
+                ),
+                dbc.Col(
+                    html.Div(
+                        [html.Label("WNBA revenue: "), slider_revenue],
+                        className="box",
+                    )
+                ),
+            ]
+        ),
+        dbc.Row(html.Div([dcc.Graph(id="simulator")])),
+        html.Hr(),
+        dbc.Row(
+            [
+                html.H3("WNBA Attendance"),
+            ]
+        ),
+        dbc.Row(
+            html.Div(
+                [
+                    html.Label("Choose season: "),
+                    drop_season,
+                ],
+                className="box",
+            )
+        ),
         dbc.Row(
             html.Div(
                 [
                     html.Label("Choose team: "),
                     drop_attendance,
+                    radio_attendance_view,
                 ],
                 className="box",
             )
@@ -271,8 +646,38 @@ app.layout = dbc.Container(
                     dcc.Graph(id="games"),
                 ]
             )
-        )
-
+        ),
+        html.Hr(),
+        dbc.Row(
+            [
+                html.H3("WNBA Attendance Trends"),
+            ]
+        ),
+        dbc.Row(
+            [
+                dbc.Col(
+                    html.Div(
+                        [
+                            html.Label("Choose team: "),
+                            drop_trend_team,
+                            radio_trend_venue,
+                        ],
+                        className="box",
+                    )
+                ),
+                dbc.Col(
+                    html.Div(
+                        [
+                            html.Label("Choose games: "),
+                            drop_trend_game_type,
+                        ],
+                        className="box",
+                    )
+                ),
+            ]
+        ),
+        dbc.Row(html.Div([dcc.Graph(id="trends")])),
+        stat_arrays,
     ],
     fluid=False,
 )
@@ -280,172 +685,244 @@ app.layout = dbc.Container(
 ########################################################
 # CALLBACKS
 ########################################################
+@metrics.timed_callback
+@figure_cache.memoize("top10players_bystat")
+def top10players_bystat(league_val, stat, season=default_player_season,
+                        norm="per_game"):
+    # imported on first use so workers start without plotly.graph_objects
+    from src.visualization.figures import leaderboard_figures
+
+    # Top 10 players of the chosen league(s) from the precomputed index
+    with metrics.phase("top10players_bystat", "filter_sort"):
+        df = top_players(league_names[league_val], stat, season, 10, norm)
+
+    with metrics.phase("top10players_bystat", "figure_build"):
+        label = stat if norm == "per_game" else f"{stat} ({NORMALIZATIONS[norm]})"
+        fig_stat, fig_salary = leaderboard_figures(df, stat, label)
+
+    return fig_stat, fig_salary
+
+
+if leaderboard_mode == "clientside":
+    app.clientside_callback(
+        ClientsideFunction(namespace="leaderboard", function_name="top10"),
+        [
+            Output("fig_stat", "figure"),
+            Output("fig_salary", "figure"),
+        ],
+        [
+            Input("radio_league", "value"),
+            Input("drop_stats", "value"),
+            Input("drop_player_season", "value"),
+            Input("radio_norm", "value"),
+        ],
+        State("stat_arrays", "data"),
+    )
+else:
+    app.callback(
+        [
+            Output("fig_stat", "figure"),
+            Output("fig_salary", "figure"),
+        ],
+        [
+            Input("radio_league", "value"),
+            Input("drop_stats", "value"),
+            Input("drop_player_season", "value"),
+            Input("radio_norm", "value"),
+        ],
+    )(top10players_bystat)
+
+
 @app.callback(
+    Output("efficiency", "figure"),
     [
-        Output("fig_stat", "figure"),
-        Output("fig_salary", "figure"),
+        Input("radio_league", "value"),
+        Input("drop_stats", "value"),
+        Input("drop_player_season", "value"),
     ],
-    [Input("radio_league", "value"), Input("drop_stats", "value")],
 )
-def top10players_bystat(league_val, stat):
-    # Filter by League
-    if league_val == 0:
-        df = data_nba_wnba[data_nba_wnba["League"] == "WNBA"]
-        # Filter and sort by stat
-        df = (
-            df[["Player", "League", "Team", "Pos", "salary", stat]]
-            .sort_values(stat, ascending=False)
-            .head(10)
-        )
-    if league_val == 1:
-        df = data_nba_wnba[data_nba_wnba["League"] == "NBA"]
-        # Filter and sort by stat
-        df = (
-            df[["Player", "League", "Team", "Pos", "salary", stat]]
-            .sort_values(stat, ascending=False)
-            .head(10)
-        )
-    if league_val == 2:
-        df_w = data_nba_wnba[data_nba_wnba["League"] == "WNBA"]
-        df_n = data_nba_wnba[data_nba_wnba["League"] == "NBA"]
-        # Filter and sort by stat
-        df_w = (
-            df_w[["Player", "League", "Team", "Pos", "salary", stat]]
-            .sort_values(stat, ascending=False)
-            .head(10)
-        )
-        df_n = (
-            df_n[["Player", "League", "Team", "Pos", "salary", stat]]
-            .sort_values(stat, ascending=False)
-            .head(10)
-        )
-        df = pd.concat([df_w, df_n], ignore_index=True)
-
-    # Plot by stat
-    fig_stat = px.bar(
-        df,
-        y="Player",
-        x=stat,
-        color="League",
-        hover_data=["League", "Team", "Pos"],
-        color_discrete_map={"WNBA": "#F57B20", "NBA": "#17408B"},
-    )
-    fig_stat.update_layout(
-        title_text="Top 10 players per league by chosen stat",
-        showlegend=False,
-        title_font_size=18,
-        title_x=0.5,
-        title_y=0.92,
-        yaxis_categoryorder="total ascending",
-        yaxis=dict(
-            title=None,
-            titlefont_size=16,
-            tickfont_size=11,
-        ),
-        xaxis=dict(
-            title=stat,
-            titlefont_size=15,
-            tickfont_size=11,
-        ),
-    )
-    # Plot by salary
-    fig_salary = px.bar(
-        df.sort_values(stat),
-        y="Player",
-        x="salary",
-        color="League",
-        hover_data=["League", "Team", "Pos"],
-        color_discrete_map={"WNBA": "#F57B20", "NBA": "#17408B"},
-    )
-    fig_salary.update_layout(
-        title_text="Salary of top 10 players per league by chosen stat",
-        showlegend=False,
-        title_font_size=18,
-        title_x=0.5,
-        title_y=0.92,
-        yaxis_categoryorder="total ascending",
-        yaxis=dict(
-            title=None,
-            titlefont_size=16,
-            tickfont_size=11,
-        ),
-        xaxis=dict(
-            title="USD",
-            titlefont_size=15,
-            tickfont_size=11,
-        ),
+@metrics.timed_callback
+@figure_cache.memoize("update_efficiency")
+def update_efficiency(league_val, stat, season=default_player_season):
+    from src.visualization.figures import efficiency_figure
+
+    with metrics.phase("update_efficiency", "filter"):
+        matrix = efficiency_for(season)
+        df = matrix.frame(stat)
+        leagues = league_names[league_val]
+        df = df[df["League"].isin(leagues)]
+        salary_per_unit = {
+            league: matrix.median_salary_per_unit(league, stat)
+            for league in leagues
+            if league in matrix.league_medians
+        }
+
+    with metrics.phase("update_efficiency", "figure_build"):
+        return efficiency_figure(df, stat, salary_per_unit)
+
+
+@app.callback(
+    [
+        Output("wnba_revenue", "children"),
+        Output("wnba_ratio", "children"),
+        Output("nba_revenue", "children"),
+        Output("nba_ratio", "children"),
+    ],
+    Input("drop_player_season", "value"),
+)
+def update_cards(season):
+    return revenue_cards(season)
+
+@app.callback(
+    Output("simulator", "figure"),
+    [
+        Input("drop_basis", "value"),
+        Input("slider_ratio", "value"),
+        Input("slider_revenue", "value"),
+        Input("drop_player_season", "value"),
+    ],
+)
+@metrics.timed_callback
+def update_simulator(basis, ratio, revenue, season=default_player_season):
+    # Not in the figure cache: the sliders update while dragged, so most
+    # steps would be misses that evict the other callbacks' figures.
+    # Ratios snap to RATIO_GRID and each worker keeps recent figures.
+    simulator = simulator_for(season)
+    if simulator is None:
+        raise PreventUpdate
+    return simulator_figure_for(
+        basis, simulator.ratio_index(ratio), revenue, season
     )
 
-    return fig_stat, fig_salary
+
+@functools.lru_cache(maxsize=256)
+def simulator_figure_for(basis, index, revenue, season):
+    from src.visualization.figures import simulator_figure
+
+    simulator = simulator_for(season)
+    ratio = float(simulator.ratios[index])
+    with metrics.phase("update_simulator", "simulate"):
+        df = simulator.frame(basis, ratio, revenue * 1e6)
+    with metrics.phase("update_simulator", "figure_build"):
+        return simulator_figure(df, revenue * 1e6 * ratio)
+
+
+@app.callback(
+    Output("slider_ratio", "value"),
+    Output("slider_revenue", "value"),
+    Input("drop_player_season", "value"),
+)
+def reset_simulator(season):
+    # start from the season's actual revenue and share
+    if not partitions.has("revenue", "WNBA", season):
+        raise PreventUpdate
+    revenue, ratio = league_revenue("WNBA", season)
+    return float(ratio), float(revenue) / 1e6
+
+
+@app.callback(
+        Output('drop_attendance', 'options'),
+        Output('drop_attendance', 'value'),
+        Input('drop_season', 'value'),
+        Input('games', 'clickData'),
+        State('drop_attendance', 'value'),
+        )
+def update_team_options(season, click, team):
+    teams = attendance.teams(season)
+    if dash.ctx.triggered_id == "games" and click:
+        # drill down from a bar of the all-teams charts to the team's games
+        team = click["points"][0]["x"]
+    # keep the selected team if it played that season
+    return team_options(teams), team if team in teams else None
+
 
 @app.callback(
         Output('games', 'figure'),
-        Input('drop_attendance', 'value')
+        Input('drop_attendance', 'value'),
+        Input('drop_season', 'value'),
+        Input('radio_attendance_view', 'value'),
         )
-def update_graph(team):
-    # load the graph with all teams originally
-    if team is None:
-        print("No Team selected yet.")
-        games_by_season = px.bar(
-                    data_frame=season_2019_df,
-                    x='team',
-                    y='attendance',
-                    orientation='v',
-                    # barmode='stack',
-                    color='attendance',
-                    text='opponent',
-                    height=1000
-                    )
-        games_by_season.update_layout(
-            title_text=None,
-            title_font_size=22,
-            title_x=0.5,
-            title_y=0.92,
-            yaxis=dict(
-                title='Attendance',
-                titlefont_size=16,
-                tickfont_size=12,
-            ),
-            xaxis=dict(
-                title="Team",
-                titlefont_size=16,
-                tickfont_size=12,
-            ),
+@metrics.timed_callback
+@figure_cache.memoize("update_graph")
+def update_graph(team, season=default_season, view="summary"):
+    from src.visualization.figures import (
+        attendance_figure,
+        attendance_overview_figure,
+    )
+
+    with metrics.phase("update_graph", "filter"):
+        # load the graph with all teams originally
+        if team is None and view == "summary":
+            logger.debug("team overview", extra={"season": season})
+            # per-team stats aggregated at load, a few bytes per team
+            # instead of one bar segment per game
+            overview = attendance.overview(season)
+        elif team is None:
+            logger.debug("no team selected", extra={"season": season})
+            new_wnba_attendance_df = attendance.slice(season)
+        else:
+            logger.debug("team selected", extra={"team": team, "season": season})
+            # games of the team the user selected, pre-sliced in the cube
+            new_wnba_attendance_df = attendance.slice(season, team)
+
+    with metrics.phase("update_graph", "figure_build"):
+        if team is None and view == "summary":
+            return attendance_overview_figure(overview)
+        games_by_season = attendance_figure(new_wnba_attendance_df)
+
+    return games_by_season
+
+
+@app.callback(
+        Output('trends', 'figure'),
+        Input('drop_trend_team', 'value'),
+        Input('radio_trend_venue', 'value'),
+        Input('drop_trend_game_type', 'value'),
         )
-    else:
-        print(f'The selected team is {team}.')
-        # create a copy of the dafaframe using the values the user selected in the dropdown
-        new_wnba_attendance_df = season_2019_df[(season_2019_df['team'] == team)]
-       
-        # create the bar graph
-        games_by_season = px.bar(
-                data_frame=new_wnba_attendance_df,
-                x='team',
-                y='attendance',
-                orientation='v',
-                # barmode='stack',
-                color='attendance',
-                text='opponent',
-                height=1000
-                )
-        games_by_season.update_layout(
-            title_text=None,
-            title_font_size=22,
-            title_x=0.5,
-            title_y=0.92,
-            yaxis=dict(
-                title='Attendance',
-                titlefont_size=16,
-                tickfont_size=12,
-            ),
-            xaxis=dict(
-                title="Team",
-                titlefont_size=16,
-                tickfont_size=12,
-            ),
+@metrics.timed_callback
+@figure_cache.memoize("update_trends")
+def update_trends(team, venue=ALL_VENUES, game_type=ALL_GAME_TYPES):
+    from src.visualization.figures import trend_figure
+
+    with metrics.phase("update_trends", "filter"):
+        # every league game is someone's home game and someone's away game
+        if team == LEAGUE:
+            venue = ALL_VENUES
+        # series of the precomputed trend table, never the games
+        series = trends.series(team, venue, game_type)
+        league = None if team == LEAGUE else trends.series(
+            LEAGUE, ALL_VENUES, game_type
         )
 
-    return games_by_season
+    with metrics.phase("update_trends", "figure_build"):
+        title = f"{team}: attendance per game, {VENUES[venue].lower()}"
+        figure = trend_figure(series, f"{title} ({game_type})", league)
+
+    return figure
+
+
+# JSON query API for other services, see src/web/api.py
+server.register_blueprint(make_api(
+    top_players,
+    attendance,
+    stat_names,
+    player_seasons,
+    version=figure_cache.version,
+    last_modified=max(os.path.getmtime(path) for path in data_files),
+    max_age=int(os.environ.get("API_MAX_AGE", 300)),
+))
+
+
+@server.route("/cache-stats")
+def cache_stats():
+    return flask.jsonify(figure_cache.stats())
+
+
+def warm_up():
+    """ Import what the callbacks load lazily, e.g. in a preloading master
+        so forked workers inherit the modules.
+    """
+    import src.visualization.figures  # noqa: F401
 
 
 ########################################################
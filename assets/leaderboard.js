@@ -0,0 +1,155 @@
+// Clientside top-10 leaderboard, used when the app runs with
+// LEADERBOARD_MODE=clientside. The stat arrays of every season and
+// normalization arrive once in the "stat_arrays" store; every change of
+// league, stat, season or normalization is ranked and drawn here without a
+// request to the server.
+(function () {
+    var COLORS = {WNBA: "#F57B20", NBA: "#17408B"};
+    var LEAGUES = {0: ["WNBA"], 1: ["NBA"], 2: ["WNBA", "NBA"]};
+    var decoded = null;
+
+    function decode(b64, Type) {
+        var raw = atob(b64);
+        var bytes = new Uint8Array(raw.length);
+        for (var i = 0; i < raw.length; i++) {
+            bytes[i] = raw.charCodeAt(i);
+        }
+        return new Type(bytes.buffer);
+    }
+
+    // the leagues of a season and normalization, decoded on first use
+    function load(data, season, norm) {
+        if (!decoded || decoded.source !== data) {
+            decoded = {source: data, sets: {}};
+        }
+        var key = season + "/" + norm;
+        if (!decoded.sets[key]) {
+            decoded.sets[key] = decodeLeagues(data.seasons[season][norm]);
+        }
+        return decoded.sets[key];
+    }
+
+    function decodeLeagues(leagues) {
+        var out = {};
+        Object.keys(leagues).forEach(function (league) {
+            var src = leagues[league];
+            out[league] = {
+                Player: src.Player,
+                Team: src.Team,
+                Pos: src.Pos,
+                salary: decode(src.salary, Int32Array),
+                stats: decode(src.stats, Float32Array),
+                size: src.Player.length
+            };
+        });
+        return out;
+    }
+
+    // float32 values rounded back to what the csv holds
+    function clean(value) {
+        return isNaN(value) ? null : parseFloat(value.toPrecision(6));
+    }
+
+    function top(league, column, n) {
+        var values = league.stats.subarray(
+            column * league.size, (column + 1) * league.size
+        );
+        var order = [];
+        for (var i = 0; i < league.size; i++) {
+            order.push(i);
+        }
+        // descending, NaN last, ties in table order
+        order.sort(function (a, b) {
+            var va = values[a], vb = values[b];
+            if (isNaN(va)) { return isNaN(vb) ? a - b : 1; }
+            if (isNaN(vb)) { return -1; }
+            return vb - va || a - b;
+        });
+        return order.slice(0, n).map(function (i) {
+            return {i: i, value: clean(values[i])};
+        });
+    }
+
+    function trace(name, league, rows, x, label) {
+        return {
+            type: "bar",
+            orientation: "h",
+            name: name,
+            legendgroup: name,
+            offsetgroup: name,
+            alignmentgroup: "True",
+            showlegend: true,
+            textposition: "auto",
+            marker: {color: COLORS[name], pattern: {shape: ""}},
+            x: x,
+            y: rows.map(function (r) { return league.Player[r.i]; }),
+            customdata: rows.map(function (r) {
+                return [name, league.Team[r.i], league.Pos[r.i]];
+            }),
+            hovertemplate: "League=%{customdata[0]}<br>" + label +
+                "=%{x}<br>Player=%{y}<br>Team=%{customdata[1]}" +
+                "<br>Pos=%{customdata[2]}<extra></extra>",
+            xaxis: "x",
+            yaxis: "y"
+        };
+    }
+
+    function layout(template, title, xtitle) {
+        return {
+            template: template,
+            barmode: "relative",
+            legend: {title: {text: "League"}, tracegroupgap: 0},
+            margin: {t: 60},
+            title: {text: title, font: {size: 18}, x: 0.5, y: 0.92},
+            showlegend: false,
+            yaxis: {
+                anchor: "x", domain: [0.0, 1.0],
+                categoryorder: "total ascending",
+                title: null, titlefont: {size: 16}, tickfont: {size: 11}
+            },
+            xaxis: {
+                anchor: "y", domain: [0.0, 1.0],
+                title: {text: xtitle}, titlefont: {size: 15},
+                tickfont: {size: 11}
+            }
+        };
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        leaderboard: {
+            top10: function (league_val, stat, season, norm, data) {
+                if (!data || !data.seasons[season]) {
+                    return [window.dash_clientside.no_update,
+                            window.dash_clientside.no_update];
+                }
+                var store = load(data, season, norm);
+                var column = data.stats.indexOf(stat);
+                var label = norm === "per_game" ? stat :
+                    stat + " (" + data.norm_labels[norm] + ")";
+                var stat_traces = [], salary_traces = [];
+                LEAGUES[league_val].forEach(function (name) {
+                    var league = store[name];
+                    var rows = top(league, column, 10);
+                    stat_traces.push(trace(name, league, rows,
+                        rows.map(function (r) { return r.value; }), stat));
+                    salary_traces.push(trace(name, league, rows,
+                        rows.map(function (r) { return league.salary[r.i]; }),
+                        "salary"));
+                });
+                return [
+                    {
+                        data: stat_traces,
+                        layout: layout(data.template,
+                            "Top 10 players per league by chosen stat", label)
+                    },
+                    {
+                        data: salary_traces,
+                        layout: layout(data.template,
+                            "Salary of top 10 players per league by chosen stat",
+                            "USD")
+                    }
+                ];
+            }
+        }
+    });
+})();
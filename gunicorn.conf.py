@@ -0,0 +1,44 @@
+# Gunicorn settings used by the Procfile.
+#
+# With preload_app the master imports app.py once: data is loaded and the
+# layout is built before forking, and the workers share that state
+# copy-on-write instead of repeating it. Set PRELOAD_APP=0 to load the app
+# in every worker instead. SEED_FIGURE_CACHE=1 renders every figure into
+# the shared figure cache before the workers start (see src/web/export.py),
+# raising the cache cap to hold them.
+import gc
+import os
+
+from src.web.log import configure_logging
+
+# JSON logs of the app's loggers; set here rather than in app.py so
+# importing the app leaves logging (and gunicorn's own handlers) alone
+configure_logging()
+
+bind = "0.0.0.0:" + os.environ.get("PORT", "8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", 4))
+preload_app = os.environ.get("PRELOAD_APP", "1") != "0"
+
+
+def on_starting(server):
+    # histograms flushed by the workers of a previous run
+    import shutil
+    import tempfile
+
+    default = os.path.join(tempfile.gettempdir(), "wnba_nba_metrics")
+    shutil.rmtree(os.environ.get("METRICS_DIR", default), ignore_errors=True)
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    import app
+
+    app.warm_up()
+    if os.environ.get("SEED_FIGURE_CACHE") == "1":
+        from src.web.export import seed_cache
+
+        seed_cache(app, workers=workers)
+    # keep the preloaded objects out of the collector so the workers do not
+    # touch (and copy) their pages
+    gc.freeze()
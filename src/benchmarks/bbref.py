@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+""" Compare read_bbref with read_csv and the old cleanup of the exports.
+
+    Each basketball-reference export (per-game and totals, both leagues) is
+    written --seasons times over into one large multi-season file, and read
+    back with src.data.bbref.read_bbref and with the sequence the pipeline
+    used before: read_csv (the WNBA files whole because of their repeated
+    header), str.replace of "</strong" in the names, the Tm rename and the
+    column selection. read_bbref is timed with pandas' C parser and, when
+    pyarrow is installed, with the pyarrow engine.
+
+        python -m src.benchmarks.bbref --seasons 50
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from src.data import data_cleaning
+from src.data.bbref import COLUMNS, ENGINE, read_bbref
+from src.data.columnar import PROJECT_DIR
+
+EXPORTS = ["wnba_stats", "nba_stats", "wnba_totals", "nba_totals"]
+
+
+def legacy_read(path):
+    """ read_csv + cleanup, as the pipeline read the exports before. """
+    df = pd.read_csv(path)
+    df["Player"] = df["Player"].str.replace("</strong", "")
+    return df.rename(columns={"Tm": "Team"})[COLUMNS]
+
+
+def read_bbref_c(path):
+    return read_bbref(path, engine="c")
+
+
+def read_bbref_pyarrow(path):
+    return read_bbref(path, engine="pyarrow")
+
+
+def multi_season_export(name, out_dir, seasons):
+    """ Path of the export repeated seasons times below its header. """
+    source = PROJECT_DIR / "data" / data_cleaning.RAW_FILES[name]
+    head, body = source.read_bytes().split(b"\n", 1)
+    if not body.endswith(b"\n"):
+        body += b"\n"
+    path = Path(out_dir) / f"{seasons}_{source.name}"
+    path.write_bytes(head + b"\n" + body * seasons)
+    return path
+
+
+def median_ms(func, path, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(path)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seasons", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    readers = {"read_csv": legacy_read, "bbref c": read_bbref_c}
+    if ENGINE == "pyarrow":
+        readers["bbref pyarrow"] = read_bbref_pyarrow
+    print(f"{'export':<14}{'rows':>9}"
+          + "".join(f"{label + ' ms':>18}" for label in readers))
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in EXPORTS:
+            path = multi_season_export(name, tmp, args.seasons)
+            rows = len(read_bbref(path))
+            times = [median_ms(read, path, args.repeat)
+                     for read in readers.values()]
+            print(f"{name:<14}{rows:>9,d}" + "".join(
+                f"{ms:>10.1f} ({times[0] / ms:.2f}x)" for ms in times
+            ))
+
+
+if __name__ == "__main__":
+    main()
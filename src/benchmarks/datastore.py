@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+""" Compare loading the app tables from csv against the columnar store.
+
+    Each path is run in --workers concurrent processes, like the gunicorn
+    workers, and every process reports its load time and memory. RssAnon is
+    memory private to the worker, RssFile is file-backed pages that workers
+    can share.
+
+        python -m src.benchmarks.datastore --workers 4 --scale 50
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from src.data.columnar import PROJECT_DIR, STORE_DIR, TABLES, write_table
+
+WORKER = """
+import json, sys, time
+import pandas as pd
+from pathlib import Path
+from src.data.columnar import read_table
+
+mode, data_dir, store_dir = sys.argv[1:4]
+names = sys.argv[4:]
+start = time.perf_counter()
+if mode == "csv":
+    tables = [pd.read_csv(Path(data_dir) / name) for name in names]
+else:
+    tables = [read_table(Path(store_dir) / name) for name in names]
+# touch every numeric column, as the callbacks would
+total = sum(float(t.select_dtypes("number").sum().sum()) for t in tables)
+elapsed = time.perf_counter() - start
+status = dict(
+    line.split(":", 1) for line in open("/proc/self/status") if ":" in line
+)
+print(json.dumps({
+    "seconds": elapsed,
+    "rss_kb": int(status["VmRSS"].split()[0]),
+    "rss_anon_kb": int(status.get("RssAnon", "0 kB").split()[0]),
+    "rss_file_kb": int(status.get("RssFile", "0 kB").split()[0]),
+}))
+"""
+
+
+def scale_inputs(scale, data_dir, store_dir):
+    """ Write csv and store copies of every table repeated scale times. """
+    for name, filename in TABLES.items():
+        df = pd.read_csv(PROJECT_DIR / "data" / filename)
+        df = pd.concat([df] * scale, ignore_index=True)
+        df.to_csv(Path(data_dir) / filename, index=False)
+        write_table(df, Path(store_dir) / name)
+
+
+def run(mode, workers, data_dir, store_dir):
+    names = list(TABLES.values()) if mode == "csv" else list(TABLES)
+    command = [sys.executable, "-c", WORKER, mode, str(data_dir),
+               str(store_dir)] + names
+    procs = [
+        subprocess.Popen(command, stdout=subprocess.PIPE, cwd=PROJECT_DIR)
+        for _ in range(workers)
+    ]
+    return [json.loads(p.communicate()[0]) for p in procs]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--scale", type=int, default=1,
+                        help="repeat every table this many times")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir, store_dir = PROJECT_DIR / "data", STORE_DIR
+        if args.scale > 1 or not (STORE_DIR / "wnba_attendance").exists():
+            data_dir = store_dir = Path(tmp)
+            scale_inputs(args.scale, data_dir, store_dir)
+
+        print(f"{'path':<8}{'load ms':>10}{'rss MB':>10}"
+              f"{'private MB':>12}{'shared MB':>11}")
+        for mode in ("csv", "store"):
+            results = run(mode, args.workers, data_dir, store_dir)
+            n = len(results)
+            print(
+                f"{mode:<8}"
+                f"{1000 * sum(r['seconds'] for r in results) / n:>10.1f}"
+                f"{sum(r['rss_kb'] for r in results) / n / 1024:>10.1f}"
+                f"{sum(r['rss_anon_kb'] for r in results) / n / 1024:>12.1f}"
+                f"{sum(r['rss_file_kb'] for r in results) / n / 1024:>11.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+""" Before/after benchmark of the callback figures.
+
+    "before" is the plotly.express code the callbacks used to run, "after"
+    is src/visualization/figures.py. For every leaderboard (league, stat)
+    and attendance view it reports CPU time per call and the figure JSON
+    size raw, gzip- and brotli-compressed.
+
+        python -m src.benchmarks.figures
+"""
+import argparse
+import gzip
+import os
+import statistics
+import sys
+import time
+
+from src.data.columnar import PROJECT_DIR
+from src.visualization.figures import attendance_figure, leaderboard_figures
+
+try:
+    import brotli
+except ImportError:  # brotli is optional for this report
+    brotli = None
+
+
+def px_leaderboard_figures(df, stat):
+    import plotly.express as px
+
+    fig_stat = px.bar(
+        df,
+        y="Player",
+        x=stat,
+        color="League",
+        hover_data=["League", "Team", "Pos"],
+        color_discrete_map={"WNBA": "#F57B20", "NBA": "#17408B"},
+    )
+    fig_stat.update_layout(
+        title_text="Top 10 players per league by chosen stat",
+        showlegend=False,
+        title_font_size=18,
+        title_x=0.5,
+        title_y=0.92,
+        yaxis_categoryorder="total ascending",
+        yaxis=dict(title=None, titlefont_size=16, tickfont_size=11),
+        xaxis=dict(title=stat, titlefont_size=15, tickfont_size=11),
+    )
+    fig_salary = px.bar(
+        df.sort_values(stat),
+        y="Player",
+        x="salary",
+        color="League",
+        hover_data=["League", "Team", "Pos"],
+        color_discrete_map={"WNBA": "#F57B20", "NBA": "#17408B"},
+    )
+    fig_salary.update_layout(
+        title_text="Salary of top 10 players per league by chosen stat",
+        showlegend=False,
+        title_font_size=18,
+        title_x=0.5,
+        title_y=0.92,
+        yaxis_categoryorder="total ascending",
+        yaxis=dict(title=None, titlefont_size=16, tickfont_size=11),
+        xaxis=dict(title="USD", titlefont_size=15, tickfont_size=11),
+    )
+    return fig_stat, fig_salary
+
+
+def px_attendance_figure(df):
+    import plotly.express as px
+
+    fig = px.bar(
+        data_frame=df,
+        x="team",
+        y="attendance",
+        orientation="v",
+        color="attendance",
+        text="opponent",
+        height=1000,
+    )
+    fig.update_layout(
+        title_text=None,
+        title_font_size=22,
+        title_x=0.5,
+        title_y=0.92,
+        yaxis=dict(title="Attendance", titlefont_size=16, tickfont_size=12),
+        xaxis=dict(title="Team", titlefont_size=16, tickfont_size=12),
+    )
+    return fig
+
+
+def measure(build, inputs, repeat):
+    cpu, raw, gz, br = [], [], [], []
+    for args in inputs:
+        for _ in range(repeat):
+            start = time.process_time()
+            figures = build(*args)
+            figures = figures if isinstance(figures, tuple) else (figures,)
+            payload = "[" + ",".join(f.to_json() for f in figures) + "]"
+            cpu.append((time.process_time() - start) * 1000)
+        data = payload.encode()
+        raw.append(len(data))
+        gz.append(len(gzip.compress(data)))
+        if brotli:
+            br.append(len(brotli.compress(data)))
+    return {
+        "cpu_ms": statistics.median(cpu),
+        "raw": statistics.mean(raw),
+        "gzip": statistics.mean(gz),
+        "brotli": statistics.mean(br) if br else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    os.chdir(PROJECT_DIR)
+    sys.path.insert(0, str(PROJECT_DIR))
+    import app
+
+    leaderboard_inputs = [
+        (app.top_players(leagues, stat, app.default_player_season), stat)
+        for leagues in app.league_names.values()
+        for stat in app.stat_names
+    ]
+    season = app.default_season
+    attendance_inputs = [
+        (app.attendance.slice(season, team),)
+        for team in [None] + app.attendance.teams(season)
+    ]
+    cases = [
+        ("leaderboard", leaderboard_inputs,
+         px_leaderboard_figures, leaderboard_figures),
+        ("attendance", attendance_inputs,
+         px_attendance_figure, attendance_figure),
+    ]
+
+    print(f"{'figure':<13}{'path':<8}{'cpu ms':>9}{'raw B':>10}"
+          f"{'gzip B':>9}{'brotli B':>10}")
+    for name, inputs, before, after in cases:
+        for label, build in (("before", before), ("after", after)):
+            r = measure(build, inputs, args.repeat)
+            print(f"{name:<13}{label:<8}{r['cpu_ms']:>9.2f}{r['raw']:>10.0f}"
+                  f"{r['gzip']:>9.0f}{r['brotli']:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+""" Compare reading the raw pipeline inputs serially and concurrently.
+
+    Every raw input is copied once per season, as the per-season exports
+    would be, and the whole set is read with plain serial read_csv calls,
+    serially with the usecols/dtype hints and the basketball-reference
+    reader, and with src.data.loader.
+
+        python -m src.benchmarks.loading --seasons 20 --workers 8
+"""
+import argparse
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from src.data import data_cleaning
+from src.data.columnar import PROJECT_DIR
+from src.data.loader import read_csvs
+
+
+def season_inputs(out_dir, seasons):
+    """ {name: path} with a copy of each raw input per season, and the
+        read options and reader of each.
+    """
+    paths, options, readers = {}, {}, {}
+    for name, filename in data_cleaning.RAW_FILES.items():
+        for season in range(seasons):
+            path = Path(out_dir) / f"{season}_{filename}"
+            shutil.copy(PROJECT_DIR / "data" / filename, path)
+            paths[f"{name}_{season}"] = path
+            options[f"{name}_{season}"] = data_cleaning.RAW_OPTIONS[name]
+            readers[f"{name}_{season}"] = data_cleaning.RAW_READERS.get(
+                name, pd.read_csv
+            )
+    return paths, options, readers
+
+
+def timed(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seasons", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths, options, readers = season_inputs(tmp, args.seasons)
+        cases = {
+            "serial": lambda: [pd.read_csv(p) for p in paths.values()],
+            "serial + hints": lambda: [
+                readers[name](p, **options[name]) for name, p in paths.items()
+            ],
+            "concurrent + hints": lambda: read_csvs(
+                paths, options, max_workers=args.workers, readers=readers
+            ),
+        }
+        print(f"{len(paths)} files, median of {args.repeat} runs")
+        serial = None
+        for label, func in cases.items():
+            ms = timed(func, args.repeat)
+            serial = serial or ms
+            print(f"{label:<20}{ms:>10.1f} ms{serial / ms:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
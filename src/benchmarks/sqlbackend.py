@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+""" Compare the in-memory and SQLite backends of the callbacks.
+
+    Builds --seasons copies of the player season and --scale copies of the
+    attendance table (under shifted seasons), in memory as the app holds
+    them and in a temporary SQLite store, then times the leaderboard top-N
+    of every (league, stat) of one season and every attendance slice.
+    Reports the median query time and the bytes each worker keeps resident.
+
+        python -m src.benchmarks.sqlbackend --seasons 20 --scale 5
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from src.data.columnar import load_table
+from src.data.partitions import PartitionStore
+from src.data.schema import memory_bytes
+from src.data.sqlstore import SqlBackend, create_indexes, make_engine
+from src.features.attendance import AttendanceCube
+from src.features.leaderboard import LEAGUES, LeaderboardIndex
+
+
+def median_ms(func, calls, repeat):
+    times = []
+    for _ in range(repeat):
+        for args in calls:
+            start = time.perf_counter()
+            func(*args)
+            times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def scaled_tables(seasons, scale):
+    partitions = PartitionStore()
+    season = partitions.seasons("players")[-1]
+    players = pd.concat(
+        [
+            partitions.get("players", league, season).assign(season=season - k)
+            for k in range(seasons)
+            for league in partitions.leagues("players")
+        ],
+        ignore_index=True,
+    )
+    games = load_table("wnba_attendance")
+    span = games["season"].max() - games["season"].min() + 1
+    attendance = pd.concat(
+        [
+            games.assign(season=games["season"] - k * span)
+            for k in range(scale)
+        ],
+        ignore_index=True,
+    )
+    return players, attendance, season
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seasons", type=int, default=10)
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    players, games, season = scaled_tables(args.seasons, args.scale)
+    keys = ("Player", "League", "Team", "Pos", "salary", "season")
+    stats = [c for c in players.columns if c not in keys]
+
+    # in memory: one index per (league, season), like app.leaderboard_for
+    indexes = {
+        (league, s): LeaderboardIndex(rows, stats)
+        for (league, s), rows in players.groupby(
+            ["League", "season"], observed=True
+        )
+    }
+    cube = AttendanceCube(games)
+
+    def memory_top(leagues, stat):
+        return pd.concat(
+            [
+                indexes[(league, season)].top(league, stat)
+                for league in leagues
+            ],
+            ignore_index=True,
+        )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = "sqlite:///" + str(Path(tmp) / "bench.sqlite")
+        engine = make_engine(url)
+        with engine.begin() as conn:
+            players.to_sql("players", conn, index=False)
+            games.to_sql("attendance", conn, index=False)
+        create_indexes(engine)
+        engine.dispose()
+        sql = SqlBackend(url)
+
+        top_calls = [(list(leagues), stat)
+                     for leagues in (["WNBA"], ["NBA"], list(LEAGUES))
+                     for stat in stats]
+        slice_calls = [(s, team) for s in cube.seasons
+                       for team in [None] + cube.teams(s)]
+        results = {
+            "top_n": (
+                median_ms(memory_top, top_calls, args.repeat),
+                median_ms(lambda leagues, stat: sql.top_players(
+                    leagues, stat, season), top_calls, args.repeat),
+            ),
+            "attendance_slice": (
+                median_ms(cube.slice, slice_calls, args.repeat),
+                median_ms(sql.attendance.slice, slice_calls, args.repeat),
+            ),
+        }
+        resident = int(
+            memory_bytes(players).sum() + memory_bytes(cube.games).sum()
+            + sum(len(order) * 8 for index in indexes.values()
+                  for order in index._order.values())
+        )
+        file_size = (Path(tmp) / "bench.sqlite").stat().st_size
+
+    print(f"{len(players):,d} player rows, {len(games):,d} games")
+    print(f"{'query':<18}{'memory ms':>11}{'sqlite ms':>11}")
+    for name, (memory, sqlite) in results.items():
+        print(f"{name:<18}{memory:>11.3f}{sqlite:>11.3f}")
+    print(f"resident per worker: memory {resident:,d} B; sqlite only the "
+          f"connection caches (file {file_size:,d} B, shared through the "
+          f"OS page cache)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+""" Import-time and startup profile of the dashboard.
+
+    Imports app.py in a fresh interpreter with -X importtime and reports the
+    time spent importing each module app.py pulls in, the time spent in the
+    module body itself (loading data, building the layout) and the lazily
+    imported callback modules. Exits with status 1 if the startup time goes
+    over --budget-ms, so it can gate a regression.
+
+        python -m src.benchmarks.startup --budget-ms 3000 --json startup.json
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+
+from src.data.columnar import PROJECT_DIR
+
+SCRIPT = """
+import json, time
+start = time.perf_counter()
+import app
+loaded = time.perf_counter()
+app.warm_up()
+warm = time.perf_counter()
+print(json.dumps({"import_app": loaded - start, "warm_up": warm - loaded}))
+"""
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def profile():
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SCRIPT],
+        cwd=PROJECT_DIR, capture_output=True, text=True, check=True,
+    )
+    timings = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    # -X importtime prints children before their parent, indented by two
+    # spaces per level; the children of app are the lines one level deeper
+    # than app that come before it
+    entries = [
+        (len(m.group(3)) // 2, m.group(4), int(m.group(2)) / 1000)
+        for m in map(LINE.match, proc.stderr.splitlines()) if m
+    ]
+    position = next(i for i, e in enumerate(entries) if e[1] == "app")
+    depth = entries[position][0]
+    imports = {}
+    for level, name, ms in reversed(entries[:position]):
+        if level <= depth:
+            break
+        if level == depth + 1:
+            imports[name] = ms
+    lazy = {
+        name: ms for level, name, ms in entries[position + 1:] if level == 0
+    }
+
+    total = timings["import_app"] * 1000
+    return {
+        "import_app_ms": round(total, 1),
+        "module_body_ms": round(total - sum(imports.values()), 1),
+        "imports_ms": {k: round(v, 1) for k, v in sorted(
+            imports.items(), key=lambda item: -item[1])},
+        "lazy_imports_ms": {k: round(v, 1) for k, v in sorted(
+            lazy.items(), key=lambda item: -item[1])},
+        "warm_up_ms": round(timings["warm_up"] * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    report = profile()
+    print(f"{'import app':<42}{report['import_app_ms']:>9.1f} ms")
+    print(f"{'  app.py body':<42}{report['module_body_ms']:>9.1f} ms")
+    for name, ms in report["imports_ms"].items():
+        print(f"{'  import ' + name:<42}{ms:>9.1f} ms")
+    print(f"{'warm_up (lazy imports)':<42}{report['warm_up_ms']:>9.1f} ms")
+    for name, ms in report["lazy_imports_ms"].items():
+        print(f"{'  import ' + name:<42}{ms:>9.1f} ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.budget_ms is not None and report["import_app_ms"] > args.budget_ms:
+        print(f"startup over budget of {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+""" Benchmark suite for the dashboard callbacks, data pipeline and startup.
+
+    run      time every benchmark and write the results as JSON
+    compare  compare two result files and flag regressions (skipped when
+             there is no baseline yet; baselines are per machine)
+
+        python -m src.benchmarks.suite run \
+            --output reports/benchmarks/baseline.json
+        python -m src.benchmarks.suite run --scale 20 --output /tmp/new.json
+        python -m src.benchmarks.suite compare \
+            reports/benchmarks/baseline.json /tmp/new.json
+
+    --scale repeats the player and attendance tables (and the raw pipeline
+    inputs, under distinct names) that many times to see how each path grows
+    with row count. Callbacks are unwrapped, so neither the figure cache nor
+    the metrics decorators are timed.
+"""
+import argparse
+import functools
+import inspect
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from src.data import data_cleaning
+from src.data.columnar import PROJECT_DIR
+
+BENCHMARK_DIR = PROJECT_DIR / "reports" / "benchmarks"
+
+
+def timed(func, *args, repeat=5):
+    """ Call func repeat times; returns (result, list of ms). """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        times.append((time.perf_counter() - start) * 1000)
+    return result, times
+
+
+def summarize(times, payloads=()):
+    entry = {
+        "calls": len(times),
+        "median_ms": round(statistics.median(times), 4),
+        "min_ms": round(min(times), 4),
+        "max_ms": round(max(times), 4),
+    }
+    if payloads:
+        entry["payload_bytes"] = int(statistics.mean(payloads))
+        entry["max_payload_bytes"] = max(payloads)
+    return entry
+
+
+def figure_bytes(figures):
+    figures = figures if isinstance(figures, tuple) else (figures,)
+    return sum(len(fig.to_json()) for fig in figures)
+
+
+def scale_app(app, scale):
+    """ Swap the app tables for copies repeated scale times. """
+    from src.features.attendance import AttendanceCube
+    from src.features.efficiency import EfficiencyMatrix
+    from src.features.leaderboard import LeaderboardIndex
+    from src.features.simulator import SalarySimulator
+    from src.features.stats_cube import normalized
+
+    season = app.default_player_season
+    players = {
+        league: pd.concat(
+            [app.partitions.get("players", league, season)] * scale,
+            ignore_index=True,
+        )
+        for league in app.partitions.leagues("players")
+    }
+    cubes = {
+        league: pd.concat(
+            [app.partitions.get("stats_cube", league, season)] * scale,
+            ignore_index=True,
+        )
+        for league in app.partitions.leagues("stats_cube")
+    }
+    games = pd.concat([app.wnba_attendance_df] * scale, ignore_index=True)
+    app.leaderboard_for = functools.lru_cache(maxsize=None)(
+        lambda league, season, norm="per_game": LeaderboardIndex(
+            players[league].assign(
+                **normalized(cubes[league], app.stat_names, norm)
+            ),
+            app.stat_names,
+        )
+    )
+    app.efficiency_for = functools.lru_cache(maxsize=None)(
+        lambda season: EfficiencyMatrix(
+            pd.concat(players.values(), ignore_index=True), app.stat_names
+        )
+    )
+    revenue, _ = app.league_revenue("WNBA", season)
+    app.simulator_for = functools.lru_cache(maxsize=None)(
+        lambda season: SalarySimulator(
+            players["WNBA"], players["NBA"], revenue, app.stat_names
+        )
+    )
+    app.attendance = AttendanceCube(games)
+
+
+def bench_callbacks(app, repeat):
+    results = {}
+    top10 = inspect.unwrap(app.top10players_bystat)
+    times, payloads = [], []
+    for league_val in app.league_names:
+        for stat in app.stat_names:
+            figures, t = timed(top10, league_val, stat, repeat=repeat)
+            times += t
+            payloads.append(figure_bytes(figures))
+    results["top10players_bystat"] = summarize(times, payloads)
+
+    update_efficiency = inspect.unwrap(app.update_efficiency)
+    times, payloads = [], []
+    for league_val in app.league_names:
+        for stat in app.stat_names:
+            figure, t = timed(update_efficiency, league_val, stat,
+                              repeat=repeat)
+            times += t
+            payloads.append(figure_bytes(figure))
+    results["update_efficiency"] = summarize(times, payloads)
+
+    # recomputing every efficiency metric of the (scaled) roster
+    from src.features.efficiency import EfficiencyMatrix
+
+    roster = app.efficiency_for(app.default_player_season).df
+    _, times = timed(EfficiencyMatrix, roster, app.stat_names, repeat=repeat)
+    results["efficiency_matrix"] = summarize(times)
+
+    # recomputing the stats cube of the (scaled) roster from its totals
+    from src.features.stats_cube import build_cube, league_pace
+
+    totals = pd.concat(
+        [
+            app.leaderboard_for(league, app.default_player_season, "totals").df
+            for league in app.partitions.leagues("players")
+        ],
+        ignore_index=True,
+    )
+    summary = pd.read_csv(
+        PROJECT_DIR / "data" / data_cleaning.LEAGUE_SUMMARY_FILE
+    )
+    pace = league_pace(summary, app.default_player_season)
+    _, times = timed(build_cube, totals, app.stat_names, totals["League"],
+                     pace, repeat=repeat)
+    results["stats_cube"] = summarize(times)
+
+    # dragging the share ratio slider over its whole range
+    from src.features.simulator import RATIO_GRID
+
+    update_simulator = inspect.unwrap(app.update_simulator)
+
+    def simulate(ratio):
+        # every repeat builds the figure, not the worker's lru_cache hit
+        app.simulator_figure_for.cache_clear()
+        return update_simulator("salary", ratio, 60,
+                                app.default_player_season)
+
+    times, payloads = [], []
+    for ratio in RATIO_GRID[::10]:
+        figure, t = timed(simulate, float(ratio), repeat=repeat)
+        times += t
+        payloads.append(figure_bytes(figure))
+    results["update_simulator"] = summarize(times, payloads)
+
+    update_graph = inspect.unwrap(app.update_graph)
+    times, payloads = [], []
+    for team in [None] + app.attendance.teams(app.default_season):
+        figure, t = timed(update_graph, team, app.default_season,
+                          repeat=repeat)
+        times += t
+        payloads.append(figure_bytes(figure))
+    results["update_graph"] = summarize(times, payloads)
+
+    # every game of the season, the all-teams view before the team summary
+    figure, times = timed(update_graph, None, app.default_season, "games",
+                          repeat=repeat)
+    results["update_graph_games"] = summarize(times, [figure_bytes(figure)])
+
+    from src.features.trends import (
+        ALL_GAME_TYPES,
+        ALL_VENUES,
+        attendance_trends,
+    )
+
+    update_trends = inspect.unwrap(app.update_trends)
+    times, payloads = [], []
+    for team in app.trends.teams:
+        figure, t = timed(update_trends, team, ALL_VENUES, ALL_GAME_TYPES,
+                          repeat=repeat)
+        times += t
+        payloads.append(figure_bytes(figure))
+    results["update_trends"] = summarize(times, payloads)
+
+    # recomputing the trend table from the (scaled) games
+    _, times = timed(attendance_trends, app.attendance.games, repeat=repeat)
+    results["attendance_trends"] = summarize(times)
+
+    numbers = [0, 999, 1234, 60000000, 7400000000, 0.205, 123456789012]
+    _, times = timed(
+        lambda: [app.human_format(n) for n in numbers], repeat=repeat * 20
+    )
+    results["human_format"] = summarize([t / len(numbers) for t in times])
+    return results
+
+
+def scale_raw_inputs(data_dir, out_dir, scale):
+    """ Raw pipeline inputs repeated scale times under distinct names. """
+    for name, filename in data_cleaning.RAW_FILES.items():
+        df = pd.read_csv(Path(data_dir) / filename)
+        copies = []
+        for k in range(scale):
+            copy = df.copy()
+            if k:
+                # a distinct first name keeps the copies from cross joining
+                if "first_name" in copy:
+                    copy["first_name"] = copy["first_name"] + str(k)
+                else:
+                    copy["Player"] = copy["Player"].str.replace(
+                        r"^(\S+)", rf"\g<1>{k}", regex=True
+                    )
+            copies.append(copy)
+        pd.concat(copies, ignore_index=True).to_csv(
+            Path(out_dir) / filename, index=False
+        )
+
+
+def bench_pipeline(scale, repeat):
+    from src.data.pipeline import run_pipeline
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        if scale > 1:
+            scale_raw_inputs(PROJECT_DIR / "data", tmp, scale)
+        else:
+            for filename in data_cleaning.RAW_FILES.values():
+                shutil.copy(PROJECT_DIR / "data" / filename, tmp)
+        shutil.copy(
+            PROJECT_DIR / "data" / data_cleaning.LEAGUE_SUMMARY_FILE, tmp
+        )
+        _, times = timed(
+            lambda: run_pipeline(tmp, tmp, force=True), repeat=repeat
+        )
+        results["pipeline_full"] = summarize(times)
+        _, times = timed(lambda: run_pipeline(tmp, tmp), repeat=repeat)
+        results["pipeline_noop"] = summarize(times)
+    return results
+
+
+def bench_startup(repeat):
+    from src.benchmarks.startup import profile
+
+    times = [profile()["import_app_ms"] for _ in range(repeat)]
+    return {"app_startup": summarize(times)}
+
+
+def run(args):
+    os.chdir(PROJECT_DIR)
+    os.environ.setdefault("LEADERBOARD_MODE", "server")
+    sys.path.insert(0, str(PROJECT_DIR))
+    import app
+
+    if args.scale > 1:
+        scale_app(app, args.scale)
+
+    results = {}
+    results.update(bench_callbacks(app, args.repeat))
+    results.update(bench_pipeline(args.scale, max(1, args.repeat // 2)))
+    if not args.skip_startup:
+        results.update(bench_startup(max(1, args.repeat // 2)))
+
+    report = {
+        "scale": args.scale,
+        "rows": {
+            "players": sum(
+                len(app.leaderboard_for(league, app.default_player_season).df)
+                for league in app.partitions.leagues("players")
+            ),
+            "attendance": len(app.attendance.games),
+        },
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "benchmarks": results,
+    }
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+
+    for name, entry in results.items():
+        payload = entry.get("payload_bytes")
+        print(f"{name:<22}{entry['median_ms']:>10.3f} ms"
+              + (f"{payload:>12,d} B" if payload else ""))
+    print(f"written to {output}")
+
+
+def compare(args):
+    # timings only compare on one machine, so no baseline is committed
+    if not Path(args.baseline).exists():
+        print(f"no baseline at {args.baseline}, comparison skipped; "
+              "store one with `make benchmark_baseline`")
+        return
+    base = json.loads(Path(args.baseline).read_text())["benchmarks"]
+    new = json.loads(Path(args.results).read_text())["benchmarks"]
+    regressions = 0
+    print(f"{'benchmark':<22}{'base ms':>10}{'new ms':>10}{'change':>9}")
+    for name in sorted(set(base) & set(new)):
+        before, after = base[name]["median_ms"], new[name]["median_ms"]
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        b_bytes = base[name].get("payload_bytes")
+        a_bytes = new[name].get("payload_bytes")
+        if b_bytes and a_bytes and a_bytes > b_bytes * (1 + args.threshold):
+            flag += f"  PAYLOAD {b_bytes:,d} -> {a_bytes:,d} B"
+            regressions += 1
+        print(f"{name:<22}{before:>10.3f}{after:>10.3f}{change:>+9.1%}{flag}")
+    for name in sorted(set(base) ^ set(new)):
+        side = "baseline" if name in base else "results"
+        print(f"{name:<22} only in {side}")
+    if regressions:
+        print(f"{regressions} regression(s) above {args.threshold:.0%}")
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("--output",
+                            default=str(BENCHMARK_DIR / "results.json"))
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--scale", type=int, default=1)
+    run_parser.add_argument("--skip-startup", action="store_true")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("results")
+    compare_parser.add_argument("--threshold", type=float, default=0.2,
+                                help="relative slowdown flagged (0.2 = 20%%)")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+""" Streaming, resumable ingestion of WNBA game attendance.
+
+    Promoted from notebooks/WNBA_Attendance.ipynb. Instead of one giant
+    request held in memory, the query is fetched page by page with
+    LIMIT/OFFSET, every record goes through a generator that normalizes its
+    keys, and each page is written as one columnar part per season:
+
+        <out>/season=2019/part-00003/...
+
+    A checkpoint with the next offset is saved after every page, so an
+    interrupted run picks up where it stopped. Memory stays bounded by the
+    page size whatever the size of the result.
+
+        python -m src.data.attendance_ingest data/raw/attendance \\
+            --url http://127.0.0.1:8765/data --csv data/wnba_attendance.csv
+
+    src/data/attendance_server.py serves the same endpoint from a local csv
+    for offline runs.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+from itertools import groupby
+from pathlib import Path
+
+import pandas as pd
+import requests
+
+from src.data.columnar import read_table, write_table
+
+API_URL = "https://api.acrossthetimeline.com/data"
+
+# Games can share a start time, so the ID breaks ties: LIMIT/OFFSET pages
+# of a resumed run must follow the same order as the interrupted one.
+QUERY = (
+    "SELECT CASE WHEN t.Name = 'San Antonio Stars' "
+    "OR t.Name = 'San Antonio Silver Stars' THEN 'San Antonio Stars' "
+    "ELSE t.Name END AS Team, t.`Primary Color` AS Color, g.`Game Type`, "
+    "g.Attendance, YEAR(g.`Start Timestamp`) AS Season, "
+    "g.`Start Timestamp` AS Timestamp, o.Name AS Opponent, g.Arena, g.City, "
+    "g.State, t.Abbreviation AS TeamAbb, o.Abbreviation AS OpponentAbb "
+    "FROM Games g JOIN Teams t ON t.ID = g.`Home Team ID` "
+    "JOIN Teams o ON o.ID = g.`Away Team ID` "
+    "WHERE YEAR(g.`Start Timestamp`) != 2020 AND Attendance IS NOT NULL "
+    "AND `Game Type` != 'Preseason' ORDER BY g.`Start Timestamp`, g.ID"
+)
+
+HEADERS = {
+    "accept": "*/*",
+    "content-type": "text/plain;charset=UTF-8",
+    "origin": "https://acrossthetimeline.com",
+    "referer": "https://acrossthetimeline.com/",
+}
+
+# output columns, in the order of data/wnba_attendance.csv
+COLUMNS = [
+    "team",
+    "attendance",
+    "season",
+    "opponent",
+    "arena",
+    "city",
+    "state",
+    "game_type",
+    "team_abb",
+    "opponent_abb",
+]
+RENAMES = {"game type": "game_type", "teamabb": "team_abb",
+           "opponentabb": "opponent_abb"}
+
+CHECKPOINT = "_checkpoint.json"
+
+
+def fetch_pages(url, page_size, offset=0, session=None):
+    """ Yield (offset, rows) for each page of the attendance query. """
+    session = session or requests.Session()
+    while True:
+        query = f"{QUERY} LIMIT {page_size} OFFSET {offset}"
+        response = session.post(
+            url, headers=HEADERS, data=json.dumps({"queries": [query]}),
+            timeout=60,
+        )
+        response.raise_for_status()
+        rows = response.json()["values"][0]
+        if rows:
+            yield offset, rows
+        if len(rows) < page_size:
+            return
+        offset += len(rows)
+
+
+def normalize_records(rows):
+    """ Lower-case the keys, drop color/timestamp and rename the rest. """
+    for row in rows:
+        record = {key.lower(): value for key, value in row.items()}
+        record = {
+            RENAMES.get(key, key): value for key, value in record.items()
+        }
+        yield {column: record.get(column) for column in COLUMNS}
+
+
+def _query_id(page_size):
+    raw = json.dumps([QUERY, page_size])
+    return hashlib.sha1(raw.encode()).hexdigest()[:12]
+
+
+def load_checkpoint(out_dir, page_size):
+    path = Path(out_dir) / CHECKPOINT
+    if path.exists():
+        checkpoint = json.loads(path.read_text())
+        if checkpoint.get("query") == _query_id(page_size):
+            return checkpoint
+    return {"query": _query_id(page_size), "offset": 0, "rows": 0,
+            "done": False}
+
+
+def save_checkpoint(out_dir, checkpoint):
+    # write then rename so a crash never leaves a half written checkpoint
+    path = Path(out_dir) / CHECKPOINT
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(checkpoint))
+    os.replace(tmp, path)
+
+
+def write_page(out_dir, page, records):
+    """ Write one page of records as one part per season. """
+    frame = pd.DataFrame(records, columns=COLUMNS)
+    for season, rows in frame.groupby("season", sort=False):
+        part = Path(out_dir) / f"season={season}" / f"part-{page:05d}"
+        if part.exists():
+            # left over from an interrupted run of the same page
+            shutil.rmtree(part)
+        write_table(rows.reset_index(drop=True), part)
+    return len(frame)
+
+
+def ingest(out_dir, url=API_URL, page_size=1000, session=None):
+    """ Fetch every page after the last checkpoint into out_dir. """
+    logger = logging.getLogger(__name__)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    checkpoint = load_checkpoint(out_dir, page_size)
+    if checkpoint["done"]:
+        logger.info("ingestion already complete (%d rows)", checkpoint["rows"])
+        return checkpoint
+
+    for offset, rows in fetch_pages(
+        url, page_size, checkpoint["offset"], session
+    ):
+        written = write_page(
+            out_dir, offset // page_size, normalize_records(rows)
+        )
+        checkpoint.update(offset=offset + len(rows),
+                          rows=checkpoint["rows"] + written)
+        save_checkpoint(out_dir, checkpoint)
+        logger.info("page at offset %d: %d rows", offset, written)
+
+    checkpoint["done"] = True
+    save_checkpoint(out_dir, checkpoint)
+    return checkpoint
+
+
+def iter_partitions(out_dir):
+    """ Yield (season, frame) for every written part, season by season. """
+    parts = sorted(
+        Path(out_dir).glob("season=*/part-*"),
+        key=lambda p: (int(p.parent.name.split("=")[1]), p.name),
+    )
+    for season, season_parts in groupby(parts, key=lambda p: p.parent.name):
+        for part in season_parts:
+            yield int(season.split("=")[1]), read_table(part, mmap=False)
+
+
+def export_csv(out_dir, csv_path):
+    """ Stream the partitions into one csv, one part in memory at a time. """
+    with open(csv_path, "w", newline="") as f:
+        header = True
+        for _, frame in iter_partitions(out_dir):
+            frame.to_csv(f, header=header, index=False)
+            header = False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("out_dir")
+    parser.add_argument("--url", default=API_URL)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--csv", help="also export the result to this csv")
+    args = parser.parse_args()
+
+    checkpoint = ingest(args.out_dir, args.url, args.page_size)
+    logging.getLogger(__name__).info("%d rows ingested", checkpoint["rows"])
+    if args.csv:
+        export_csv(args.out_dir, args.csv)
+
+
+if __name__ == "__main__":
+    log_fmt = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    logging.basicConfig(level=logging.INFO, format=log_fmt)
+    main()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+""" Local stand-in for the attendance API used by attendance_ingest.
+
+    Answers POST /data like api.acrossthetimeline.com does for the
+    attendance query, honouring LIMIT/OFFSET, with rows taken from a local
+    csv. --fail-after N makes every request after the N-th fail with a 503,
+    to exercise resuming an interrupted ingestion.
+
+        python -m src.data.attendance_server --port 8765
+"""
+import argparse
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pandas as pd
+
+DEFAULT_CSV = (
+    Path(__file__).resolve().parents[2] / "data" / "wnba_attendance.csv"
+)
+
+PAGING = re.compile(r"LIMIT (\d+)(?: OFFSET (\d+))?\s*$", re.IGNORECASE)
+
+
+def api_records(csv_path=DEFAULT_CSV):
+    """ Rows of the csv shaped like the API response. """
+    df = pd.read_csv(csv_path)
+    return [
+        {
+            "Team": row.team,
+            "Color": None,
+            "Game Type": row.game_type,
+            "Attendance": int(row.attendance),
+            "Season": int(row.season),
+            "Timestamp": None,
+            "Opponent": row.opponent,
+            "Arena": row.arena,
+            "City": row.city,
+            "State": None if pd.isna(row.state) else row.state,
+            "TeamAbb": row.team_abb,
+            "OpponentAbb": row.opponent_abb,
+        }
+        for row in df.itertuples(index=False)
+    ]
+
+
+def make_server(port=8765, csv_path=DEFAULT_CSV, fail_after=None):
+    records = api_records(csv_path)
+    requests_served = [0]
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            with lock:
+                requests_served[0] += 1
+                failing = (fail_after is not None
+                           and requests_served[0] > fail_after)
+            if failing:
+                self.send_error(503, "stand-in failure")
+                return
+            query = json.loads(body)["queries"][0]
+            paging = PAGING.search(query)
+            rows = records
+            if paging:
+                limit, offset = int(paging.group(1)), int(paging.group(2) or 0)
+                rows = records[offset:offset + limit]
+            payload = json.dumps({"values": [rows]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer(("127.0.0.1", port), Handler)
+
+
+def serve_in_thread(port=0, csv_path=DEFAULT_CSV, fail_after=None):
+    """ Start the stand-in in a daemon thread; returns (server, url). """
+    server = make_server(port, csv_path, fail_after)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/data"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--csv", default=DEFAULT_CSV)
+    parser.add_argument("--fail-after", type=int, default=None)
+    args = parser.parse_args()
+    server = make_server(args.port, args.csv, args.fail_after)
+    print(f"serving attendance on http://127.0.0.1:{args.port}/data")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+""" Reader for the csv exports of basketball-reference.com.
+
+    The exports share a few quirks: a UTF-8 BOM before the header, a
+    "</strong" left in the names of highlighted players, "Tm" for the team
+    column of the NBA tables, and in the WNBA tables a header that repeats
+    G and MP (season games and minutes, then the per-game block). read_bbref
+    fixes these on the raw bytes as it streams them to the parser and
+    parses only the wanted columns, so the same call reads the per-game and
+    totals tables of either league. The optional pyarrow package makes the
+    parse multi-threaded.
+"""
+import codecs
+import io
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+
+    ENGINE = "pyarrow"
+except ImportError:
+    ENGINE = "c"
+# pyarrow starts a thread pool per read, which only pays off on big files
+PYARROW_MIN_BYTES = 1 << 20
+
+# columns kept by default, in this order
+COLUMNS = [
+    "Player", "Team", "Pos", "G", "GS", "MP", "FG", "FGA", "FG%", "3P", "3PA",
+    "3P%", "2P", "2PA", "2P%", "FT", "FTA", "FT%", "ORB", "TRB", "AST", "STL",
+    "BLK", "TOV", "PF", "PTS",
+]
+# declared parse types; the rest is left to the parser, which reads the
+# stats as float64 (int64 for the counts of the totals) and the text as
+# object faster than it converts to a declared type
+DTYPES = {"G": "int64", "GS": "int64"}
+# header names of the exports -> our names
+RENAME = {"Tm": "Team"}
+# markup the exports leave in cells
+ARTIFACTS = [b"</strong"]
+# size of the reads of the raw file
+CHUNK_BYTES = 1 << 16
+
+
+def header(line):
+    """ Column names of the header line of an export, renamed. """
+    line = line.decode("utf-8").rstrip("\r\n")
+    return [RENAME.get(name, name) for name in line.split(",")]
+
+
+def resolve_duplicates(names):
+    """ names with every copy of a repeated name but the last replaced by a
+        placeholder. In the WNBA exports the first G and MP are season
+        totals ahead of the per-game G, GS, MP block.
+    """
+    last = {name: i for i, name in enumerate(names)}
+    return [
+        name if last[name] == i else f"_{i}"
+        for i, name in enumerate(names)
+    ]
+
+
+class CleanedRows(io.RawIOBase):
+    """ The lines after the header of an open export, with the ARTIFACTS
+        removed, read CHUNK_BYTES at a time.
+    """
+
+    def __init__(self, f, first=b""):
+        self.f = f
+        self.pending = first
+        self.tail = b""
+        self.done = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self.pending and not self.done:
+            data = self.tail + self.f.read(CHUNK_BYTES)
+            self.done = len(data) == len(self.tail)
+            for artifact in ARTIFACTS:
+                data = data.replace(artifact, b"")
+            # hold back what could be the start of an artifact cut in two
+            keep = 0 if self.done else len(max(ARTIFACTS, key=len)) - 1
+            cut = max(len(data) - keep, 0)
+            self.pending, self.tail = data[:cut], data[cut:]
+        n = min(len(buffer), len(self.pending))
+        buffer[:n] = self.pending[:n]
+        self.pending = self.pending[n:]
+        return n
+
+
+def read_bbref(path, columns=COLUMNS, dtype=None, engine=None):
+    """ Read a basketball-reference export into a DataFrame of columns.
+
+        The file is streamed to the parser: the header line is rewritten
+        without the BOM and with the duplicates resolved, and the markup is
+        removed from the rows chunk by chunk, so only the chosen columns
+        are converted and no copy of the whole file is held. dtype adds to
+        or overrides DTYPES. engine defaults to pyarrow for files of
+        PYARROW_MIN_BYTES or more when it is installed, else pandas' C
+        parser; both give the same frame.
+
+        Raises ValueError if a column is missing from the export.
+    """
+    types = {**DTYPES, **(dtype or {})}
+    columns = list(columns)
+    if engine is None:
+        size = Path(path).stat().st_size
+        engine = ENGINE if size >= PYARROW_MIN_BYTES else "c"
+    with open(path, "rb") as f:
+        line = f.readline()
+        if line.startswith(codecs.BOM_UTF8):
+            line = line[len(codecs.BOM_UTF8):]
+        names = resolve_duplicates(header(line))
+        missing = [name for name in columns if name not in names]
+        if missing:
+            raise ValueError(f"columns {missing} not in {path}")
+        rows = CleanedRows(f, ",".join(names).encode("utf-8") + b"\n")
+        df = pd.read_csv(
+            io.BufferedReader(rows, CHUNK_BYTES),
+            engine=engine,
+            usecols=columns,
+            dtype={name: types[name] for name in columns if name in types},
+        )
+    return df[columns]
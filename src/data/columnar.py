@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.data.schema import PLAYER_SCHEMA, apply_schema
+from src.features.stats_cube import cube_schema
+
+PROJECT_DIR = Path(__file__).resolve().parents[2]
+STORE_DIR = PROJECT_DIR / "data" / "store"
+
+# tables served by the app: store name -> source csv
+TABLES = {
+    name: f"{name}.csv"
+    for name in (
+        "statspergame_salary_wnba_nba_2019",
+        "stats_cube_wnba_nba_2019",
+        "league_revenue",
+        "wnba_attendance",
+    )
+}
+# declared column types of the tables that have one, see src/data/schema.py
+CUBE_SCHEMA = cube_schema(list(PLAYER_SCHEMA)[5:])
+SCHEMAS = {
+    "statspergame_salary_wnba_nba_2019": PLAYER_SCHEMA,
+    "stats_cube_wnba_nba_2019": CUBE_SCHEMA,
+}
+
+
+def write_table(df, directory):
+    """ Write a DataFrame as one .npy file per column plus a manifest.
+
+        Numeric columns are stored with their own dtype so they can be
+        memory-mapped back. Categorical columns are stored as their codes
+        and categories and read back as categoricals. Other text columns
+        are stored as int32 codes and a small array of distinct values.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    columns = []
+    for i, name in enumerate(df.columns):
+        series = df[name]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            np.save(directory / f"{i}.npy", series.cat.codes.to_numpy())
+            np.save(
+                directory / f"{i}.values.npy",
+                np.asarray(series.cat.categories, dtype=str),
+            )
+            columns.append({"name": name, "kind": "categorical"})
+        elif pd.api.types.is_numeric_dtype(series):
+            np.save(directory / f"{i}.npy", series.to_numpy())
+            columns.append({"name": name, "kind": "numeric"})
+        else:
+            codes, uniques = pd.factorize(series)
+            np.save(directory / f"{i}.npy", codes.astype("int32"))
+            np.save(directory / f"{i}.values.npy",
+                    np.asarray(uniques, dtype=str))
+            columns.append({"name": name, "kind": "text"})
+    manifest = {"rows": len(df), "columns": columns}
+    (directory / "manifest.json").write_text(json.dumps(manifest, indent=2))
+
+
+def read_table(directory, mmap=True):
+    """ Load a table written by write_table.
+
+        With mmap=True the numeric columns are views on the files, so every
+        process that opens the same store shares the same pages.
+    """
+    directory = Path(directory)
+    manifest = json.loads((directory / "manifest.json").read_text())
+    mmap_mode = "r" if mmap else None
+    data = {}
+    for i, column in enumerate(manifest["columns"]):
+        values = np.load(directory / f"{i}.npy", mmap_mode=mmap_mode)
+        if column["kind"] == "categorical":
+            # from_codes keeps the memory-mapped codes
+            values = pd.Categorical.from_codes(
+                values, np.load(directory / f"{i}.values.npy").astype(object)
+            )
+        elif column["kind"] == "text":
+            uniques = np.load(directory / f"{i}.values.npy").astype(object)
+            # -1 marks a missing value
+            text = np.append(uniques, np.nan)
+            values = text[np.where(values < 0, len(uniques), values)]
+        data[column["name"]] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def load_table(name, data_dir=PROJECT_DIR / "data", store_dir=STORE_DIR):
+    """ Read a table from the columnar store, or its csv if not built yet. """
+    if (Path(store_dir) / name / "manifest.json").exists():
+        return read_table(Path(store_dir) / name)
+    df = pd.read_csv(Path(data_dir) / TABLES[name])
+    return apply_schema(df, SCHEMAS.get(name, {}))
+
+
+def _trends_key(data_dir):
+    from src.features.trends import TRENDS_VERSION
+    from src.visualization.figure_cache import data_version
+
+    path = Path(data_dir) / TABLES["wnba_attendance"]
+    return f"{TRENDS_VERSION}-{data_version(path)}"
+
+
+def load_trends(data_dir=PROJECT_DIR / "data", store_dir=STORE_DIR):
+    """ The attendance trend table of src/features/trends.py for the
+        current attendance data, read from the store without touching the
+        games. Tables are stored by store_trends in
+        <store_dir>/attendance_trends/<key>, keyed by TRENDS_VERSION and
+        the data version of the attendance csv.
+
+        Never writes: if the store has no table for the current key, the
+        trends are computed in memory and a warning asks for `make store`.
+    """
+    from src.features.trends import attendance_trends
+
+    path = Path(store_dir) / "attendance_trends" / _trends_key(data_dir)
+    if (path / "manifest.json").exists():
+        return read_table(path)
+    logging.getLogger(__name__).warning(
+        "no stored attendance trends for %s, computed in memory; run "
+        "`make store`", path.name,
+    )
+    return attendance_trends(load_table("wnba_attendance", data_dir,
+                                        store_dir))
+
+
+def store_trends(games, data_dir=PROJECT_DIR / "data", store_dir=STORE_DIR):
+    """ Compute the attendance trends of games and store them under the
+        current key, deleting the tables of older keys. Part of the store
+        build, never run by the app.
+    """
+    from src.features.trends import attendance_trends
+
+    directory = Path(store_dir) / "attendance_trends"
+    key = _trends_key(data_dir)
+    trends = attendance_trends(games)
+    # written aside and renamed, so a reader never sees it half done
+    partial = directory / f".{key}"
+    shutil.rmtree(partial, ignore_errors=True)
+    write_table(trends, partial)
+    shutil.rmtree(directory / key, ignore_errors=True)
+    partial.rename(directory / key)
+    for path in directory.iterdir():
+        if path.name != key:
+            shutil.rmtree(path, ignore_errors=True)
+    logging.getLogger(__name__).info("stored attendance trends %s", key)
+    return trends
+
+
+def build_store(data_dir=PROJECT_DIR / "data", store_dir=STORE_DIR):
+    """ Convert every csv served by the app into the columnar store, the
+        player, stats cube and revenue tables into league/season partitions,
+        and store the attendance trends.
+    """
+    from src.data.data_cleaning import SEASON
+    from src.data.partitions import write_partitions
+
+    logger = logging.getLogger(__name__)
+    tables = {}
+    for name, filename in TABLES.items():
+        df = apply_schema(
+            pd.read_csv(Path(data_dir) / filename), SCHEMAS.get(name, {})
+        )
+        tables[name] = df
+        write_table(df, Path(store_dir) / name)
+        logger.info("wrote %s (%d rows) to %s", name, len(df), store_dir)
+
+    partitions = Path(store_dir) / "partitions"
+    write_partitions(
+        tables["statspergame_salary_wnba_nba_2019"], partitions, "players",
+        SEASON,
+    )
+    write_partitions(
+        tables["stats_cube_wnba_nba_2019"], partitions, "stats_cube", SEASON,
+    )
+    write_partitions(
+        tables["league_revenue"], partitions, "revenue", SEASON,
+        league_column="league_name",
+    )
+    logger.info("wrote season %s partitions to %s", SEASON, partitions)
+    store_trends(tables["wnba_attendance"], data_dir, store_dir)
+
+
+if __name__ == "__main__":
+    log_fmt = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    logging.basicConfig(level=logging.INFO, format=log_fmt)
+    build_store()
@@ -1,42 +1,37 @@
-import pandas as pd
-import os
 from pathlib import Path
 
+import pandas as pd
+
+from src.data.bbref import read_bbref
+from src.data.loader import read_csvs
+from src.data.matching import join_on_matches, match_players
+from src.features.stats_cube import cube_frame, league_pace
+
 # data from
 # https://www.basketball-reference.com/leagues/NBA_2019_totals.html#totals
 # https://www.basketball-reference.com/wnba/years/2019_totals.html#totals
 
-# Read datasets
-wnba_salary = pd.read_csv("../../data/cleaned_wnba_player_salary_data.csv")
-nba_salary = pd.read_csv("../../data/cleaned_nba_player_salary_data.csv")
-wnba_stats = pd.read_csv("../../data/WNBA_pergamestats_2019.csv")
-nba_stats = pd.read_csv("../../data/NBA_pergamestats_2019.csv")
-
-# Clean Player names in wnba_stats
-wnba_stats["Player"] = wnba_stats["Player"].str.replace("</strong", "")
-
-# Clean player names in salary dfs
-nba_salary["Player"] = nba_salary["first_name"] + " " + nba_salary["last_name"]
-wnba_salary["Player"] = wnba_salary["first_name"] + " " + wnba_salary["last_name"]
-
-# Join datasets
-nba_complete = (
-    nba_salary.set_index("Player")
-    .join(nba_stats.set_index("Player"), how="inner")
-    .reset_index()
-)
-wnba_complete = (
-    wnba_salary.set_index("Player")
-    .join(wnba_stats.set_index("Player"), how="inner")
-    .reset_index()
-)
-
-# rename teams column in nba df
-nba_complete.rename(columns={"Tm": "Team"}, inplace=True)
-
-# Add league information
-nba_complete["League"] = "NBA"
-wnba_complete["League"] = "WNBA"
+# raw inputs of the merged table
+RAW_FILES = {
+    "wnba_salary": "cleaned_wnba_player_salary_data.csv",
+    "nba_salary": "cleaned_nba_player_salary_data.csv",
+    "wnba_stats": "WNBA_pergamestats_2019.csv",
+    "nba_stats": "NBA_pergamestats_2019.csv",
+    "wnba_totals": "WNBA_totalstats_2019.csv",
+    "nba_totals": "NBA_totalstats_2019.csv",
+}
+OUTPUT_FILE = "statspergame_salary_wnba_nba_2019.csv"
+# per-team rows of the players traded during the season
+SPLITS_FILE = "team_splits_wnba_nba_2019.csv"
+# per-game, totals, per-36 and per-100 stats of the same rows, see
+# src/features/stats_cube.py
+CUBE_FILE = "stats_cube_wnba_nba_2019.csv"
+# league, season and pace (league average possessions per game) of each
+# season, from the league summaries, e.g.
+# https://www.basketball-reference.com/leagues/NBA_2019.html
+# https://www.basketball-reference.com/wnba/years/2019.html
+LEAGUE_SUMMARY_FILE = "league_summary.csv"
+SEASON = 2019
 
 # homogenize columns
 column_names = [
@@ -69,9 +64,145 @@ column_names = [
     "PF",
     "PTS",
 ]
-nba_complete = nba_complete[column_names]
-wnba_complete = wnba_complete[column_names]
+SPLIT_COLUMNS = [name for name in column_names if name != "salary"]
+
+# Team of the season row of a player who played for several teams
+TOTAL_TEAM = "TOT"
+
+# Read hints for the raw inputs: only the columns the join uses, and the
+# salary type up front. Text columns are left to the parser, a str dtype
+# costs an extra pass. The basketball-reference exports go through
+# src/data/bbref.py, which fixes their header and names while reading.
+_salary_options = dict(
+    usecols=["first_name", "last_name", "salary"], dtype={"salary": "int64"}
+)
+_stats_options = dict(columns=["Player", "Team", "Pos"] + column_names[5:])
+RAW_OPTIONS = {
+    "wnba_salary": _salary_options,
+    "nba_salary": _salary_options,
+    "wnba_stats": _stats_options,
+    "nba_stats": _stats_options,
+    "wnba_totals": _stats_options,
+    "nba_totals": _stats_options,
+}
+RAW_READERS = {
+    name: read_bbref
+    for name in ("wnba_stats", "nba_stats", "wnba_totals", "nba_totals")
+}
+
+
+def add_salary_names(salary):
+    # Clean player names in salary dfs
+    salary = salary.copy()
+    salary["Player"] = salary["first_name"] + " " + salary["last_name"]
+    return salary
+
+
+def split_trades(stats):
+    """ (season rows, team splits) of a stats export.
+
+        A player traded during the season has a TOT row plus one row per
+        team. The season rows keep one row per player, the TOT row of the
+        traded ones; the splits hold their per-team rows. Raises ValueError
+        if a player with several rows has no single TOT row.
+    """
+    traded = stats["Player"].duplicated(keep=False).to_numpy()
+    total = (stats["Team"] == TOTAL_TEAM).to_numpy()
+    season = stats[~traded | total]
+    if not season["Player"].is_unique or (
+        len(season) != stats["Player"].nunique()
+    ):
+        names = stats.loc[traded, "Player"]
+        counts = season["Player"].value_counts()
+        bad = sorted(set(names) - set(counts.index[counts == 1]))
+        raise ValueError(f"players without a single {TOTAL_TEAM} row: {bad}")
+    return season, stats[traded & ~total]
+
+
+def join_league(salary, stats, league, matches=None):
+    # Join datasets on normalized names, fuzzy matching the rest; traded
+    # players join through their TOT row and repeated salary rows count
+    # once, so each player is one row
+    season, _ = split_trades(stats)
+    salary = salary.drop_duplicates()
+    if matches is None:
+        matches = match_players(salary["Player"], season["Player"])
+    complete = join_on_matches(salary, season, matches)
+    if not complete["Player"].is_unique or len(complete) > len(salary):
+        raise ValueError(f"{league} join is not one row per player")
+    # Add league information
+    complete["League"] = league
+    return complete[column_names]
+
+
+def join_splits(salary, stats, league, matches=None):
+    # Per-team rows of the traded players, under their salary name
+    _, splits = split_trades(stats)
+    salary = salary.drop_duplicates()
+    if matches is None:
+        matches = match_players(salary["Player"], stats["Player"])
+    complete = join_on_matches(salary, splits, matches, validate="one_to_many")
+    if len(complete) > len(splits):
+        raise ValueError(f"{league} splits join has more rows than splits")
+    complete["League"] = league
+    return complete[SPLIT_COLUMNS]
+
+
+def merge_leagues(nba_complete, wnba_complete):
+    return pd.concat([nba_complete, wnba_complete], ignore_index=True)
+
+
+def stats_cube(merged, totals, summary, season=SEASON):
+    # totals is merge_leagues of the totals files joined like the per-game
+    # ones, so its rows are the players of merged in the same order
+    return cube_frame(merged, totals, column_names[5:],
+                      league_pace(summary, season))
+
+
+if __name__ == "__main__":
+    # Read datasets
+    raw = read_csvs(
+        {
+            name: "../../data/" + filename
+            for name, filename in RAW_FILES.items()
+        },
+        RAW_OPTIONS,
+        readers=RAW_READERS,
+    )
+    wnba_salary, nba_salary = raw["wnba_salary"], raw["nba_salary"]
+    wnba_stats, nba_stats = raw["wnba_stats"], raw["nba_stats"]
+    nba_salary = add_salary_names(nba_salary)
+    wnba_salary = add_salary_names(wnba_salary)
+    nba_matches = match_players(nba_salary["Player"], nba_stats["Player"])
+    wnba_matches = match_players(wnba_salary["Player"], wnba_stats["Player"])
+
+    nba_wnba = merge_leagues(
+        join_league(nba_salary, nba_stats, "NBA", nba_matches),
+        join_league(wnba_salary, wnba_stats, "WNBA", wnba_matches),
+    )
+
+    nba_wnba.to_csv("../../data/" + OUTPUT_FILE, index=False)
+    merge_leagues(
+        join_splits(nba_salary, nba_stats, "NBA", nba_matches),
+        join_splits(wnba_salary, wnba_stats, "WNBA", wnba_matches),
+    ).to_csv("../../data/" + SPLITS_FILE, index=False)
+
+    # the totals files have the same players, joined with the same matches
+    totals = merge_leagues(
+        join_league(nba_salary, raw["nba_totals"], "NBA", nba_matches),
+        join_league(wnba_salary, raw["wnba_totals"], "WNBA", wnba_matches),
+    )
+    summary = pd.read_csv("../../data/" + LEAGUE_SUMMARY_FILE)
+    stats_cube(nba_wnba, totals, summary).to_csv(
+        "../../data/" + CUBE_FILE, index=False
+    )
 
-nba_wnba = pd.concat([nba_complete, wnba_complete])
+    # Columnar copies that the app memory-maps, in the compact schema and
+    # with their season partitions, as the pipeline writes them (imported
+    # here, src/data/pipeline.py imports this module)
+    from src.data.pipeline import write_store
 
-nba_wnba.to_csv("../../data/statspergame_salary_wnba_nba_2019.csv", index=False)
\ No newline at end of file
+    data_dir = Path("../../data")
+    write_store(
+        data_dir / OUTPUT_FILE, data_dir / CUBE_FILE, data_dir / "store"
+    )
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def default_workers(tasks):
+    return max(1, min(len(tasks), (os.cpu_count() or 1) + 4))
+
+
+def run_concurrently(tasks, max_workers=None, label="inputs"):
+    """ Call every function of the {name: function} dict in a thread pool
+        and return {name: result}.
+
+        The functions are independent reads: while one waits on the disk
+        another parses, and pandas' csv parser and numpy release the GIL for
+        most of their work. The wall time and the time of each task are
+        logged, along with their sum, i.e. what a serial run would take.
+    """
+    if not tasks:
+        return {}
+    timings = {}
+
+    def timed(name, func):
+        start = time.perf_counter()
+        result = func()
+        timings[name] = round((time.perf_counter() - start) * 1000, 2)
+        return result
+
+    start = time.perf_counter()
+    workers = max_workers or default_workers(tasks)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            name: pool.submit(timed, name, func)
+            for name, func in tasks.items()
+        }
+        results = {name: future.result() for name, future in futures.items()}
+    wall = (time.perf_counter() - start) * 1000
+    logger.info(
+        "loaded %d %s in %.1f ms (%.1f ms serial) with %d threads",
+        len(tasks), label, wall, sum(timings.values()), workers,
+        extra={"timings_ms": timings},
+    )
+    return results
+
+
+def read_csvs(paths, options=None, max_workers=None, readers=None):
+    """ Read the {name: path} csv files concurrently into {name: DataFrame}.
+
+        options maps a name to extra read_csv arguments, typically usecols
+        and dtype so the parser skips unused columns and type inference.
+        readers maps a name to another read function taking the path and
+        its options, e.g. src.data.bbref.read_bbref.
+    """
+    options = options or {}
+    readers = readers or {}
+    return run_concurrently(
+        {
+            name: (lambda path=Path(path), kw=options.get(name, {}),
+                   read=readers.get(name, pd.read_csv): read(path, **kw))
+            for name, path in paths.items()
+        },
+        max_workers=max_workers,
+        label="csv files",
+    )
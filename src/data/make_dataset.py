@@ -4,16 +4,26 @@ import logging
 from pathlib import Path
 from dotenv import find_dotenv, load_dotenv
 
+from src.data.pipeline import run_pipeline
+
 
 @click.command()
 @click.argument('input_filepath', type=click.Path(exists=True))
 @click.argument('output_filepath', type=click.Path())
-def main(input_filepath, output_filepath):
+@click.option('--force', is_flag=True, help='Rebuild every stage.')
+@click.option('--sql-url', default=None,
+              help='Also load the tables into this SQLite store.')
+def main(input_filepath, output_filepath, force, sql_url):
     """ Runs data processing scripts to turn raw data from (../raw) into
         cleaned data ready to be analyzed (saved in ../processed).
+
+        Inputs are fingerprinted by content and intermediate stages are
+        cached in <output_filepath>/interim, so only the stages whose inputs
+        changed are rebuilt.
     """
     logger = logging.getLogger(__name__)
     logger.info('making final data set from raw data')
+    run_pipeline(input_filepath, output_filepath, force=force, sql_url=sql_url)
 
 
 if __name__ == '__main__':
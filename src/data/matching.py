@@ -0,0 +1,157 @@
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+import numpy as np
+import pandas as pd
+
+# generational suffixes dropped from the match key
+SUFFIXES = r"\b(?:jr|sr|ii|iii|iv|v)\b"
+
+# minimum similarity for a fuzzy match
+FUZZY_THRESHOLD = 0.9
+
+# score of a name whose tokens all appear, in order, in the other one
+# ("luc mbah" in "luc mbah a moute", "elena donne" in "elena delle donne")
+CONTAINED_SCORE = 0.95
+
+
+def normalize_names(names):
+    """ Match key of each name: accents folded to ascii, lower case,
+        punctuation and suffixes removed, whitespace collapsed.
+
+        "Álex Abrines" -> "alex abrines", "Wendell Carter Jr." ->
+        "wendell carter", "D'Angelo Russell" -> "dangelo russell"
+    """
+    return (
+        pd.Series(names, dtype="object")
+        .str.normalize("NFKD")
+        .str.encode("ascii", "ignore")
+        .str.decode("ascii")
+        .str.lower()
+        .str.replace(r"[.'`]", "", regex=True)
+        .str.replace(r"[^a-z0-9]+", " ", regex=True)
+        .str.replace(SUFFIXES, "", regex=True)
+        .str.replace(r"\s+", " ", regex=True)
+        .str.strip()
+    )
+
+
+def _blocks(key):
+    # candidates share the first or the last token of the key
+    tokens = key.split()
+    return {("first", tokens[0]), ("last", tokens[-1])} if tokens else set()
+
+
+def _contained(short, long):
+    tokens = iter(long)
+    return all(token in tokens for token in short)
+
+
+def similarity(a, b):
+    """ Similarity of two match keys between 0 and 1.
+
+        Keys must start with the same letter. A key of two or more tokens
+        whose tokens all appear in order in a longer key with the same
+        first token scores CONTAINED_SCORE, whatever the last tokens;
+        otherwise the difflib ratio of the keys is used.
+    """
+    if not a or not b or a[0] != b[0]:
+        return 0.0
+    short, long = sorted([a.split(), b.split()], key=len)
+    if (2 <= len(short) < len(long) and short[0] == long[0]
+            and _contained(short, long)):
+        return CONTAINED_SCORE
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def _fuzzy(left_keys, right_keys, threshold):
+    """ One-to-one fuzzy pairs between two lists of keys.
+
+        Only keys sharing a block are compared, so the cost grows with the
+        block sizes instead of len(left) * len(right).
+    """
+    index = defaultdict(list)
+    for j, key in enumerate(right_keys):
+        for block in _blocks(key):
+            index[block].append(j)
+
+    scored = []
+    for i, key in enumerate(left_keys):
+        candidates = {j for block in _blocks(key) for j in index[block]}
+        for j in candidates:
+            score = similarity(key, right_keys[j])
+            if score >= threshold:
+                scored.append((score, i, j))
+
+    # best scores first, each name used once
+    pairs, used_left, used_right = [], set(), set()
+    for score, i, j in sorted(scored, reverse=True):
+        if i not in used_left and j not in used_right:
+            pairs.append((i, j, score))
+            used_left.add(i)
+            used_right.add(j)
+    return pairs
+
+
+def match_players(left_names, right_names, threshold=FUZZY_THRESHOLD):
+    """ Match report between two lists of player names.
+
+        Names are joined on their normalized key with a hash join; the names
+        still unmatched on both sides then go through a blocked fuzzy match.
+        Returns one row per distinct left name with the matched right name,
+        the method ("exact", "normalized", "fuzzy" or "unmatched") and a
+        similarity score.
+    """
+    left = pd.Series(pd.unique(pd.Series(left_names).dropna()),
+                     dtype="object")
+    right = pd.Series(pd.unique(pd.Series(right_names).dropna()),
+                      dtype="object")
+    left_keys = normalize_names(left)
+    right_keys = normalize_names(right)
+
+    # hash join on the key, first right name wins on a key collision
+    by_key = (
+        pd.Series(right.to_numpy(), index=right_keys)
+        .groupby(level=0)
+        .first()
+    )
+    matched = left_keys.map(by_key)
+    report = pd.DataFrame({
+        "name": left,
+        "key": left_keys,
+        "match": matched,
+        "method": np.where(
+            matched.isna(), "unmatched",
+            np.where(matched == left, "exact", "normalized"),
+        ),
+        "score": np.where(matched.isna(), np.nan, 1.0),
+    })
+
+    todo = report.index[report["match"].isna()]
+    free = ~right_keys.isin(set(left_keys[report["match"].notna()]))
+    free_names = right[free].to_numpy()
+    free_keys = right_keys[free].tolist()
+    for i, j, score in _fuzzy(left_keys[todo].tolist(), free_keys, threshold):
+        row = todo[i]
+        report.loc[row, ["match", "method", "score"]] = [
+            free_names[j], "fuzzy", round(score, 3)
+        ]
+    return report
+
+
+def join_on_matches(left, right, matches, on="Player", validate="many_to_one"):
+    """ Inner join of two frames through a match report; the joined rows
+        keep the left name.
+
+        validate is checked on the join with right, as in DataFrame.merge:
+        by default a name may have one right row only, so the join cannot
+        multiply rows. A repeated name raises pandas' MergeError.
+    """
+    pairs = matches.loc[matches["method"] != "unmatched", ["name", "match"]]
+    joined = left.merge(
+        pairs, left_on=on, right_on="name", validate="many_to_one"
+    ).drop(columns="name")
+    joined = joined.merge(
+        right.rename(columns={on: "match"}), on="match", validate=validate
+    ).drop(columns="match")
+    return joined.sort_values(on, kind="stable").reset_index(drop=True)
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from src.data.columnar import STORE_DIR, read_table, write_table
+
+PARTITION_DIR = STORE_DIR / "partitions"
+
+
+def partition_path(root, table, league, season):
+    return Path(root) / table / f"league={league}" / f"season={season}"
+
+
+def write_partitions(df, root, table, season, league_column="League"):
+    """ Write one columnar partition per league of df for a season. """
+    for league, rows in df.groupby(league_column, sort=False, observed=True):
+        write_table(
+            rows.reset_index(drop=True),
+            partition_path(root, table, league, season),
+        )
+
+
+class PartitionStore:
+    """ Tables partitioned by league and season, loaded on demand.
+
+        Only the partitions a caller asks for are read, memory-mapped, and
+        at most max_partitions of them stay referenced, least recently used
+        first out. Adding seasons on disk adds no resident memory until a
+        season is requested.
+    """
+
+    def __init__(self, root=PARTITION_DIR, max_partitions=16):
+        self.root = Path(root)
+        self.max_partitions = max_partitions
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._index = None
+
+    def _scan(self):
+        # {table: {league: sorted seasons}}, listed once
+        if self._index is None:
+            index = {}
+            for path in self.root.glob("*/league=*/season=*"):
+                league = path.parent.name.split("=", 1)[1]
+                season = int(path.name.split("=", 1)[1])
+                table = path.parent.parent.name
+                by_league = index.setdefault(table, {})
+                by_league.setdefault(league, []).append(season)
+            for leagues in index.values():
+                for seasons in leagues.values():
+                    seasons.sort()
+            self._index = index
+        return self._index
+
+    def leagues(self, table):
+        return sorted(self._scan().get(table, {}))
+
+    def seasons(self, table, league=None):
+        """ Seasons of a table, for one league or for any league. """
+        leagues = self._scan().get(table, {})
+        if league is not None:
+            return list(leagues.get(league, []))
+        return sorted({s for seasons in leagues.values() for s in seasons})
+
+    def has(self, table, league, season):
+        return season in self._scan().get(table, {}).get(league, [])
+
+    def get(self, table, league, season):
+        """ The partition as a DataFrame; KeyError if it does not exist. """
+        key = (table, league, season)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        if not self.has(table, league, season):
+            raise KeyError(key)
+        df = read_table(partition_path(self.root, table, league, season))
+        with self._lock:
+            self._cache[key] = df
+            while len(self._cache) > self.max_partitions:
+                self._cache.popitem(last=False)
+        return df
+
+    def cached(self):
+        """ Keys of the partitions currently held in memory. """
+        with self._lock:
+            return list(self._cache)
@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+import functools
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+import pandas as pd
+
+from src.data import data_cleaning
+from src.data.columnar import CUBE_SCHEMA, read_table, write_table
+from src.data.loader import read_csvs
+from src.data.matching import match_players
+from src.data.partitions import write_partitions
+from src.data.schema import apply_schema
+
+# bump when a stage's code changes so its cached output is rebuilt
+PIPELINE_VERSION = "6"
+
+
+def file_hash(path):
+    """ Content hash of a file, read in chunks. """
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def stage_key(name, *input_keys):
+    raw = json.dumps([name, PIPELINE_VERSION, list(input_keys)])
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+class StageCache:
+    """ Stage outputs stored in the columnar format, keyed by input hashes.
+
+        A stage's key is derived from the keys of its inputs only, so the
+        whole graph of keys is known before anything is read. A stage whose
+        key is already in the cache is loaded from disk and its build
+        function, including any upstream stages it would read, never runs.
+        Within a run each stage is loaded or built once and then served
+        from memory, however many downstream stages read it.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.ran = []
+        self.reused = []
+        self.frames = {}
+
+    def has(self, name, key):
+        return (self.directory / name / key / "manifest.json").exists()
+
+    def get(self, name, key, build):
+        if (name, key) in self.frames:
+            return self.frames[name, key]
+        path = self.directory / name / key
+        if self.has(name, key):
+            self.reused.append(name)
+            df = read_table(path, mmap=False)
+        else:
+            df = build()
+            write_table(df, path)
+            self.ran.append(name)
+        self.frames[name, key] = df
+        return df
+
+    def prune(self, keep):
+        """ Delete cached outputs whose key is not in keep. """
+        for path in self.directory.glob("*/*"):
+            if path.name not in keep:
+                for f in path.iterdir():
+                    f.unlink()
+                path.rmdir()
+
+
+def stage_keys(raw_keys, summary_key):
+    """ {stage: key} of every stage, from the hashes of the raw inputs and
+        of the league summary.
+    """
+    keys = {
+        "wnba_salary_names": stage_key("names", raw_keys["wnba_salary"]),
+        "nba_salary_names": stage_key("names", raw_keys["nba_salary"]),
+    }
+    keys["nba_matches"] = stage_key(
+        "matches", keys["nba_salary_names"], raw_keys["nba_stats"]
+    )
+    keys["wnba_matches"] = stage_key(
+        "matches", keys["wnba_salary_names"], raw_keys["wnba_stats"]
+    )
+    keys["nba_joined"] = stage_key(
+        "join", keys["nba_matches"], keys["nba_salary_names"],
+        raw_keys["nba_stats"], "NBA",
+    )
+    keys["wnba_joined"] = stage_key(
+        "join", keys["wnba_matches"], keys["wnba_salary_names"],
+        raw_keys["wnba_stats"], "WNBA",
+    )
+    keys["merged"] = stage_key(
+        "merge", keys["nba_joined"], keys["wnba_joined"]
+    )
+    # the totals files list the same players as the per-game files, so
+    # they are joined with the same matches
+    keys["nba_totals_joined"] = stage_key(
+        "join", keys["nba_matches"], keys["nba_salary_names"],
+        raw_keys["nba_totals"], "NBA",
+    )
+    keys["wnba_totals_joined"] = stage_key(
+        "join", keys["wnba_matches"], keys["wnba_salary_names"],
+        raw_keys["wnba_totals"], "WNBA",
+    )
+    keys["cube"] = stage_key(
+        "cube", keys["merged"], keys["nba_totals_joined"],
+        keys["wnba_totals_joined"], summary_key,
+    )
+    # per-team rows of the traded players, left out of the joined tables
+    keys["nba_splits"] = stage_key(
+        "splits", keys["nba_matches"], keys["nba_salary_names"],
+        raw_keys["nba_stats"], "NBA",
+    )
+    keys["wnba_splits"] = stage_key(
+        "splits", keys["wnba_matches"], keys["wnba_salary_names"],
+        raw_keys["wnba_stats"], "WNBA",
+    )
+    keys["splits"] = stage_key(
+        "merge", keys["nba_splits"], keys["wnba_splits"]
+    )
+    return keys
+
+
+class RawInputs:
+    """ The raw input frames by name, each read on first use. Inputs read
+        ahead, see read_rebuilt_inputs, are put in frames.
+    """
+
+    def __init__(self, paths):
+        self.paths = paths
+        self.frames = {}
+
+    def __call__(self, source):
+        if source not in self.frames:
+            read = data_cleaning.RAW_READERS.get(source, pd.read_csv)
+            self.frames[source] = read(
+                self.paths[source], **data_cleaning.RAW_OPTIONS[source]
+            )
+        return self.frames[source]
+
+
+# raw input -> the stages that read it
+RAW_READERS = {
+    "wnba_salary": ["wnba_salary_names"],
+    "nba_salary": ["nba_salary_names"],
+    "wnba_stats": ["wnba_matches", "wnba_joined", "wnba_splits"],
+    "nba_stats": ["nba_matches", "nba_joined", "nba_splits"],
+    "wnba_totals": ["wnba_totals_joined"],
+    "nba_totals": ["nba_totals_joined"],
+}
+
+
+def read_rebuilt_inputs(cache, keys, raw):
+    """ Read the raw inputs of every stage that will rebuild at once, in a
+        thread pool, rather than one by one as the stages ask for them.
+    """
+    return read_csvs(
+        {
+            source: raw[source]
+            for source, stages in RAW_READERS.items()
+            if not all(cache.has(stage, keys[stage]) for stage in stages)
+        },
+        data_cleaning.RAW_OPTIONS,
+        readers=data_cleaning.RAW_READERS,
+    )
+
+
+def run_pipeline(input_dir, output_dir, cache_dir=None, force=False,
+                 sql_url=None):
+    """ Build the merged player table, rerunning only the stages whose
+        inputs changed since the last run.
+
+        Stages: cleaned names of each salary input, the player matches of
+        each league, the joined per-game and totals tables of each league,
+        the final merged table and its stats cube (per 100 possessions at
+        the pace of the input league_summary.csv), and the team splits of
+        the traded players. The stats exports are read with
+        src/data/bbref.py.
+        The match reports are also written to <output_dir>/interim. With
+        sql_url the season's players, revenue and the attendance table are
+        also written to that SQLite store (src/data/sqlstore.py). Returns
+        the StageCache with the names of the stages that ran and the ones
+        reused.
+    """
+    logger = logging.getLogger(__name__)
+    input_dir, output_dir = Path(input_dir), Path(output_dir)
+    (output_dir / "interim").mkdir(parents=True, exist_ok=True)
+    cache = StageCache(cache_dir or output_dir / "interim" / "pipeline")
+
+    raw = {
+        name: input_dir / filename
+        for name, filename in data_cleaning.RAW_FILES.items()
+    }
+    raw_keys = {name: file_hash(path) for name, path in raw.items()}
+    summary = input_dir / data_cleaning.LEAGUE_SUMMARY_FILE
+
+    keys = stage_keys(raw_keys, file_hash(summary))
+    if force:
+        cache.prune(keep=set())
+
+    read_raw = RawInputs(raw)
+
+    def names(stage, source):
+        return lambda: cache.get(stage, keys[stage], lambda: (
+            data_cleaning.add_salary_names(read_raw(source))
+        ))
+
+    wnba_salary = names("wnba_salary_names", "wnba_salary")
+    nba_salary = names("nba_salary_names", "nba_salary")
+    wnba_stats = functools.partial(read_raw, "wnba_stats")
+    nba_stats = functools.partial(read_raw, "nba_stats")
+
+    def matches(league, salary, stats):
+        def build():
+            report = match_players(salary()["Player"], stats()["Player"])
+            report.to_csv(
+                output_dir / "interim" / f"player_matches_{league}.csv",
+                index=False,
+            )
+            return report
+        return lambda: cache.get(
+            f"{league}_matches", keys[f"{league}_matches"], build
+        )
+
+    nba_matches = matches("nba", nba_salary, nba_stats)
+    wnba_matches = matches("wnba", wnba_salary, wnba_stats)
+
+    def joined(stage, join, league, salary, stats, matches):
+        # join is data_cleaning.join_league or join_splits
+        return lambda: cache.get(stage, keys[stage], lambda: (
+            join(salary(), stats(), league, matches())
+        ))
+
+    nba_joined = joined("nba_joined", data_cleaning.join_league, "NBA",
+                        nba_salary, nba_stats, nba_matches)
+    wnba_joined = joined("wnba_joined", data_cleaning.join_league, "WNBA",
+                         wnba_salary, wnba_stats, wnba_matches)
+    # the totals files list the same players as the per-game files, so
+    # they are joined with the same matches
+    nba_totals_joined = joined(
+        "nba_totals_joined", data_cleaning.join_league, "NBA", nba_salary,
+        functools.partial(read_raw, "nba_totals"), nba_matches,
+    )
+    wnba_totals_joined = joined(
+        "wnba_totals_joined", data_cleaning.join_league, "WNBA",
+        wnba_salary, functools.partial(read_raw, "wnba_totals"),
+        wnba_matches,
+    )
+    nba_splits = joined("nba_splits", data_cleaning.join_splits, "NBA",
+                        nba_salary, nba_stats, nba_matches)
+    wnba_splits = joined("wnba_splits", data_cleaning.join_splits, "WNBA",
+                         wnba_salary, wnba_stats, wnba_matches)
+
+    outputs = [
+        output_dir / data_cleaning.OUTPUT_FILE,
+        output_dir / data_cleaning.CUBE_FILE,
+        output_dir / data_cleaning.SPLITS_FILE,
+    ]
+    # the store is generated and not committed, so it may be missing while
+    # the csv outputs are current
+    store_dir = output_dir / "store"
+    stored = [store_dir / "partitions"] + [
+        store_dir / path.stem / "manifest.json" for path in outputs[:2]
+    ]
+    state_file = cache.directory / "state.json"
+    state = json.loads(state_file.read_text()) if state_file.exists() else {}
+    built = {name: keys[name] for name in ("merged", "cube", "splits")}
+    if (not force
+            and all(path.exists() for path in outputs + stored)
+            and all(state.get(name) == key for name, key in built.items())):
+        logger.info("merged table is up to date, nothing to rebuild")
+        return cache
+
+    if not all(cache.has(name, key) for name, key in built.items()):
+        read_raw.frames.update(read_rebuilt_inputs(cache, keys, raw))
+
+    merged = cache.get("merged", keys["merged"], lambda: (
+        data_cleaning.merge_leagues(nba_joined(), wnba_joined())
+    ))
+    cube = cache.get("cube", keys["cube"], lambda: (
+        data_cleaning.stats_cube(
+            merged,
+            data_cleaning.merge_leagues(
+                nba_totals_joined(), wnba_totals_joined()
+            ),
+            pd.read_csv(summary),
+        )
+    ))
+    splits = cache.get("splits", keys["splits"], lambda: (
+        data_cleaning.merge_leagues(nba_splits(), wnba_splits())
+    ))
+    output, cube_output, splits_output = outputs
+    merged.to_csv(output, index=False)
+    cube.to_csv(cube_output, index=False)
+    splits.to_csv(splits_output, index=False)
+    written = write_store(output, cube_output, store_dir)
+    if sql_url:
+        write_sql(sql_url, written, input_dir)
+    state_file.write_text(json.dumps(built))
+    cache.prune(keep=set(keys.values()))
+    logger.info(
+        "wrote %s; ran %s; reused %s",
+        output, cache.ran or "nothing", cache.reused or "nothing",
+    )
+    return cache
+
+
+def write_store(output, cube_output, store_dir):
+    """ Columnar copies of the merged table and the cube that the app
+        memory-maps, in the compact schema, and their season partitions.
+        Returns the merged table as written.
+    """
+    written = apply_schema(pd.read_csv(output))
+    write_table(written, store_dir / output.stem)
+    cube = apply_schema(pd.read_csv(cube_output), CUBE_SCHEMA)
+    write_table(cube, store_dir / cube_output.stem)
+    for table, df in (("players", written), ("stats_cube", cube)):
+        write_partitions(
+            df, store_dir / "partitions", table, data_cleaning.SEASON,
+        )
+    return written
+
+
+def write_sql(sql_url, players, input_dir):
+    """ Load a season of the app tables into the indexed SQLite store. """
+    from src.data.columnar import TABLES
+    from src.data.sqlstore import create_indexes, make_engine, write_season
+
+    engine = make_engine(sql_url)
+    write_season(engine, "players", players, data_cleaning.SEASON)
+    revenue = Path(input_dir) / TABLES["league_revenue"]
+    if revenue.exists():
+        write_season(
+            engine, "revenue", pd.read_csv(revenue), data_cleaning.SEASON
+        )
+    attendance = Path(input_dir) / TABLES["wnba_attendance"]
+    if attendance.exists():
+        with engine.begin() as conn:
+            pd.read_csv(attendance).to_sql(
+                "attendance", conn, if_exists="replace", index=False
+            )
+        create_indexes(engine)
+    engine.dispose()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+""" Declared column types of the merged player table.
+
+    Applied when the table is written to the store and when it is loaded
+    from csv, so every worker holds the compact types. Running the module
+    prints the memory of the table with the default csv types and with the
+    schema, per worker and for --workers workers.
+
+        python -m src.data.schema --workers 4
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# games fit in int16, salaries in int32, the rest of the stats are averages
+# and percentages that float32 holds to well beyond their 3 decimals
+PLAYER_SCHEMA = {
+    "Player": "object",
+    "League": "category",
+    "Team": "category",
+    "Pos": "category",
+    "salary": "int32",
+    "G": "int16",
+    "GS": "int16",
+    **{
+        stat: "float32"
+        for stat in [
+            "MP", "FG", "FGA", "FG%", "3P", "3PA", "3P%", "2P", "2PA", "2P%",
+            "FT", "FTA", "FT%", "ORB", "TRB", "AST", "STL", "BLK", "TOV",
+            "PF", "PTS",
+        ]
+    },
+}
+
+
+def apply_schema(df, schema=PLAYER_SCHEMA):
+    """ Cast the columns of df named in schema to their declared type.
+
+        Raises ValueError if an integer column has values the declared type
+        cannot hold, rather than letting them wrap around.
+    """
+    casts = {}
+    for name, dtype in schema.items():
+        if name not in df or df[name].dtype == dtype:
+            continue
+        if dtype != "category" and np.issubdtype(np.dtype(dtype), np.integer):
+            values, info = df[name], np.iinfo(dtype)
+            if values.isna().any() or not (
+                info.min <= values.min() and values.max() <= info.max
+            ):
+                raise ValueError(f"{name} does not fit in {dtype}")
+        casts[name] = dtype
+    return df.astype(casts) if casts else df
+
+
+def memory_bytes(df):
+    """ Bytes of each column, counting the Python strings it references. """
+    return df.memory_usage(index=False, deep=True)
+
+
+def memory_report(df, schema=PLAYER_SCHEMA):
+    """ Per-column bytes of df as read and with the schema applied. """
+    report = pd.DataFrame({
+        "dtype": df.dtypes.astype(str),
+        "bytes": memory_bytes(df),
+        "schema_dtype": apply_schema(df, schema).dtypes.astype(str),
+        "schema_bytes": memory_bytes(apply_schema(df, schema)),
+    })
+    report.loc["total"] = ["", report["bytes"].sum(), "",
+                           report["schema_bytes"].sum()]
+    return report
+
+
+def main():
+    from src.data import data_cleaning
+    from src.data.columnar import PROJECT_DIR
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int,
+                        default=int(os.environ.get("WEB_CONCURRENCY", 4)))
+    args = parser.parse_args()
+
+    df = pd.read_csv(PROJECT_DIR / "data" / data_cleaning.OUTPUT_FILE)
+    report = memory_report(df)
+    print(report.to_string())
+    before, after = report.loc["total", ["bytes", "schema_bytes"]]
+    print(f"\nper worker: {before:,d} -> {after:,d} bytes "
+          f"({1 - after / before:.0%} less)")
+    print(f"{args.workers} workers: {before * args.workers:,d} -> "
+          f"{after * args.workers:,d} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+""" Optional SQLite copy of the app tables, queried through SQLAlchemy.
+
+    players and revenue hold every season of the partitioned store with a
+    season column, attendance every game. players is indexed on (season,
+    League, <stat>) for every stat, so a top-N query reads N index entries;
+    attendance on (season, team). The app uses it with DATA_BACKEND=sqlite,
+    so the tables stay on disk instead of in every worker.
+
+        python -m src.data.sqlstore [--url sqlite:///path.sqlite]
+"""
+import argparse
+import functools
+import logging
+import os
+import threading
+
+import pandas as pd
+from sqlalchemy import create_engine, inspect, text
+
+from src.data.columnar import STORE_DIR, load_table
+from src.data.partitions import PARTITION_DIR, PartitionStore
+from src.data.schema import PLAYER_SCHEMA, apply_schema
+from src.features.attendance import team_overview
+
+DEFAULT_URL = "sqlite:///" + str(STORE_DIR / "wnba_nba.sqlite")
+
+# columns that are not stats in the players table
+PLAYER_KEYS = ["Player", "League", "Team", "Pos", "salary", "season"]
+
+
+def make_engine(url=DEFAULT_URL, pool_size=5):
+    """ Engine with a pool of pool_size connections, usable from any of the
+        callback threads.
+    """
+    return create_engine(
+        url,
+        pool_size=pool_size,
+        max_overflow=pool_size,
+        connect_args={"check_same_thread": False},
+    )
+
+
+def create_indexes(engine):
+    with engine.begin() as conn:
+        tables = inspect(conn).get_table_names()
+        if "players" in tables:
+            stats = [
+                column["name"]
+                for column in inspect(conn).get_columns("players")
+                if column["name"] not in PLAYER_KEYS
+            ]
+            # stat names such as FG% are not valid index names
+            for i, stat in enumerate(stats):
+                conn.execute(text(
+                    f'CREATE INDEX IF NOT EXISTS ix_players_{i} '
+                    f'ON players (season, League, "{stat}")'
+                ))
+        if "revenue" in tables:
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_revenue "
+                "ON revenue (season, league_name)"
+            ))
+        if "attendance" in tables:
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_attendance "
+                "ON attendance (season, team)"
+            ))
+
+
+def write_season(engine, table, df, season):
+    """ Replace the rows of one season of a table with df. """
+    df = df.assign(season=season)
+    with engine.begin() as conn:
+        if inspect(conn).has_table(table):
+            conn.execute(
+                text(f"DELETE FROM {table} WHERE season = :season"),
+                {"season": season},
+            )
+        df.to_sql(table, conn, if_exists="append", index=False)
+    create_indexes(engine)
+
+
+def build_sql_store(url=DEFAULT_URL, partition_dir=PARTITION_DIR,
+                    store_dir=STORE_DIR):
+    """ Write every partitioned season and the attendance table to url. """
+    logger = logging.getLogger(__name__)
+    engine = make_engine(url)
+    partitions = PartitionStore(partition_dir)
+    with engine.begin() as conn:
+        for table in ("players", "revenue", "attendance"):
+            conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+    for table in ("players", "revenue"):
+        for league in partitions.leagues(table):
+            for season in partitions.seasons(table, league):
+                df = partitions.get(table, league, season)
+                with engine.begin() as conn:
+                    df.assign(season=season).to_sql(
+                        table, conn, if_exists="append", index=False
+                    )
+    attendance = load_table("wnba_attendance", store_dir=store_dir)
+    with engine.begin() as conn:
+        attendance.to_sql("attendance", conn, if_exists="replace", index=False)
+    create_indexes(engine)
+    logger.info("wrote players, revenue and attendance to %s", url)
+    engine.dispose()
+
+
+class SqlBackend:
+    """ The queries of the callbacks, run against the SQLite store.
+
+        Connections come from a pool per process: an engine created before
+        a fork is replaced in the child rather than shared with it.
+    """
+
+    def __init__(self, url=DEFAULT_URL, pool_size=5):
+        self.url = url
+        self.pool_size = pool_size
+        self._engine = None
+        self._pid = None
+        self._lock = threading.Lock()
+        with self.engine.connect() as conn:
+            columns = inspect(conn).get_columns("players")
+        self.stats = [
+            c["name"] for c in columns if c["name"] not in PLAYER_KEYS
+        ]
+        self.attendance = SqlAttendance(self)
+
+    @property
+    def engine(self):
+        with self._lock:
+            if self._engine is None or self._pid != os.getpid():
+                self._engine = make_engine(self.url, self.pool_size)
+                self._pid = os.getpid()
+            return self._engine
+
+    def query(self, sql, **params):
+        with self.engine.connect() as conn:
+            return pd.read_sql(text(sql), conn, params=params)
+
+    def top_players(self, leagues, stat, season, n=10):
+        """ Top n players of each league by stat, like app.top_players. """
+        if stat not in self.stats:
+            raise ValueError(f"unknown stat {stat!r}")
+        frames = [
+            self.query(
+                f'SELECT Player, League, Team, Pos, salary, "{stat}" '
+                f"FROM players WHERE season = :season AND League = :league "
+                f'ORDER BY "{stat}" DESC LIMIT :n',
+                season=season, league=league, n=n,
+            )
+            for league in leagues
+        ]
+        return apply_schema(pd.concat(frames, ignore_index=True),
+                            PLAYER_SCHEMA)
+
+
+class SqlAttendance:
+    """ The AttendanceCube interface (seasons, teams, slice, overview) over
+        SQL.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.seasons = backend.query(
+            "SELECT DISTINCT season FROM attendance "
+            "WHERE game_type != 'All star' ORDER BY season"
+        )["season"].tolist()
+
+    @functools.lru_cache(maxsize=None)
+    def teams(self, season):
+        return self.backend.query(
+            "SELECT DISTINCT team FROM attendance WHERE season = :season "
+            "AND game_type != 'All star' ORDER BY team",
+            season=season,
+        )["team"].tolist()
+
+    def slice(self, season, team=None):
+        """ Games of one team in a season, or of every team, in the order of
+            AttendanceCube.slice.
+        """
+        where = "season = :season AND game_type != 'All star'"
+        if team is not None:
+            where += " AND team = :team"
+        return self.backend.query(
+            f"SELECT * FROM attendance WHERE {where} ORDER BY team, rowid",
+            season=season, team=team,
+        )
+
+    @functools.lru_cache(maxsize=None)
+    def overview(self, season):
+        """ AttendanceCube.overview of a season, aggregated from its games
+            once, as SQLite has no median.
+        """
+        return team_overview(self.slice(season))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--url", default=os.environ.get("SQL_STORE_URL", DEFAULT_URL)
+    )
+    args = parser.parse_args()
+    build_sql_store(args.url)
+
+
+if __name__ == "__main__":
+    log_fmt = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    logging.basicConfig(level=logging.INFO, format=log_fmt)
+    main()
@@ -0,0 +1,71 @@
+# per-team attendance of the all-teams overview
+OVERVIEW_STATS = ["mean", "median", "sum", "min", "max", "count"]
+
+
+def team_overview(games, keys=("team",)):
+    """ OVERVIEW_STATS of the attendance of games grouped by keys, one row
+        per group with the keys as columns.
+    """
+    return (
+        games.groupby(list(keys), sort=True, observed=True)["attendance"]
+        .agg(OVERVIEW_STATS)
+        .reset_index()
+    )
+
+
+class AttendanceCube:
+    """ WNBA attendance pre-sliced by season and team.
+
+        Every (season, team) selection, and (season, None) for all teams of a
+        season, is cut once when the data is loaded, so a callback gets its
+        games with a dict lookup instead of masking the whole table. All-star
+        games are left out, as they are not played by a franchise.
+
+        `overview(season)` gives one row of OVERVIEW_STATS per team, also
+        computed at load, for the all-teams chart; the multi-season
+        aggregates are in src/features/trends.py.
+    """
+
+    def __init__(self, df):
+        games = df[df["game_type"] != "All star"].sort_values(
+            ["season", "team"], kind="stable"
+        )
+        self.games = games
+        self.seasons = sorted(games["season"].unique().tolist())
+        overview = team_overview(games, ["season", "team"])
+        self._overview = {
+            season: rows.drop(columns="season").reset_index(drop=True)
+            for season, rows in overview.groupby("season", sort=True)
+        }
+
+        self._slices = {}
+        self._teams = {}
+        for season, season_games in games.groupby("season", sort=True):
+            self._slices[(season, None)] = season_games
+            self._teams[season] = sorted(season_games["team"].unique())
+            for team, team_games in season_games.groupby("team", sort=True):
+                self._slices[(season, team)] = team_games
+        self._empty = games.iloc[0:0]
+        self._no_overview = team_overview(self._empty)
+
+    def teams(self, season):
+        """ Teams that hosted games in a season, alphabetically. """
+        return self._teams.get(season, [])
+
+    def slice(self, season, team=None):
+        """ Games of one team in a season, or of every team if team is
+            None.
+        """
+        return self._slices.get((season, team), self._empty)
+
+    def overview(self, season):
+        """ One row of OVERVIEW_STATS per team of a season. """
+        return self._overview.get(season, self._no_overview)
+
+
+def team_options(teams):
+    return [{"label": team, "value": team} for team in teams]
+
+
+def season_options(seasons):
+    return [{"label": str(season), "value": season} for season in seasons]
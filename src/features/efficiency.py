@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+from src.features.leaderboard import LEAGUES, league_positions
+
+
+def percentile_ranks(values):
+    """ Percentile of every value within its column, 0 for the lowest and
+        100 for the highest, and the median of each column. Tied values
+        share the lowest rank of the tie, NaN stays NaN.
+
+        values is a (players x stats) matrix; all columns are ranked with
+        one argsort over the contiguous (stats x players) transpose.
+    """
+    columns = np.ascontiguousarray(values.T)
+    k, n = columns.shape
+    if n == 0:
+        return np.empty(values.shape, dtype="float32"), np.full(k, np.nan)
+    # argsort puts NaN last, so the first `valid` sorted values are numbers
+    order = np.argsort(columns, axis=1)
+    ordered = np.take_along_axis(columns, order, axis=1)
+    valid = n - np.isnan(columns).sum(axis=1)
+    # the rank of each sorted value is the position where its tie starts
+    starts = np.ones(columns.shape, dtype=bool)
+    starts[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    positions = np.broadcast_to(np.arange(n), columns.shape)
+    sorted_ranks = np.maximum.accumulate(
+        np.where(starts, positions, 0), axis=1
+    )
+    ranks = np.empty(columns.shape, dtype="float64")
+    np.put_along_axis(ranks, order, sorted_ranks, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.where(valid[:, None] > 1, ranks / (valid[:, None] - 1), 1.0)
+    pct[np.isnan(columns)] = np.nan
+
+    # the median sits in the middle of the valid sorted values
+    lower = ordered[np.arange(k), np.maximum(valid - 1, 0) // 2]
+    upper = ordered[np.arange(k), np.minimum(valid // 2, n - 1)]
+    medians = np.where(valid > 0, (lower + upper) / 2, np.nan)
+    return (pct * 100).T.astype("float32"), medians
+
+
+class EfficiencyMatrix:
+    """ Pay against production for every player and stat of a season.
+
+        All matrices are (players x stats), computed with whole-matrix
+        NumPy operations when the roster is loaded:
+
+        salary_per_unit  salary divided by the stat, NaN where it is 0
+        percentiles      within-league percentile of each stat
+        salary_pct       within-league percentile of the salary
+        value_index      stat relative to its league median divided by
+                         salary relative to the league median salary, so
+                         1 means paid like the league's median producer in
+                         either league
+    """
+
+    def __init__(self, df, stats):
+        self.df = df
+        self.stats = list(stats)
+        self._column = {stat: i for i, stat in enumerate(self.stats)}
+        values = df[self.stats].to_numpy(dtype="float64")
+        salary = df["salary"].to_numpy(dtype="float64")
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            per_unit = salary[:, None] / values
+        per_unit[~np.isfinite(per_unit)] = np.nan
+        self.salary_per_unit = per_unit
+
+        shape = values.shape
+        self.percentiles = np.full(shape, np.nan, dtype="float32")
+        self.salary_pct = np.full(len(df), np.nan, dtype="float32")
+        self.value_index = np.full(shape, np.nan, dtype="float32")
+        self.league_medians = {}
+        for league in LEAGUES:
+            rows = league_positions(df["League"], league)
+            if not len(rows):
+                continue
+            league_values = values[rows]
+            self.percentiles[rows], medians = percentile_ranks(league_values)
+            salary_pct, (median_salary,) = percentile_ranks(salary[rows, None])
+            self.salary_pct[rows] = salary_pct[:, 0]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                self.value_index[rows] = (
+                    (league_values / medians)
+                    / (salary[rows, None] / median_salary)
+                )
+            self.league_medians[league] = {
+                "salary": median_salary,
+                "salary_per_unit": percentile_ranks(per_unit[rows])[1],
+            }
+        self.value_index[~np.isfinite(self.value_index)] = np.nan
+
+    def frame(self, stat):
+        """ Players with the metrics of one stat, as a DataFrame. """
+        i = self._column[stat]
+        return pd.DataFrame({
+            "Player": self.df["Player"].to_numpy(),
+            "League": self.df["League"].to_numpy(),
+            "Team": self.df["Team"].to_numpy(),
+            "salary": self.df["salary"].to_numpy(),
+            stat: self.df[stat].to_numpy(),
+            "salary_per_unit": self.salary_per_unit[:, i],
+            "percentile": self.percentiles[:, i],
+            "salary_pct": self.salary_pct,
+            "value_index": self.value_index[:, i],
+        })
+
+    def median_salary_per_unit(self, league, stat):
+        """ League median of salary divided by stat. """
+        medians = self.league_medians[league]["salary_per_unit"]
+        return medians[self._column[stat]]
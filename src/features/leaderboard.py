@@ -0,0 +1,87 @@
+import base64
+
+import numpy as np
+import pandas as pd
+
+LEAGUES = ("WNBA", "NBA")
+
+# columns shown next to the chosen stat in the leaderboard
+PLAYER_COLUMNS = ["Player", "League", "Team", "Pos", "salary"]
+
+
+def league_positions(league, name):
+    """ Row positions of the players of a league. With a categorical League
+        column this compares the integer codes, not the strings.
+    """
+    if isinstance(league.dtype, pd.CategoricalDtype):
+        categories = league.cat.categories
+        if name not in categories:
+            return np.empty(0, dtype=np.intp)
+        codes = league.cat.codes.to_numpy()
+        return np.flatnonzero(codes == categories.get_loc(name))
+    return np.flatnonzero(league.to_numpy() == name)
+
+
+class LeaderboardIndex:
+    """ Sorted player positions for every (league, stat) pair.
+
+        The order is computed once when the data is loaded, so asking for
+        the top N players of a league is a slice of a precomputed array
+        instead of a mask + sort_values on every request.
+    """
+
+    def __init__(self, df, stats, columns=PLAYER_COLUMNS):
+        self.df = df
+        self.stats = list(stats)
+        self.columns = list(columns)
+        self._order = {}
+
+        for name in LEAGUES:
+            positions = league_positions(df["League"], name)
+            for stat in self.stats:
+                values = df[stat].to_numpy(dtype="float64")[positions]
+                # descending order with NaN last, like sort_values
+                order = np.argsort(-values, kind="stable")
+                self._order[(name, stat)] = positions[order]
+
+    def positions(self, league, stat, n=10):
+        """ Row positions of the top n players of a league by stat. """
+        return self._order[(league, stat)][:n]
+
+    def top(self, league, stat, n=10):
+        """ Top n players of a league by stat, best first. """
+        rows = self.positions(league, stat, n)
+        return self.df.iloc[rows][self.columns + [stat]]
+
+    def top_leagues(self, leagues, stat, n=10):
+        """ Top n players of each league, stacked in the given order. """
+        frames = [self.top(league, stat, n) for league in leagues]
+        if len(frames) == 1:
+            return frames[0]
+        return pd.concat(frames, ignore_index=True)
+
+
+def _b64(values):
+    return base64.b64encode(values.tobytes()).decode("ascii")
+
+
+def encode_stat_arrays(df, stats):
+    """ Per-league stat matrix as base64 typed arrays for a dcc.Store.
+
+        For each league the stats are one little-endian Float32Array laid out
+        stat by stat (len(stats) x players), salaries an Int32Array, and the
+        text columns plain lists. The browser decodes these once and ranks
+        players without calling the server.
+    """
+    data = {"stats": list(stats), "leagues": {}}
+    for league in LEAGUES:
+        rows = df.iloc[league_positions(df["League"], league)]
+        values = rows[list(stats)].to_numpy(dtype="<f4").T
+        data["leagues"][league] = {
+            "Player": rows["Player"].tolist(),
+            "Team": rows["Team"].tolist(),
+            "Pos": rows["Pos"].tolist(),
+            "salary": _b64(rows["salary"].to_numpy(dtype="<i4")),
+            "stats": _b64(np.ascontiguousarray(values)),
+        }
+    return data
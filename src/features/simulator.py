@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+# share ratios the slider can take: 5% to 60% in half-point steps
+RATIO_GRID = np.round(np.arange(0.05, 0.6 + 1e-9, 0.005), 3)
+
+
+class SalarySimulator:
+    """ WNBA salaries if the players' share of league revenue were
+        different, against NBA salaries at the same rank.
+
+        The salary pool (revenue x share ratio) is split over every WNBA
+        player in proportion to a basis: the current salary or one of the
+        stats. The salaries of every basis and every ratio of RATIO_GRID
+        are one broadcast product, (bases x ratios x players), computed
+        when the season is loaded for a base revenue; another revenue
+        scales the row linearly. Moving a slider is then a lookup and one
+        multiply, however many users drag it at once.
+    """
+
+    def __init__(self, wnba, nba, revenue, stats, ratios=RATIO_GRID):
+        self.players = wnba[["Player", "Team"]].reset_index(drop=True)
+        self.revenue = float(revenue)
+        self.ratios = np.asarray(ratios, dtype="float64")
+        self.bases = ["salary"] + list(stats)
+        self._basis = {name: i for i, name in enumerate(self.bases)}
+        self.current = wnba["salary"].to_numpy(dtype="float64")
+        self.nba_sorted = np.sort(nba["salary"].to_numpy(dtype="float64"))
+        # the x axis of every frame: rank of each WNBA player as a
+        # percentile, with the current and NBA salaries at that percentile
+        n = len(self.current)
+        self.percentile = np.arange(n) / max(n - 1, 1) * 100
+        self.current_sorted = np.sort(self.current)
+        self.nba = self.nba_equivalent(self.percentile)
+
+        weights = np.nan_to_num(
+            wnba[self.bases].to_numpy(dtype="float64").T, nan=0.0
+        ).clip(min=0)
+        totals = weights.sum(axis=1, keepdims=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            shares = np.where(totals > 0, weights / totals, 0.0)
+        # (bases x ratios x players)
+        self.grid = (
+            self.revenue * self.ratios[None, :, None] * shares[:, None, :]
+        ).astype("float32")
+
+    def ratio_index(self, ratio):
+        """ Position of the grid ratio nearest to ratio. """
+        return int(np.abs(self.ratios - ratio).argmin())
+
+    def salaries(self, basis, ratio, revenue=None):
+        """ Simulated salary of every WNBA player. """
+        row = self.grid[self._basis[basis], self.ratio_index(ratio)]
+        if revenue is None or revenue == self.revenue:
+            return row
+        return row * np.float32(revenue / self.revenue)
+
+    def nba_equivalent(self, percentiles):
+        """ NBA salary at each percentile (0-100) of the NBA distribution. """
+        return np.percentile(self.nba_sorted, percentiles)
+
+    def frame(self, basis, ratio, revenue=None):
+        """ WNBA players by simulated salary, lowest first, with the current
+            WNBA salary and the NBA salary at the same percentile.
+        """
+        simulated = self.salaries(basis, ratio, revenue)
+        order = np.argsort(simulated, kind="stable")
+        return pd.DataFrame({
+            "Player": self.players["Player"].to_numpy()[order],
+            "Team": self.players["Team"].to_numpy()[order],
+            "percentile": self.percentile,
+            "simulated": simulated[order],
+            "current": self.current_sorted,
+            "nba": self.nba,
+        })
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+# normalization -> label shown next to the stat
+NORMALIZATIONS = {
+    "per_game": "Per game",
+    "totals": "Season totals",
+    "per_36": "Per 36 minutes",
+    "per_100": "Per 100 possessions at league pace",
+}
+
+# games and shooting percentages read the same in every normalization
+UNSCALED = ["G", "GS", "FG%", "3P%", "2P%", "FT%"]
+# minutes per 36 minutes or per 100 possessions is a constant, so the rate
+# normalizations show the minutes per game the rates are taken over
+PER_GAME = ["MP"]
+
+# minutes in a game. The source tables have no on-court team possessions,
+# so per 100 possessions scales a player's minutes by the league pace of
+# the season (league average possessions per game, see league_pace).
+GAME_MINUTES = {"NBA": 48, "WNBA": 40}
+
+# columns that identify a player row of the cube
+CUBE_KEYS = ["Player", "League", "Team"]
+
+
+def cube_column(stat, norm):
+    """ Name of the column of a stat in a normalization, e.g. PTS/per_36. """
+    return f"{stat}/{norm}"
+
+
+def league_pace(summary, season):
+    """ {league: pace} of a season from a league summary table with
+        league, season and pace columns.
+
+        Raises ValueError if the summary has no pace for the season.
+    """
+    rows = summary[summary["season"] == season]
+    if rows.empty:
+        raise ValueError(f"league summary has no pace for season {season}")
+    return dict(zip(rows["league"], rows["pace"].astype("float64")))
+
+
+def build_cube(totals, stats, leagues, pace, minutes=GAME_MINUTES):
+    """ (players x stats x normalizations) float32 array of season totals.
+
+        totals holds the season totals of each player, leagues the league
+        of each row and pace the {league: pace} of the season. Every
+        normalization divides the totals by one value per player (games,
+        1, minutes / 36, possessions / 100), so the whole cube is a single
+        broadcast division; games and percentages keep their totals value,
+        minutes keep their per-game value in the rate normalizations and
+        the rates are rounded to one decimal like the per-game tables.
+    """
+    values = totals[list(stats)].to_numpy(dtype="float64")
+    leagues = np.asarray(leagues)
+    missing = set(leagues) - set(pace)
+    if missing:
+        raise ValueError(f"no league pace for {sorted(missing)}")
+    games = totals["G"].to_numpy(dtype="float64")
+    played = totals["MP"].to_numpy(dtype="float64")
+    possessions = played * (
+        pd.Series(leagues).map(pace).to_numpy(dtype="float64")
+        / pd.Series(leagues).map(minutes).to_numpy(dtype="float64")
+    )
+    divisors = np.stack(
+        [games, np.ones_like(games), played / 36, possessions / 100], axis=1
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cube = values[:, :, None] / divisors[:, None, :]
+    cube = np.where(np.isfinite(cube), cube, np.nan).round(1)
+    unscaled = [i for i, stat in enumerate(stats) if stat in UNSCALED]
+    cube[:, unscaled, :] = values[:, unscaled, None]
+    per_game = [i for i, stat in enumerate(stats) if stat in PER_GAME]
+    cube[:, per_game, 2:] = cube[:, per_game, :1]
+    return cube.astype("float32")
+
+
+def cube_frame(keys, totals, stats, pace, minutes=GAME_MINUTES):
+    """ The cube as a table: the key columns, then one column per stat and
+        normalization, aligned row by row with keys.
+
+        Raises ValueError if the rows of totals are not the players of keys
+        in the same order.
+    """
+    keys = keys[CUBE_KEYS].reset_index(drop=True)
+    totals = totals.reset_index(drop=True)
+    if not keys.equals(totals[CUBE_KEYS].astype(keys.dtypes.to_dict())):
+        raise ValueError("season totals are not aligned with the player rows")
+    cube = build_cube(totals, stats, keys["League"], pace, minutes)
+    columns = [
+        cube_column(stat, norm) for stat in stats for norm in NORMALIZATIONS
+    ]
+    values = pd.DataFrame(
+        cube.reshape(len(keys), -1), columns=columns, copy=False
+    )
+    return pd.concat([keys, values], axis=1)
+
+
+def cube_schema(stats):
+    """ Declared column types of a cube table, see src/data/schema.py. """
+    return {
+        "Player": "object",
+        "League": "category",
+        "Team": "category",
+        **{
+            cube_column(stat, norm): "float32"
+            for stat in stats
+            for norm in NORMALIZATIONS
+        },
+    }
+
+
+def normalized(cube, stats, norm):
+    """ {stat: column} of the scaled stats of a cube table in one
+        normalization, to assign over the per-game columns of the players.
+    """
+    if norm not in NORMALIZATIONS:
+        raise ValueError(f"unknown normalization {norm!r}")
+    return {
+        stat: cube[cube_column(stat, norm)]
+        for stat in stats
+        if stat not in UNSCALED
+    }
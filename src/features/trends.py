@@ -0,0 +1,104 @@
+import pandas as pd
+
+# bump when the trend computation changes so stored tables are rebuilt
+TRENDS_VERSION = "1"
+
+# seasons in the rolling average
+ROLLING_WINDOW = 3
+
+# venue -> label; "all" is a team's home and away games together
+VENUES = {"all": "Home and away", "home": "Home", "away": "Away"}
+ALL_VENUES = "all"
+# rollup labels of the team and game_type columns
+LEAGUE = "League"
+ALL_GAME_TYPES = "All games"
+
+# index of the trend table; one series of seasons per (team, venue, game_type)
+TREND_KEYS = ["team", "venue", "game_type", "season"]
+SERIES_KEYS = TREND_KEYS[:-1]
+
+
+def venue_games(games):
+    """ Every game twice: for the hosting team with venue "home" and for
+        the visitors with venue "away". All-star games are left out, as
+        they are not played by a franchise.
+    """
+    games = games[games["game_type"] != "All star"]
+    columns = ["season", "game_type", "attendance"]
+    home = games[["team"] + columns].assign(venue="home")
+    away = (
+        games[["opponent"] + columns]
+        .rename(columns={"opponent": "team"})
+        .assign(venue="away")
+    )
+    return pd.concat([home, away], ignore_index=True)
+
+
+def attendance_trends(games, window=ROLLING_WINDOW):
+    """ Attendance of every (team, venue, game_type) series by season.
+
+        Each row has the games, total and mean attendance per game of a
+        season, the mean over the last window seasons of the series and
+        the change of the mean from the series' previous season (2021
+        follows 2019, as no 2020 season was played). Every team's home and
+        away games are rolled up into venue "all" and its game types into
+        ALL_GAME_TYPES; team LEAGUE holds each game once, from its home
+        row, for the league-wide trend.
+
+        The rollups are stacked copies of the games with a key relabeled,
+        so the whole table is one groupby, and the rolling and
+        year-over-year columns are grouped operations on its sorted rows.
+    """
+    long = venue_games(games)
+    home = long[long["venue"] == "home"]
+    stacked = pd.concat(
+        [
+            long,
+            long.assign(venue=ALL_VENUES),
+            long.assign(game_type=ALL_GAME_TYPES),
+            long.assign(venue=ALL_VENUES, game_type=ALL_GAME_TYPES),
+            home.assign(team=LEAGUE, venue=ALL_VENUES),
+            home.assign(team=LEAGUE, venue=ALL_VENUES,
+                        game_type=ALL_GAME_TYPES),
+        ],
+        ignore_index=True,
+    )
+    trends = (
+        stacked.groupby(TREND_KEYS, sort=True)["attendance"]
+        .agg(games="count", total="sum", mean="mean")
+        .reset_index()
+    )
+    series = trends.groupby(SERIES_KEYS, sort=False)["mean"]
+    trends["rolling_mean"] = (
+        series.rolling(window, min_periods=1).mean()
+        .reset_index(level=list(range(len(SERIES_KEYS))), drop=True)
+    )
+    trends["yoy_change"] = trends["mean"] / series.shift() - 1
+    return trends
+
+
+class AttendanceTrends:
+    """ The trend table split into its series at load, so a chart gets the
+        seasons of a (team, venue, game_type) with a dict lookup.
+    """
+
+    def __init__(self, trends):
+        self.df = trends
+        self._series = {
+            key: rows.reset_index(drop=True)
+            for key, rows in trends.groupby(SERIES_KEYS, sort=True,
+                                            observed=True)
+        }
+        teams = sorted({team for team, _, _ in self._series} - {LEAGUE})
+        self.teams = [LEAGUE] + teams
+        game_types = sorted({t for _, _, t in self._series} - {ALL_GAME_TYPES})
+        self.game_types = [ALL_GAME_TYPES] + game_types
+        self._empty = trends.iloc[0:0]
+
+    def keys(self):
+        """ (team, venue, game_type) of every series. """
+        return list(self._series)
+
+    def series(self, team=LEAGUE, venue=ALL_VENUES, game_type=ALL_GAME_TYPES):
+        """ Rows of one series, by season. """
+        return self._series.get((team, venue, game_type), self._empty)
@@ -0,0 +1,249 @@
+import functools
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+DEFAULT_PATH = os.path.join(tempfile.gettempdir(), "wnba_nba_figures.sqlite")
+
+# hits, misses and last_used times are kept in memory and written in one
+# transaction once this many lookups or this many seconds have passed
+FLUSH_EVERY = 64
+FLUSH_SECONDS = 5.0
+
+logger = logging.getLogger(__name__)
+
+
+def data_version(*paths):
+    """ Short content hash of the files the figures are built from. """
+    digest = hashlib.sha1()
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+class FigureCache:
+    """ LRU store of serialized figures shared by every worker process.
+
+        Entries live in a small SQLite file so the gunicorn workers see each
+        other's figures, and hits/misses are counted in the same file, in
+        total and per memoize() name.
+        Keys combine the callback name, its inputs and the data version, so
+        a new dataset never serves stale figures.
+
+        A lookup only reads the file: the counters and last_used times are
+        batched in memory and flushed best-effort (see FLUSH_EVERY), so the
+        counts of each worker lag by up to a batch and the LRU order by a
+        few seconds. A SQLite error, e.g. a locked file, never reaches the
+        callback; the figure is rebuilt instead.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, max_entries=256, version=""):
+        self.path = path
+        self.max_entries = max_entries
+        self.version = version
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._reset_pending()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS figures "
+                "(key TEXT PRIMARY KEY, value TEXT, last_used REAL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS counters "
+                "(name TEXT PRIMARY KEY, value INTEGER)"
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO counters "
+                "VALUES ('hits', 0), ('misses', 0)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS callback_counters "
+                "(callback TEXT, name TEXT, value INTEGER, "
+                "PRIMARY KEY (callback, name))"
+            )
+
+    def _connect(self):
+        # one connection per thread, opened lazily (also after a fork)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def key(self, name, *inputs):
+        raw = json.dumps([name, self.version, inputs], default=str)
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def get(self, key, callback=None):
+        """ Stored value of key, or None on a miss or a SQLite error. The
+            hit or miss is also counted for callback, if given.
+        """
+        try:
+            row = self._connect().execute(
+                "SELECT value FROM figures WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as exc:
+            logger.debug("figure cache read failed: %s", exc)
+            row = None
+        if row is None:
+            self._note("misses", callback)
+            return None
+        self._note("hits", callback, key)
+        return row[0]
+
+    def set(self, key, value):
+        """ Store value under key; skipped if the file cannot be written. """
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO figures VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+            # evict the least recently used entries above the size cap
+            conn.execute(
+                "DELETE FROM figures WHERE key NOT IN "
+                "(SELECT key FROM figures ORDER BY last_used DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+        except sqlite3.Error as exc:
+            logger.warning("figure cache write failed: %s", exc)
+
+    def _reset_pending(self):
+        self._pending = {"hits": 0, "misses": 0}
+        # (callback, "hits" or "misses") -> count
+        self._pending_callbacks = {}
+        self._touched = {}
+        self._flushed = time.monotonic()
+        self._pid = os.getpid()
+
+    def _note(self, counter, callback=None, key=None):
+        with self._lock:
+            if self._pid != os.getpid():
+                # a forked worker starts with nothing pending
+                self._reset_pending()
+            self._pending[counter] += 1
+            if callback is not None:
+                pending = self._pending_callbacks
+                pending[callback, counter] = (
+                    pending.get((callback, counter), 0) + 1
+                )
+            if key is not None:
+                self._touched[key] = time.time()
+            due = (
+                sum(self._pending.values()) >= FLUSH_EVERY
+                or time.monotonic() - self._flushed >= FLUSH_SECONDS
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        """ Write the pending counters and last_used times in one
+            transaction. Best-effort: on a SQLite error they are kept for
+            the next flush.
+        """
+        with self._lock:
+            pending, touched = self._pending, self._touched
+            callbacks = self._pending_callbacks
+            self._reset_pending()
+        if not any(pending.values()) and not touched:
+            return
+        conn = None
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN")
+            conn.executemany(
+                "UPDATE counters SET value = value + ? WHERE name = ?",
+                [(n, name) for name, n in pending.items() if n],
+            )
+            conn.executemany(
+                "INSERT INTO callback_counters VALUES (?, ?, ?) "
+                "ON CONFLICT (callback, name) "
+                "DO UPDATE SET value = value + excluded.value",
+                [(cb, name, n) for (cb, name), n in callbacks.items()],
+            )
+            conn.executemany(
+                "UPDATE figures SET last_used = MAX(last_used, ?) "
+                "WHERE key = ?",
+                [(t, key) for key, t in touched.items()],
+            )
+            conn.execute("COMMIT")
+        except sqlite3.Error as exc:
+            logger.debug("figure cache flush failed: %s", exc)
+            if conn is not None and conn.in_transaction:
+                conn.rollback()
+            with self._lock:
+                for name, n in pending.items():
+                    self._pending[name] += n
+                for counter, n in callbacks.items():
+                    self._pending_callbacks[counter] = (
+                        self._pending_callbacks.get(counter, 0) + n
+                    )
+                for key, t in touched.items():
+                    self._touched.setdefault(key, t)
+
+    def stats(self):
+        self.flush()
+        conn = self._connect()
+        stats = dict(conn.execute("SELECT name, value FROM counters"))
+        stats["callbacks"] = {}
+        for callback, name, value in conn.execute(
+            "SELECT callback, name, value FROM callback_counters "
+            "ORDER BY callback"
+        ):
+            stats["callbacks"].setdefault(
+                callback, {"hits": 0, "misses": 0}
+            )[name] = value
+        stats["entries"] = conn.execute(
+            "SELECT COUNT(*) FROM figures"
+        ).fetchone()[0]
+        stats["max_entries"] = self.max_entries
+        stats["version"] = self.version
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._reset_pending()
+        conn = self._connect()
+        conn.execute("DELETE FROM figures")
+        conn.execute("DELETE FROM callback_counters")
+        conn.execute("UPDATE counters SET value = 0")
+
+    def memoize(self, name):
+        """ Cache the figure(s) returned by a Dash callback.
+
+            On a hit the stored JSON is returned as plain dicts, which Dash
+            accepts for a figure property, so the figure is never rebuilt.
+        """
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*inputs):
+                key = self.key(name, *inputs)
+                value = self.get(key, name)
+                if value is not None:
+                    figures = json.loads(value)
+                    return tuple(figures) if len(figures) > 1 else figures[0]
+
+                result = func(*inputs)
+                figures = result if isinstance(result, tuple) else (result,)
+                self.set(
+                    key, "[" + ",".join(fig.to_json() for fig in figures) + "]"
+                )
+                return result
+
+            # copied up by functools.wraps, see src/web/export.py
+            wrapper.figure_cache_name = name
+            return wrapper
+
+        return decorator
@@ -0,0 +1,309 @@
+import plotly.graph_objects as go
+import plotly.io as pio
+
+LEAGUE_COLORS = {"WNBA": "#F57B20", "NBA": "#17408B"}
+
+# The few parts of plotly's default template these charts use. Naming the
+# full "plotly" template embeds several KB of settings for chart types we
+# never draw into every figure.
+_axis = dict(
+    gridcolor="white",
+    linecolor="white",
+    zerolinecolor="white",
+    zerolinewidth=2,
+    ticks="",
+    automargin=True,
+    title=dict(standoff=15),
+)
+TEMPLATE = go.layout.Template(
+    layout=dict(
+        font=dict(color="#2a3f5f"),
+        paper_bgcolor="white",
+        plot_bgcolor="#E5ECF6",
+        hovermode="closest",
+        hoverlabel=dict(align="left"),
+        xaxis=_axis,
+        yaxis=_axis,
+        coloraxis=dict(
+            colorbar=dict(outlinewidth=0, ticks=""),
+            colorscale=pio.templates["plotly"].layout.colorscale.sequential,
+        ),
+    )
+)
+
+
+# games from which attendance_figure draws with WebGL: every game of a
+# season (71 to 275 in the data) is drawn as markers, the games of one
+# team (at most 24) keep their bar segments
+WEBGL_MIN_GAMES = 50
+
+
+def _axis_layout(title, title_size, tick_size):
+    return dict(
+        title=dict(text=title, font=dict(size=title_size)),
+        tickfont=dict(size=tick_size),
+    )
+
+
+def _layout(title, xaxis, yaxis, **layout):
+    if title:
+        layout["title"] = dict(text=title, font=dict(size=18), x=0.5, y=0.92)
+    return go.Layout(
+        template=TEMPLATE, xaxis=xaxis, yaxis=yaxis, margin=dict(t=60),
+        **layout,
+    )
+
+
+def _league_bars(df, x, label):
+    """ One horizontal bar trace per league, like px.bar(color="League"). """
+    hover = (
+        "League=%{customdata[0]}<br>" + label + "=%{x}<br>Player=%{y}"
+        "<br>Team=%{customdata[1]}<br>Pos=%{customdata[2]}<extra></extra>"
+    )
+    league = df["League"].to_numpy()
+    traces = []
+    for name in dict.fromkeys(league):
+        rows = league == name
+        traces.append(go.Bar(
+            x=df[x].to_numpy()[rows],
+            y=df["Player"].to_numpy()[rows],
+            customdata=df[["League", "Team", "Pos"]].to_numpy()[rows],
+            orientation="h",
+            name=name,
+            marker_color=LEAGUE_COLORS[name],
+            hovertemplate=hover,
+        ))
+    return traces
+
+
+def leaderboard_figures(df, stat, label=None):
+    """ Bar charts of the chosen stat and of the salary of the players in
+        df, colored by league. label titles the stat axis, the stat name by
+        default.
+    """
+    yaxis = dict(
+        _axis_layout(None, 16, 11), categoryorder="total ascending"
+    )
+    fig_stat = go.Figure(
+        _league_bars(df, stat, stat),
+        _layout(
+            "Top 10 players per league by chosen stat",
+            _axis_layout(label or stat, 15, 11), yaxis, showlegend=False,
+        ),
+    )
+    fig_salary = go.Figure(
+        _league_bars(df, "salary", "salary"),
+        _layout(
+            "Salary of top 10 players per league by chosen stat",
+            _axis_layout("USD", 15, 11), yaxis, showlegend=False,
+        ),
+    )
+    return fig_stat, fig_salary
+
+
+def attendance_figure(df, webgl=None):
+    """ Attendance of each game in df, stacked by team and colored by
+        attendance.
+
+        With webgl, or by default from WEBGL_MIN_GAMES games on, each game
+        is a WebGL marker in its team's column instead of a bar segment,
+        which the browser draws faster than hundreds of stacked segments.
+    """
+    attendance = df["attendance"].to_numpy()
+    if webgl is None:
+        webgl = len(df) >= WEBGL_MIN_GAMES
+    hover = "team=%{x}<br>attendance=%{y}<br>opponent=%{text}<extra></extra>"
+    marker = dict(color=attendance, coloraxis="coloraxis")
+    if webgl:
+        trace = go.Scattergl(
+            x=df["team"].to_numpy(), y=attendance,
+            text=df["opponent"].to_numpy(),
+            mode="markers", marker=marker, hovertemplate=hover,
+        )
+        layout = dict(height=600)
+    else:
+        trace = go.Bar(
+            x=df["team"].to_numpy(), y=attendance,
+            text=df["opponent"].to_numpy(),
+            marker=marker, hovertemplate=hover,
+        )
+        layout = dict(height=1000, barmode="relative")
+    return go.Figure(
+        [trace],
+        _layout(
+            None,
+            _axis_layout("Team", 16, 12),
+            _axis_layout("Attendance", 16, 12),
+            coloraxis=dict(colorbar=dict(title=dict(text="attendance"))),
+            **layout,
+        ),
+    )
+
+
+def attendance_overview_figure(df):
+    """ Mean home attendance of each team in df, a team_overview table.
+        Only the means are sent; the other OVERVIEW_STATS are served by
+        /api/v1/attendance/overview. Clicking a bar selects the team.
+    """
+    trace = go.Bar(
+        x=df["team"].to_numpy(),
+        y=df["mean"].round().astype("int64").to_numpy(),
+        marker_color=LEAGUE_COLORS["WNBA"],
+        hovertemplate="%{x}<br>mean=%{y:,}<extra></extra>",
+    )
+    return go.Figure(
+        [trace],
+        _layout(
+            "Mean attendance per game (click a team for its games)",
+            _axis_layout(None, 16, 12),
+            _axis_layout("Attendance", 16, 12),
+        ),
+    )
+
+
+def trend_figure(df, title, league=None):
+    """ Mean attendance per game of a trend series (see
+        src/features/trends.py) by season, with its rolling average and,
+        when given, the rolling average of the league series for the same
+        game type.
+    """
+    seasons = df["season"].to_numpy()
+    traces = [
+        go.Scatter(
+            x=seasons,
+            y=df["mean"].round().to_numpy(),
+            customdata=df[["games", "total", "yoy_change"]].to_numpy(),
+            name="Mean per game",
+            mode="lines+markers",
+            line=dict(color=LEAGUE_COLORS["WNBA"]),
+            hovertemplate=(
+                "%{x}<br>mean=%{y:,}<br>games=%{customdata[0]}"
+                "<br>total=%{customdata[1]:,}"
+                "<br>change=%{customdata[2]:+.1%}<extra></extra>"
+            ),
+        ),
+        go.Scatter(
+            x=seasons,
+            y=df["rolling_mean"].round().to_numpy(),
+            name="Rolling average",
+            mode="lines",
+            line=dict(color=LEAGUE_COLORS["WNBA"], dash="dash"),
+            hovertemplate="%{x}<br>rolling average=%{y:,}<extra></extra>",
+        ),
+    ]
+    if league is not None:
+        traces.append(go.Scatter(
+            x=league["season"].to_numpy(),
+            y=league["rolling_mean"].round().to_numpy(),
+            name="League rolling average",
+            mode="lines",
+            line=dict(color="grey", dash="dot"),
+            hovertemplate=(
+                "%{x}<br>league rolling average=%{y:,}<extra></extra>"
+            ),
+        ))
+    return go.Figure(
+        traces,
+        _layout(
+            title,
+            _axis_layout("Season", 16, 12),
+            _axis_layout("Attendance per game", 16, 12),
+            legend=dict(orientation="h", y=-0.2),
+        ),
+    )
+
+
+def efficiency_figure(df, stat, salary_per_unit):
+    """ Within-league percentile of a stat against that of the salary, one
+        point per player. Points above the diagonal are paid more than their
+        production ranks, points below less. salary_per_unit maps each
+        league to its median salary per unit of the stat, shown in the
+        title.
+    """
+    hover = (
+        "%{customdata[0]} (%{customdata[1]})<br>" + stat + "=%{customdata[2]}"
+        "<br>salary=%{customdata[3]:$,.0f}<br>" + stat + " percentile=%{x:.0f}"
+        "<br>salary percentile=%{y:.0f}<extra></extra>"
+    )
+    hover_data = df[["Player", "Team", stat, "salary"]]
+    if hover_data[stat].dtype == "float32":
+        # widened through the shortest repr, as in src/web/api.py
+        # records_json, so the hover shows 11.4 and not 11.399999618530273
+        hover_data = hover_data.assign(
+            **{stat: hover_data[stat].astype(str).astype("float64")}
+        )
+    customdata = hover_data.to_numpy()
+    league = df["League"].to_numpy()
+    traces = []
+    for name in dict.fromkeys(league):
+        rows = league == name
+        traces.append(go.Scatter(
+            x=df["percentile"].to_numpy()[rows],
+            y=df["salary_pct"].to_numpy()[rows],
+            customdata=customdata[rows],
+            mode="markers",
+            name=name,
+            marker=dict(color=LEAGUE_COLORS[name], size=7, opacity=0.7),
+            hovertemplate=hover,
+        ))
+    medians = ", ".join(
+        f"{name} ${value:,.0f}" for name, value in salary_per_unit.items()
+    )
+    return go.Figure(
+        traces,
+        _layout(
+            f"Pay vs production: median salary per {stat}: {medians}",
+            _axis_layout(f"{stat} percentile within league", 15, 11),
+            _axis_layout("Salary percentile within league", 15, 11),
+            shapes=[dict(
+                type="line", x0=0, y0=0, x1=100, y1=100,
+                line=dict(color="grey", dash="dot", width=1),
+            )],
+            legend=dict(title=dict(text="League")),
+        ),
+    )
+
+
+def simulator_figure(df, pool):
+    """ Simulated and current WNBA salaries against the NBA salary at the
+        same percentile of each league, on a log scale.
+    """
+    percentile = df["percentile"].to_numpy()
+    lines = [
+        ("NBA", df["nba"].to_numpy(), LEAGUE_COLORS["NBA"], "solid"),
+        ("WNBA current", df["current"].to_numpy(), LEAGUE_COLORS["WNBA"],
+         "dot"),
+    ]
+    traces = [
+        go.Scatter(
+            x=percentile, y=y, name=name, mode="lines",
+            line=dict(color=color, dash=dash),
+            hovertemplate=(
+                name + "<br>percentile=%{x:.0f}<br>salary=%{y:$,.0f}"
+                "<extra></extra>"
+            ),
+        )
+        for name, y, color, dash in lines
+    ]
+    traces.append(go.Scatter(
+        x=percentile,
+        y=df["simulated"].to_numpy(),
+        customdata=df[["Player", "Team"]].to_numpy(),
+        name="WNBA simulated",
+        mode="lines+markers",
+        line=dict(color=LEAGUE_COLORS["WNBA"]),
+        marker=dict(size=5),
+        hovertemplate=(
+            "%{customdata[0]} (%{customdata[1]})<br>percentile=%{x:.0f}"
+            "<br>simulated salary=%{y:$,.0f}<extra></extra>"
+        ),
+    ))
+    return go.Figure(
+        traces,
+        _layout(
+            f"WNBA salaries from a ${pool:,.0f} salary pool",
+            _axis_layout("Percentile within league", 15, 11),
+            dict(_axis_layout("Salary (USD)", 15, 11), type="log"),
+            legend=dict(orientation="h", y=-0.2),
+        ),
+    )
@@ -0,0 +1,189 @@
+import functools
+import hashlib
+import json
+from datetime import datetime, timezone
+
+import flask
+import numpy as np
+
+from src.features.stats_cube import NORMALIZATIONS
+
+# leagues accepted by /api/v1/leaderboard
+LEAGUES = {"wnba": ["WNBA"], "nba": ["NBA"], "both": ["WNBA", "NBA"]}
+MAX_PER_PAGE = 500
+MAX_TOP_N = 1000
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _int_arg(args, name, default, low, high):
+    value = args.get(name, default)
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise BadRequest(f"{name} must be an integer")
+    if not low <= value <= high:
+        raise BadRequest(f"{name} must be between {low} and {high}")
+    return value
+
+
+def records_json(df):
+    """ The rows of df as a JSON array. float32 stats are widened through
+        their shortest repr, so 33.6 is not sent as 33.599998474.
+    """
+    df = df.copy()
+    for name in df.columns:
+        if df[name].dtype == np.float32:
+            df[name] = df[name].astype(str).astype("float64")
+    return df.to_json(orient="records")
+
+
+def paginate(df, args):
+    """ (page of df, pagination metadata) from the page/per_page args. """
+    per_page = _int_arg(args, "per_page", 50, 1, MAX_PER_PAGE)
+    pages = max(1, -(-len(df) // per_page))
+    page = _int_arg(args, "page", 1, 1, pages)
+    start = (page - 1) * per_page
+    meta = {"page": page, "per_page": per_page, "pages": pages,
+            "total": len(df)}
+    return df.iloc[start:start + per_page], meta
+
+
+def envelope(rows, meta):
+    return ('{"data":' + records_json(rows) + ',"meta":' + json.dumps(meta)
+            + "}")
+
+
+def leaderboard_args(args, stat_names, seasons):
+    """ (league, stat, n, season, norm, page, per_page) of a leaderboard
+        query; raises BadRequest for an invalid one.
+    """
+    league = args.get("league", "both").lower()
+    if league not in LEAGUES:
+        raise BadRequest("league must be one of " + ", ".join(LEAGUES))
+    stat = args.get("stat", "PTS")
+    if stat not in stat_names:
+        raise BadRequest(f"unknown stat {stat!r}")
+    season = _int_arg(args, "season", seasons[-1], seasons[0], seasons[-1])
+    if season not in seasons:
+        raise BadRequest(f"no player data for season {season}")
+    norm = args.get("norm", "per_game")
+    if norm not in NORMALIZATIONS:
+        raise BadRequest("norm must be one of " + ", ".join(NORMALIZATIONS))
+    n = _int_arg(args, "n", 10, 1, MAX_TOP_N)
+    per_page = _int_arg(args, "per_page", 50, 1, MAX_PER_PAGE)
+    page = _int_arg(args, "page", 1, 1, MAX_TOP_N)
+    return league, stat, n, season, norm, page, per_page
+
+
+def attendance_args(args, attendance):
+    """ (season, team, page, per_page) of an attendance query; raises
+        BadRequest for an invalid one.
+    """
+    season = _int_arg(args, "season", attendance.seasons[-1],
+                      attendance.seasons[0], attendance.seasons[-1])
+    team = args.get("team") or None
+    if team is not None and team not in attendance.teams(season):
+        raise BadRequest(f"no games of {team!r} in {season}")
+    per_page = _int_arg(args, "per_page", 50, 1, MAX_PER_PAGE)
+    page = _int_arg(args, "page", 1, 1, 1 << 20)
+    return season, team, page, per_page
+
+
+def conditional_response(build, version, modified, max_age):
+    """ Response to the current request with the body build(args), or a
+        304 when the client's ETag or Last-Modified is still current.
+    """
+    request = flask.request
+    # the query is validated before the conditional check, so a bad
+    # request is a 400 whatever validators the client sends
+    try:
+        body = build(request.args)
+    except BadRequest as error:
+        return flask.jsonify(error=str(error)), 400
+    query = json.dumps(sorted(request.args.items(multi=True)))
+    etag = hashlib.sha1(
+        f"{version}:{request.path}:{query}".encode()
+    ).hexdigest()
+    headers = {"Cache-Control": f"public, max-age={max_age}"}
+    if etag in request.if_none_match or (
+        not request.if_none_match
+        and request.if_modified_since is not None
+        and request.if_modified_since >= modified
+    ):
+        response = flask.Response(status=304, headers=headers)
+    else:
+        response = flask.Response(
+            body, mimetype="application/json", headers=headers
+        )
+    response.set_etag(etag)
+    response.last_modified = modified
+    return response
+
+
+def make_api(top_players, attendance, stat_names, seasons, version,
+             last_modified, max_age=300):
+    """ Blueprint of the JSON query API.
+
+        GET /api/v1/leaderboard?league=wnba|nba|both&stat=PTS&n=10&season=
+            &norm=per_game|totals|per_36|per_100
+        GET /api/v1/attendance?season=2019&team=
+        Both accept page and per_page.
+        GET /api/v1/attendance/overview?season=2019
+            mean, median, sum, min, max and count of each team's games
+
+        The endpoints answer with the same data as the leaderboard and
+        attendance callbacks. The ETag hashes the data version and the
+        query, Last-Modified is the time of the data files, so a client or
+        proxy holding a copy of a valid query gets a 304 instead of the
+        body; invalid parameters are a 400 either way. The bodies are
+        cached per query in each worker, and Cache-Control lets a reverse
+        proxy serve repeats for max_age seconds.
+    """
+    api = flask.Blueprint("api", __name__, url_prefix="/api/v1")
+    modified = datetime.fromtimestamp(int(last_modified), tz=timezone.utc)
+
+    @functools.lru_cache(maxsize=1024)
+    def leaderboard_body(league, stat, n, season, norm, page, per_page):
+        df = top_players(LEAGUES[league], stat, season, n, norm)
+        rows, meta = paginate(df, {"page": page, "per_page": per_page})
+        meta.update(league=league, stat=stat, n=n, season=season, norm=norm)
+        return envelope(rows, meta)
+
+    @functools.lru_cache(maxsize=1024)
+    def attendance_body(season, team, page, per_page):
+        df = attendance.slice(season, team)
+        rows, meta = paginate(df, {"page": page, "per_page": per_page})
+        meta.update(season=season, team=team)
+        return envelope(rows, meta)
+
+    @functools.lru_cache(maxsize=64)
+    def overview_body(season):
+        df = attendance.overview(season)
+        return envelope(df, {"season": season, "total": len(df)})
+
+    def respond(build):
+        return conditional_response(build, version, modified, max_age)
+
+    @api.route("/leaderboard")
+    def leaderboard():
+        return respond(lambda args: leaderboard_body(
+            *leaderboard_args(args, stat_names, seasons)
+        ))
+
+    @api.route("/attendance")
+    def attendance_games():
+        return respond(lambda args: attendance_body(
+            *attendance_args(args, attendance)
+        ))
+
+    @api.route("/attendance/overview")
+    def attendance_overview():
+        return respond(lambda args: overview_body(_int_arg(
+            args, "season", attendance.seasons[-1], attendance.seasons[0],
+            attendance.seasons[-1],
+        )))
+
+    return api
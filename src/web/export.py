@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+""" Render every figure the dashboard can show, in parallel.
+
+    The inputs of the figure callbacks take a small, finite set of values,
+    so every combination can be rendered ahead of time in a process pool:
+
+    bundle      write a static site: figures/<callback>/<key>.json, a
+                manifest of the inputs and an index.html that loads the
+                figures by key with plotly.js, servable from any CDN
+    seed-cache  store the figures in the live app's figure cache, e.g. at
+                deploy time (gunicorn does this with SEED_FIGURE_CACHE=1);
+                fails unless FIGURE_CACHE_ENTRIES holds them all
+
+        python -m src.web.export bundle dist/static --workers 4 --images svg
+        python -m src.web.export seed-cache --workers 4
+
+    The simulator is exported at each season's own revenue, split by
+    current salary, over the whole share ratio grid.
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from src.data.columnar import PROJECT_DIR
+
+logger = logging.getLogger(__name__)
+
+# figure callbacks of app.py: name -> (input labels, output element ids)
+CALLBACKS = {
+    "top10players_bystat": (["league", "stat", "season", "norm"],
+                            ["fig_stat", "fig_salary"]),
+    "update_efficiency": (["league", "stat", "season"], ["efficiency"]),
+    "update_simulator": (["basis", "ratio", "revenue", "season"],
+                         ["simulator"]),
+    "update_graph": (["team", "season", "view"], ["games"]),
+    "update_trends": (["team", "venue", "game_type"], ["trends"]),
+}
+
+_app = None
+
+
+def normalize(value):
+    # the browser sends 60.0 as 60, so keys use the int form
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def static_key(inputs):
+    """ File name of a combination of inputs; static/index.html builds the
+        same string in JavaScript.
+    """
+    parts = []
+    for value in inputs:
+        value = normalize(value)
+        text = value if isinstance(value, str) else json.dumps(value)
+        parts.append(re.sub(
+            r"[^A-Za-z0-9.-]", lambda m: "_%x_" % ord(m.group()), text
+        ))
+    return "~".join(parts)
+
+
+def combinations(app):
+    """ (callback name, inputs) of every figure the dashboard can show. """
+    from src.features.simulator import RATIO_GRID
+    from src.features.stats_cube import NORMALIZATIONS
+
+    tasks = []
+    for season in app.player_seasons:
+        for league_val in app.league_names:
+            for stat in app.stat_names:
+                for norm in NORMALIZATIONS:
+                    tasks.append((
+                        "top10players_bystat", (league_val, stat, season, norm)
+                    ))
+                tasks.append(("update_efficiency", (league_val, stat, season)))
+        if app.simulator_for(season) is not None:
+            revenue, _ = app.league_revenue("WNBA", season)
+            for ratio in RATIO_GRID:
+                tasks.append(("update_simulator", (
+                    "salary", float(ratio), normalize(float(revenue) / 1e6),
+                    season,
+                )))
+    for season in app.attendance.seasons:
+        for team in [None] + app.attendance.teams(season):
+            tasks.append(("update_graph", (team, season, "summary")))
+        # a team's games read the same in either view
+        tasks.append(("update_graph", (None, season, "games")))
+    # the league series has only venue "all"
+    for team, venue, game_type in app.trends.keys():
+        tasks.append(("update_trends", (team, venue, game_type)))
+    return tasks
+
+
+def _load_app():
+    global _app
+    if _app is None:
+        os.chdir(PROJECT_DIR)
+        sys.path.insert(0, str(PROJECT_DIR))
+        import app
+
+        _app = app
+    return _app
+
+
+def render(task, out_dir=None, images=()):
+    """ Figure JSON of one combination, as the figure cache stores it;
+        with out_dir and images also writes an image of each figure.
+    """
+    import inspect
+
+    name, inputs = task
+    app = _load_app()
+    result = inspect.unwrap(getattr(app, name))(*inputs)
+    figures = result if isinstance(result, tuple) else (result,)
+    for fmt in images:
+        for i, fig in enumerate(figures):
+            path = (Path(out_dir) / "images" / name
+                    / f"{static_key(inputs)}-{i}.{fmt}")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fig.write_image(str(path))
+    return name, inputs, "[" + ",".join(fig.to_json() for fig in figures) + "]"
+
+
+def render_all(tasks, workers=None, out_dir=None, images=()):
+    """ Yield (name, inputs, figure JSON) of every task, rendered in a
+        process pool. The workers import the app once each; forked from a
+        process that has already imported it, they inherit it.
+    """
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    if workers == 1:
+        results = (render(task, out_dir, images) for task in tasks)
+        yield from results
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_load_app
+        ) as pool:
+            yield from pool.map(
+                render, tasks, [out_dir] * len(tasks),
+                [tuple(images)] * len(tasks), chunksize=8,
+            )
+    logger.info(
+        "rendered %d figures with %d workers in %.1f s",
+        len(tasks), workers, time.perf_counter() - start,
+    )
+
+
+def seed_cache(app=None, workers=None, resize=True):
+    """ Render every combination of the callbacks that go through the
+        figure cache into it.
+
+        The cache must hold them all, or seeding evicts its own figures.
+        With resize its cap is raised to the number of figures; the gunicorn
+        workers forked after seeding share the app object and inherit it.
+        Without, ValueError is raised when the cap is smaller.
+    """
+    app = app or _load_app()
+    tasks = [
+        (name, inputs) for name, inputs in combinations(app)
+        if hasattr(getattr(app, name), "figure_cache_name")
+    ]
+    cache = app.figure_cache
+    if len(tasks) > cache.max_entries:
+        if not resize:
+            raise ValueError(
+                f"{len(tasks)} figures but the cache holds "
+                f"{cache.max_entries}; set FIGURE_CACHE_ENTRIES to at least "
+                f"{len(tasks)} for the app and the seeding"
+            )
+        logger.info("figure cache resized from %d to %d entries",
+                    cache.max_entries, len(tasks))
+        cache.max_entries = len(tasks)
+    for name, inputs, payload in render_all(tasks, workers):
+        cache.set(cache.key(name, *map(normalize, inputs)), payload)
+    return len(tasks)
+
+
+def _options(tasks):
+    """ Distinct values of each input of each callback, in first-seen
+        order.
+    """
+    options = {}
+    for name, inputs in tasks:
+        labels = CALLBACKS[name][0]
+        values = options.setdefault(name, {label: [] for label in labels})
+        for label, value in zip(labels, inputs):
+            value = normalize(value)
+            if value not in values[label]:
+                values[label].append(value)
+    return options
+
+
+def write_bundle(out_dir, workers=None, images=()):
+    """ Write the static site to out_dir. """
+    from src.features.simulator import RATIO_GRID
+    from src.features.stats_cube import NORMALIZATIONS
+    from src.features.trends import LEAGUE, VENUES
+
+    app = _load_app()
+    out_dir = Path(out_dir)
+    tasks = combinations(app)
+    keys = {name: [] for name in CALLBACKS}
+    for name, inputs, payload in render_all(tasks, workers, out_dir, images):
+        key = static_key(inputs)
+        path = out_dir / "figures" / name / f"{key}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(payload)
+        keys[name].append(key)
+
+    manifest = {
+        "version": app.figure_cache.version,
+        "callbacks": {
+            name: {"inputs": labels, "outputs": outputs, "keys": keys[name]}
+            for name, (labels, outputs) in CALLBACKS.items()
+        },
+        "options": _options(tasks),
+        "stat_labels": {
+            o["value"]: o["label"] for o in app.drop_stats.options
+        },
+        "norm_labels": NORMALIZATIONS,
+        "view_labels": {
+            o["value"]: o["label"] for o in app.radio_attendance_view.options
+        },
+        "venue_labels": VENUES,
+        "trend_league": LEAGUE,
+        "trend_teams": app.trends.teams,
+        "trend_game_types": app.trends.game_types,
+        "simulator_revenue": {
+            inputs[3]: inputs[2]
+            for name, inputs in tasks if name == "update_simulator"
+        },
+        "attendance_teams": {
+            season: app.attendance.teams(season)
+            for season in app.attendance.seasons
+        },
+        "defaults": {
+            "season": app.default_player_season,
+            "attendance_season": app.default_season,
+            "trend_team": LEAGUE,
+            "ratio": float(RATIO_GRID[
+                abs(RATIO_GRID - app.slider_ratio.value).argmin()
+            ]),
+        },
+    }
+    (out_dir / "manifest.json").write_text(json.dumps(manifest))
+
+    shutil.copy(Path(__file__).parent / "static" / "index.html", out_dir)
+    import plotly
+
+    shutil.copy(
+        Path(plotly.__file__).parent / "package_data" / "plotly.min.js",
+        out_dir / "plotly.min.js",
+    )
+    for logo in ("WNBA_logo.png", "NBA_logo.png"):
+        shutil.copy(PROJECT_DIR / "assets" / logo, out_dir / logo)
+    logger.info("wrote %d figures to %s", len(tasks), out_dir)
+    return len(tasks)
+
+
+def main():
+    from src.web.log import configure_logging
+
+    configure_logging()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    bundle = commands.add_parser("bundle")
+    bundle.add_argument("out_dir", nargs="?",
+                        default=str(PROJECT_DIR / "dist" / "static"))
+    bundle.add_argument("--workers", type=int, default=None)
+    bundle.add_argument("--images", nargs="*", default=[],
+                        choices=["svg", "png"],
+                        help="also write images (needs kaleido)")
+
+    seed = commands.add_parser("seed-cache")
+    seed.add_argument("--workers", type=int, default=None)
+
+    args = parser.parse_args()
+    if getattr(args, "images", None):
+        try:
+            import kaleido  # noqa: F401
+        except ImportError:
+            parser.error("--images needs the kaleido package")
+    if args.command == "bundle":
+        write_bundle(args.out_dir, args.workers, args.images)
+    else:
+        # the app runs in other processes, with its own FIGURE_CACHE_ENTRIES
+        try:
+            seed_cache(workers=args.workers, resize=False)
+        except ValueError as exc:
+            parser.exit(1, f"seed-cache: {exc}\n")
+
+
+if __name__ == "__main__":
+    main()
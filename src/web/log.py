@@ -0,0 +1,51 @@
+import json
+import logging
+import os
+import time
+
+# attributes every LogRecord has; anything else came in through extra=
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+# loggers configured by configure_logging: the dash app (run as a module or
+# as a script) and the src package
+APP_LOGGERS = ("app", "__main__", "src")
+
+
+class JsonFormatter(logging.Formatter):
+    """ One JSON object per line: time, level, logger, message and the
+        fields passed with extra=.
+    """
+
+    def format(self, record):
+        entry = {
+            "time": time.strftime(
+                "%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(
+            (key, value) for key, value in vars(record).items()
+            if key not in _RECORD_FIELDS
+        )
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level=None, names=APP_LOGGERS):
+    """ Send the JSON lines of the app's loggers to stderr at LOG_LEVEL
+        (default INFO). The root logger is left alone, so the handlers of
+        gunicorn or pytest keep working; calling it again replaces the
+        handler instead of adding one.
+    """
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter())
+    for name in names:
+        log = logging.getLogger(name)
+        log.handlers[:] = [
+            h for h in log.handlers if not isinstance(h.formatter,
+                                                      JsonFormatter)
+        ] + [handler]
+        log.setLevel(level or os.environ.get("LOG_LEVEL", "INFO"))
+        log.propagate = False
@@ -0,0 +1,231 @@
+import functools
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+
+import flask
+
+DEFAULT_DIR = os.path.join(tempfile.gettempdir(), "wnba_nba_metrics")
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0)
+BYTES_BUCKETS = (1e3, 5e3, 1e4, 2.5e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 5e6)
+
+HISTOGRAMS = {
+    "dash_callback_phase_seconds": (
+        "Time spent in each phase of a Dash callback request.",
+        LATENCY_BUCKETS,
+    ),
+    "dash_callback_response_bytes": (
+        "Size of the Dash callback response body.",
+        BYTES_BUCKETS,
+    ),
+}
+
+
+class Metrics:
+    """ Latency and payload histograms of the Dash callbacks.
+
+        Each process keeps its own histograms in memory, which costs a
+        bisect and three additions per observation. Every flush_interval
+        seconds a process writes them to shared_dir, and /metrics sums the
+        files of all the gunicorn workers, so any worker answers a scrape
+        with the totals.
+
+        Phases: those recorded inside a callback with phase(), "callback"
+        for the whole callback, "serialize" for the rest of the request
+        (mostly Dash encoding the figures to JSON) and "total".
+    """
+
+    def __init__(self, shared_dir=DEFAULT_DIR, flush_interval=5.0):
+        self.shared_dir = Path(shared_dir)
+        self.flush_interval = flush_interval
+        self.collectors = []
+        self._series = {}
+        self._lock = threading.Lock()
+        self._flushed = 0.0
+
+    def observe(self, metric, value, **labels):
+        key = (metric, tuple(sorted(labels.items())))
+        buckets = HISTOGRAMS[metric][1]
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(buckets) + 1), 0.0, 0]
+            series[0][bisect_left(buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def phase(self, callback, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("dash_callback_phase_seconds",
+                         time.perf_counter() - start,
+                         callback=callback, phase=name)
+
+    def timed_callback(self, func):
+        """ Record the duration of a callback as its "callback" phase. """
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                self.observe("dash_callback_phase_seconds", elapsed,
+                             callback=func.__name__, phase="callback")
+                if flask.has_request_context():
+                    flask.g.callback_seconds = elapsed
+
+        return wrapper
+
+    def add_collector(self, collector):
+        """ collector() returns extra lines of exposition text. """
+        self.collectors.append(collector)
+
+    def instrument(self, app):
+        """ Time every Dash callback request of app and serve /metrics. """
+        server = app.server
+        prefix = app.config.requests_pathname_prefix
+
+        def callback_name(output):
+            callback = app.callback_map.get(output, {}).get("callback")
+            return getattr(callback, "__name__", output)
+
+        @server.before_request
+        def start_timer():
+            flask.g.request_start = time.perf_counter()
+
+        @server.after_request
+        def record(response):
+            if flask.request.path != prefix + "_dash-update-component":
+                return response
+            body = flask.request.get_json(silent=True) or {}
+            name = callback_name(body.get("output", ""))
+            total = time.perf_counter() - flask.g.request_start
+            callback = flask.g.get("callback_seconds", 0.0)
+            self.observe("dash_callback_phase_seconds", total,
+                         callback=name, phase="total")
+            self.observe("dash_callback_phase_seconds", total - callback,
+                         callback=name, phase="serialize")
+            self.observe("dash_callback_response_bytes",
+                         response.calculate_content_length() or 0,
+                         callback=name)
+            self.maybe_flush()
+            return response
+
+        @server.route("/metrics")
+        def metrics():
+            return flask.Response(
+                self.render(), mimetype="text/plain; version=0.0.4"
+            )
+
+    def _snapshot(self):
+        with self._lock:
+            return [
+                [metric, list(labels), list(series[0]), series[1], series[2]]
+                for (metric, labels), series in self._series.items()
+            ]
+
+    def maybe_flush(self):
+        now = time.monotonic()
+        if now - self._flushed >= self.flush_interval:
+            self._flushed = now
+            self.flush()
+
+    def flush(self):
+        self.shared_dir.mkdir(parents=True, exist_ok=True)
+        path = self.shared_dir / f"{os.getpid()}.json"
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._snapshot()))
+        os.replace(tmp, path)
+
+    def merged(self):
+        """ Histograms of every process that flushed, with this one live. """
+        snapshots = [self._snapshot()]
+        own = f"{os.getpid()}.json"
+        for path in self.shared_dir.glob("*.json"):
+            if path.name != own:
+                try:
+                    snapshots.append(json.loads(path.read_text()))
+                except (OSError, ValueError):
+                    continue
+        merged = {}
+        for snapshot in snapshots:
+            for metric, labels, buckets, total, count in snapshot:
+                key = (metric, tuple(tuple(label) for label in labels))
+                series = merged.setdefault(key, [[0] * len(buckets), 0.0, 0])
+                series[0] = [a + b for a, b in zip(series[0], buckets)]
+                series[1] += total
+                series[2] += count
+        return merged
+
+    def render(self):
+        """ Prometheus text exposition of the merged histograms. """
+        merged = self.merged()
+        lines = []
+        for metric, (doc, bounds) in HISTOGRAMS.items():
+            lines.append(f"# HELP {metric} {doc}")
+            lines.append(f"# TYPE {metric} histogram")
+            for (name, labels), (buckets, total, count) in sorted(
+                merged.items()
+            ):
+                if name != metric:
+                    continue
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+                cumulative = 0
+                for bound, n in zip(bounds + (float("inf"),), buckets):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(
+                        f'{metric}_bucket{{{label_text},le="{le}"}} '
+                        f"{cumulative}"
+                    )
+                lines.append(f"{metric}_sum{{{label_text}}} {total}")
+                lines.append(f"{metric}_count{{{label_text}}} {count}")
+        for collector in self.collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+def figure_cache_collector(cache):
+    """ Exposition lines for the hit/miss counters of a FigureCache, per
+        callback (memoize name).
+    """
+
+    def collect():
+        stats = cache.stats()
+        hits, misses = stats["hits"], stats["misses"]
+        lookups = hits + misses
+        lines = []
+        for counter in ("hits", "misses"):
+            metric = f"figure_cache_{counter}_total"
+            lines += [
+                f"# HELP {metric} Figure cache {counter} per callback, all "
+                "workers.",
+                f"# TYPE {metric} counter",
+            ]
+            lines += [
+                f'{metric}{{callback="{callback}"}} {counts[counter]}'
+                for callback, counts in stats["callbacks"].items()
+            ]
+        return lines + [
+            "# HELP figure_cache_hit_ratio Share of lookups served from "
+            "cache.",
+            "# TYPE figure_cache_hit_ratio gauge",
+            f"figure_cache_hit_ratio {hits / lookups if lookups else 0.0}",
+            "# HELP figure_cache_entries Figures held in the cache.",
+            "# TYPE figure_cache_entries gauge",
+            f"figure_cache_entries {stats['entries']}",
+        ]
+
+    return collect
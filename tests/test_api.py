@@ -0,0 +1,105 @@
+import json
+
+import flask
+import pandas as pd
+import pytest
+
+from src.features.attendance import AttendanceCube
+from src.web.api import make_api, records_json
+
+SEASONS = [2018, 2019]
+LAST_MODIFIED = 1_560_000_000
+
+
+def games():
+    rows = []
+    for season in SEASONS:
+        for team in ["Atlanta Dream", "Seattle Storm"]:
+            for i in range(5):
+                rows.append({"team": team, "attendance": 5000 + 100 * i,
+                             "season": season, "opponent": "Other",
+                             "game_type": "Regular season"})
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def client(calls):
+    def top_players(leagues, stat, season, n, norm):
+        calls.append((tuple(leagues), stat, season, n, norm))
+        return pd.DataFrame({"Player": [f"p{i}" for i in range(n)],
+                             stat: [float(n - i) for i in range(n)]})
+
+    app = flask.Flask(__name__)
+    app.register_blueprint(make_api(
+        top_players, AttendanceCube(games()), ["PTS", "AST"], SEASONS,
+        version="v1", last_modified=LAST_MODIFIED,
+    ))
+    return app.test_client()
+
+
+def test_leaderboard_pages(client):
+    body = client.get("/api/v1/leaderboard?n=12&per_page=5&page=3").get_json()
+    assert [row["Player"] for row in body["data"]] == ["p10", "p11"]
+    assert body["meta"]["page"] == 3
+    assert body["meta"]["pages"] == 3
+    assert body["meta"]["total"] == 12
+
+
+def test_attendance_pages(client):
+    body = client.get("/api/v1/attendance?season=2019&per_page=4").get_json()
+    assert len(body["data"]) == 4
+    assert body["meta"]["total"] == 10
+    assert body["meta"]["pages"] == 3
+
+
+def test_page_past_the_last(client):
+    r = client.get("/api/v1/attendance?season=2019&per_page=4&page=4")
+    assert r.status_code == 400
+
+
+def test_etag_not_modified(client, calls):
+    first = client.get("/api/v1/leaderboard?stat=AST")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    again = client.get("/api/v1/leaderboard?stat=AST",
+                       headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert len(calls) == 1
+
+
+def test_etag_depends_on_query(client):
+    a = client.get("/api/v1/leaderboard?stat=AST").headers["ETag"]
+    b = client.get("/api/v1/leaderboard?stat=PTS").headers["ETag"]
+    assert a != b
+
+
+def test_if_modified_since(client):
+    r = client.get("/api/v1/attendance/overview",
+                   headers={"If-Modified-Since": "Sat, 01 Jan 2022 "
+                                                 "00:00:00 GMT"})
+    assert r.status_code == 304
+
+
+@pytest.mark.parametrize("query", [
+    "league=abl", "stat=XYZ", "norm=per_48", "n=0", "season=2017",
+    "per_page=501",
+])
+def test_invalid_before_conditional(client, query):
+    headers = {"If-Modified-Since": "Sat, 01 Jan 2022 00:00:00 GMT",
+               "If-None-Match": "*"}
+    r = client.get("/api/v1/leaderboard?" + query, headers=headers)
+    assert r.status_code == 400
+    assert "error" in r.get_json()
+
+
+def test_float32_values_are_exact():
+    df = pd.DataFrame({"PTS": [33.6, 0.456, 642.0]}, dtype="float32")
+    assert json.loads(records_json(df)) == [
+        {"PTS": 33.6}, {"PTS": 0.456}, {"PTS": 642.0}
+    ]
@@ -0,0 +1,56 @@
+import json
+
+import pandas as pd
+import pytest
+import requests
+
+from src.data.attendance_ingest import (
+    CHECKPOINT,
+    export_csv,
+    ingest,
+    normalize_records,
+)
+from src.data.attendance_server import DEFAULT_CSV, serve_in_thread
+
+PAGE_SIZE = 1000
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(**kwargs):
+        server, url = serve_in_thread(**kwargs)
+        servers.append(server)
+        return url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_normalize_records():
+    row = {"Team": "Atlanta Dream", "Color": "#E31837",
+           "Game Type": "Playoffs", "Attendance": 9000, "TeamAbb": "ATL",
+           "Timestamp": None}
+    record, = normalize_records([row])
+    assert record["game_type"] == "Playoffs"
+    assert record["team_abb"] == "ATL"
+    assert "color" not in record and record["state"] is None
+
+
+def test_interrupted_ingest_resumes(tmp_path, serve):
+    out = tmp_path / "attendance"
+    with pytest.raises(requests.HTTPError):
+        ingest(out, serve(fail_after=2), PAGE_SIZE)
+    checkpoint = json.loads((out / CHECKPOINT).read_text())
+    assert (checkpoint["offset"], checkpoint["done"]) == (2 * PAGE_SIZE, False)
+
+    resumed = ingest(out, serve(), PAGE_SIZE)
+    expected = pd.read_csv(DEFAULT_CSV)
+    assert resumed["done"] and resumed["rows"] == len(expected)
+    export_csv(out, tmp_path / "attendance.csv")
+    pd.testing.assert_frame_equal(
+        pd.read_csv(tmp_path / "attendance.csv"), expected
+    )
@@ -0,0 +1,51 @@
+import codecs
+
+import pytest
+
+from src.data import bbref
+from src.data.bbref import read_bbref, resolve_duplicates
+
+WNBA_HEADER = "Player,Team,Pos,G,MP,G,GS,MP,PTS"
+WNBA_ROWS = [
+    "Ann Lee</strong,SEA,G,34,1020,34,30,30.0,15.2",
+    "Bo Kim,LVA,F,20,180,20,0,9.0,3.1",
+]
+
+
+def export(tmp_path, lines, bom=True):
+    path = tmp_path / "export.csv"
+    data = "\n".join(lines).encode("utf-8") + b"\n"
+    path.write_bytes((codecs.BOM_UTF8 if bom else b"") + data)
+    return path
+
+
+def test_resolve_duplicates_keeps_the_per_game_block():
+    names = ["Player", "G", "MP", "G", "GS", "MP", "PTS"]
+    assert resolve_duplicates(names) == [
+        "Player", "_1", "_2", "G", "GS", "MP", "PTS"
+    ]
+
+
+@pytest.mark.parametrize("bom", [True, False])
+def test_reads_the_per_game_columns(tmp_path, bom):
+    path = export(tmp_path, [WNBA_HEADER, *WNBA_ROWS], bom)
+    df = read_bbref(path, ["Player", "G", "MP", "PTS"])
+    assert df.columns.tolist() == ["Player", "G", "MP", "PTS"]
+    assert df["Player"].tolist() == ["Ann Lee", "Bo Kim"]
+    assert df["G"].tolist() == [34, 20]
+    assert df["MP"].tolist() == [30.0, 9.0]
+
+
+def test_markup_split_across_reads(tmp_path, monkeypatch):
+    # every cut of "</strong" falls on a read boundary with some chunk size
+    path = export(tmp_path, ["Player,Tm", "Ann Lee</strong,SEA"], False)
+    for size in range(1, 12):
+        monkeypatch.setattr(bbref, "CHUNK_BYTES", size)
+        df = read_bbref(path, ["Player", "Team"])
+        assert df.to_dict("records") == [{"Player": "Ann Lee", "Team": "SEA"}]
+
+
+def test_missing_column(tmp_path):
+    path = export(tmp_path, [WNBA_HEADER, *WNBA_ROWS])
+    with pytest.raises(ValueError, match="TRB"):
+        read_bbref(path, ["Player", "TRB"])
@@ -0,0 +1,95 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.data import data_cleaning
+from src.data.data_cleaning import (
+    TOTAL_TEAM,
+    join_league,
+    join_splits,
+    split_trades,
+)
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+STATS = data_cleaning.column_names[5:]
+
+
+def stats_rows(rows):
+    """ A stats export of (player, team, games) rows, every other stat 1. """
+    return pd.DataFrame([
+        {"Player": player, "Team": team, "Pos": "G",
+         **{stat: 1.0 for stat in STATS}, "G": games}
+        for player, team, games in rows
+    ])
+
+
+def salary_rows(players):
+    return pd.DataFrame({
+        "Player": players,
+        "salary": [100 * (i + 1) for i in range(len(players))],
+    })
+
+
+@pytest.fixture
+def stats():
+    return stats_rows([
+        ("Ann Lee", "SEA", 30),
+        ("Bo Kim", TOTAL_TEAM, 34),
+        ("Bo Kim", "ATL", 20),
+        ("Bo Kim", "LVA", 14),
+        ("Cy Dunn", "ATL", 12),
+    ])
+
+
+def test_split_trades(stats):
+    season, splits = split_trades(stats)
+    assert season["Player"].tolist() == ["Ann Lee", "Bo Kim", "Cy Dunn"]
+    assert season.loc[season["Player"] == "Bo Kim", "Team"].item() == "TOT"
+    assert splits["Team"].tolist() == ["ATL", "LVA"]
+    assert (splits["Player"] == "Bo Kim").all()
+
+
+def test_split_trades_without_total(stats):
+    stats = stats[stats["Team"] != TOTAL_TEAM]
+    with pytest.raises(ValueError, match="Bo Kim"):
+        split_trades(stats)
+
+
+def test_split_trades_two_totals(stats):
+    stats = pd.concat([stats, stats[stats["Team"] == TOTAL_TEAM]])
+    with pytest.raises(ValueError, match="Bo Kim"):
+        split_trades(stats)
+
+
+def test_join_league_one_row_per_player(stats):
+    salary = salary_rows(["Ann Lee", "Bo Kim", "Cy Dunn"])
+    # a repeated salary row counts once
+    joined = join_league(pd.concat([salary, salary]), stats, "WNBA")
+    assert joined["Player"].tolist() == ["Ann Lee", "Bo Kim", "Cy Dunn"]
+    traded = joined.loc[joined["Player"] == "Bo Kim"]
+    assert traded["Team"].item() == TOTAL_TEAM
+    assert traded["G"].item() == 34
+    assert (joined["League"] == "WNBA").all()
+    assert list(joined.columns) == data_cleaning.column_names
+
+
+def test_join_splits(stats):
+    salary = salary_rows(["Ann Lee", "Bo Kim"])
+    splits = join_splits(salary, stats, "WNBA")
+    assert splits["Team"].tolist() == ["ATL", "LVA"]
+    assert splits["G"].sum() == 34
+    assert "salary" not in splits
+
+
+def test_shipped_tables():
+    merged = pd.read_csv(DATA_DIR / data_cleaning.OUTPUT_FILE)
+    splits = pd.read_csv(DATA_DIR / data_cleaning.SPLITS_FILE)
+    assert not merged.duplicated(["Player", "League"]).any()
+    traded = merged[merged["Team"] == TOTAL_TEAM]
+    assert set(splits["Player"]) == set(traded["Player"])
+    assert TOTAL_TEAM not in set(splits["Team"])
+    # the team splits add up to the season row
+    games = splits.groupby(["Player", "League"])["G"].sum()
+    season = traded.set_index(["Player", "League"])["G"]
+    assert games.reindex(season.index).equals(season)
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features.efficiency import percentile_ranks
+
+
+def test_percentile_ranks_like_rank_min():
+    df = pd.DataFrame({
+        "ties": [3.0, 1.0, 3.0, 2.0, 1.0, 5.0],
+        "nan": [np.nan, 4.0, 2.0, np.nan, 2.0, 8.0],
+        "same": [7.0] * 6,
+    })
+    pct, medians = percentile_ranks(df.to_numpy())
+    expected = (df.rank(method="min") - 1) / (df.count() - 1) * 100
+    # every value tied: the lowest rank of the tie
+    expected["same"] = 0.0
+    np.testing.assert_allclose(pct, expected.to_numpy(), rtol=1e-6)
+    assert pct.dtype == np.float32
+    np.testing.assert_allclose(medians, df.median().to_numpy())
+
+
+def test_percentile_ranks_single_and_no_values():
+    values = np.array([[np.nan, 4.0], [np.nan, np.nan]])
+    pct, medians = percentile_ranks(values)
+    assert np.isnan(pct[:, 0]).all()
+    assert pct[0, 1] == 100
+    assert np.isnan(medians[0]) and medians[1] == 4.0
+    empty, medians = percentile_ranks(np.empty((0, 2)))
+    assert empty.shape == (0, 2)
+    assert np.isnan(medians).all()
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_percentile_ranks_random(seed):
+    rng = np.random.default_rng(seed)
+    values = rng.integers(0, 5, size=(40, 3)).astype("float64")
+    values[rng.random(values.shape) < 0.2] = np.nan
+    df = pd.DataFrame(values)
+    pct, _ = percentile_ranks(values)
+    expected = (df.rank(method="min") - 1) / (df.count() - 1) * 100
+    np.testing.assert_allclose(pct, expected.to_numpy(), rtol=1e-6)
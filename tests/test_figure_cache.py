@@ -0,0 +1,126 @@
+import sqlite3
+
+import plotly.graph_objects as go
+import pytest
+
+from src.visualization.figure_cache import FigureCache
+from src.web.metrics import figure_cache_collector
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return FigureCache(str(tmp_path / "figures.sqlite"), max_entries=2,
+                       version="v1")
+
+
+def test_memoize_builds_once(cache):
+    calls = []
+
+    @cache.memoize("bars")
+    def build(n):
+        calls.append(n)
+        return go.Figure(go.Bar(y=[n]))
+
+    first = build(3)
+    second = build(3)
+    assert calls == [3]
+    assert isinstance(first, go.Figure)
+    assert second["data"][0]["y"] == [3]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_counts_per_callback(cache):
+    @cache.memoize("bars")
+    def bars(n):
+        return go.Figure(go.Bar(y=[n]))
+
+    @cache.memoize("lines")
+    def lines(n):
+        return go.Figure(go.Scatter(y=[n]))
+
+    bars(1), bars(1), bars(2), lines(1)
+    assert cache.stats()["callbacks"] == {
+        "bars": {"hits": 1, "misses": 2},
+        "lines": {"hits": 0, "misses": 1},
+    }
+    exposition = figure_cache_collector(cache)()
+    assert 'figure_cache_hits_total{callback="bars"} 1' in exposition
+    assert 'figure_cache_misses_total{callback="lines"} 1' in exposition
+    assert "figure_cache_hit_ratio 0.25" in exposition
+
+
+def test_memoize_tuple(cache):
+    @cache.memoize("pair")
+    def build():
+        return go.Figure(), go.Figure()
+
+    build()
+    assert len(build()) == 2
+
+
+def test_key_includes_version(tmp_path):
+    path = str(tmp_path / "figures.sqlite")
+    assert (FigureCache(path, version="a").key("f", 1)
+            != FigureCache(path, version="b").key("f", 1))
+
+
+def test_lookups_do_not_write(cache):
+    cache.set("a", "1")
+    cache.flush()
+    changes = cache._connect().total_changes
+    assert cache.get("a") == "1"
+    assert cache.get("missing") is None
+    assert cache._connect().total_changes == changes
+    assert cache.stats()["hits"] == 1
+
+
+def test_evicts_least_recently_used(cache):
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.flush()
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.stats()["entries"] == 2
+
+
+def test_sqlite_errors_rebuild(cache, monkeypatch):
+    def locked():
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(cache, "_connect", locked)
+    calls = []
+
+    @cache.memoize("bars")
+    def build():
+        calls.append(1)
+        return go.Figure()
+
+    build()
+    build()
+    assert len(calls) == 2
+    monkeypatch.undo()
+    assert cache.stats()["misses"] == 2
+
+
+def test_clear(cache):
+    cache.set("a", "1")
+    cache.get("a")
+    cache.clear()
+    stats = cache.stats()
+    assert (stats["hits"], stats["entries"]) == (0, 0)
+    assert stats["callbacks"] == {}
+
+
+def test_failed_flush_keeps_counts(cache, monkeypatch):
+    cache.get("missing")
+
+    def locked():
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(cache, "_connect", locked)
+    cache.flush()
+    monkeypatch.undo()
+    assert cache.stats()["misses"] == 1
@@ -0,0 +1,37 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from src.visualization.figures import attendance_figure, efficiency_figure
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+
+
+def players():
+    return pd.DataFrame({
+        "Player": ["Ann Lee", "Bo Kim", "Cy Dunn"],
+        "Team": ["SEA", "LAL", "ATL"],
+        "League": pd.Categorical(["WNBA", "NBA", "WNBA"]),
+        "PTS": pd.Series([11.4, 33.6, 0.456], dtype="float32"),
+        "salary": pd.Series([100, 200, 300], dtype="int32"),
+        "percentile": [50.0, 100.0, 0.0],
+        "salary_pct": [0.0, 100.0, 100.0],
+    })
+
+
+def test_efficiency_hover_without_float_noise():
+    fig = efficiency_figure(players(), "PTS", {"WNBA": 10.0, "NBA": 5.0})
+    sent = json.loads(fig.to_json())["data"]
+    assert [trace["name"] for trace in sent] == ["WNBA", "NBA"]
+    assert [row[2] for row in sent[0]["customdata"]] == [11.4, 0.456]
+    assert sent[1]["customdata"][0] == ["Bo Kim", "LAL", 33.6, 200]
+
+
+def test_attendance_webgl_for_every_game_of_a_season():
+    games = pd.read_csv(DATA_DIR / "wnba_attendance.csv")
+    for _, season_games in games.groupby("season"):
+        fig = attendance_figure(season_games)
+        assert fig.data[0].type == "scattergl"
+        for _, team_games in season_games.groupby("team"):
+            assert attendance_figure(team_games).data[0].type == "bar"
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from src.features.leaderboard import LeaderboardIndex, league_positions
+
+
+def players():
+    return pd.DataFrame({
+        "Player": ["A", "B", "C", "D", "E", "F"],
+        "League": pd.Categorical(["WNBA", "NBA", "WNBA", "WNBA", "NBA",
+                                  "WNBA"]),
+        "Team": ["SEA", "LAL", "ATL", "LVA", "BOS", "SEA"],
+        "Pos": ["G", "F", "C", "G", "F", "C"],
+        "salary": [1, 2, 3, 4, 5, 6],
+        "PTS": [10.0, 30.0, np.nan, 20.0, 30.0, 20.0],
+    })
+
+
+def test_top_descending_ties_in_table_order_nan_last():
+    index = LeaderboardIndex(players(), ["PTS"])
+    assert index.top("WNBA", "PTS", 10)["Player"].tolist() == [
+        "D", "F", "A", "C"
+    ]
+    assert index.top("WNBA", "PTS", 2)["Player"].tolist() == ["D", "F"]
+    # a tie at the top keeps the table order
+    assert index.top("NBA", "PTS", 1)["Player"].tolist() == ["B"]
+
+
+def test_matches_sort_values():
+    df = players()
+    index = LeaderboardIndex(df, ["PTS"])
+    for league in ["WNBA", "NBA"]:
+        expected = df[df["League"] == league].sort_values(
+            "PTS", ascending=False, kind="stable"
+        )
+        assert index.top(league, "PTS", 10)["Player"].tolist() == (
+            expected["Player"].tolist()
+        )
+
+
+def test_top_leagues_stacked_in_order():
+    index = LeaderboardIndex(players(), ["PTS"])
+    top = index.top_leagues(["NBA", "WNBA"], "PTS", 2)
+    assert top["Player"].tolist() == ["B", "E", "D", "F"]
+    assert top.index.tolist() == [0, 1, 2, 3]
+
+
+def test_league_positions_categorical_and_text():
+    league = players()["League"]
+    assert league_positions(league, "NBA").tolist() == [1, 4]
+    assert league_positions(league.astype(str), "NBA").tolist() == [1, 4]
+    assert league_positions(league, "ABL").tolist() == []
@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+
+from src.data import matching
+from src.data.matching import (
+    CONTAINED_SCORE,
+    FUZZY_THRESHOLD,
+    match_players,
+    normalize_names,
+    similarity,
+)
+
+
+def test_normalize_names():
+    keys = normalize_names(["Álex Abrines", "Wendell Carter Jr.",
+                            "D'Angelo Russell"])
+    assert keys.tolist() == ["alex abrines", "wendell carter",
+                             "dangelo russell"]
+
+
+@pytest.mark.parametrize("short, long", [
+    ("luc mbah", "luc mbah a moute"),
+    ("elena donne", "elena delle donne"),
+])
+def test_contained_name(short, long):
+    assert similarity(short, long) == CONTAINED_SCORE
+    assert similarity(long, short) == CONTAINED_SCORE
+
+
+def test_contained_needs_first_token_and_order():
+    assert similarity("luc", "luc mbah a moute") < FUZZY_THRESHOLD
+    assert similarity("mbah luc", "luc mbah a moute") < FUZZY_THRESHOLD
+    assert similarity("moute luc", "luc mbah a moute") == 0.0
+
+
+def test_match_players_contained():
+    report = match_players(["Luc Mbah"], ["Luc Mbah a Moute", "Luke Kornet"])
+    row = report.iloc[0]
+    assert (row["match"], row["method"]) == ("Luc Mbah a Moute", "fuzzy")
+    assert row["score"] == CONTAINED_SCORE
+
+
+def test_fuzzy_compares_blocked_pairs_only(monkeypatch):
+    compared = []
+
+    def spy(a, b):
+        compared.append((a, b))
+        return 0.0
+
+    monkeypatch.setattr(matching, "similarity", spy)
+    matching._fuzzy(["anna smith"], ["anna jones", "bo smith", "cy wu"], 0.9)
+    assert sorted(compared) == [("anna smith", "anna jones"),
+                                ("anna smith", "bo smith")]
+
+
+def test_threshold():
+    a, b = "jonas valanciunas", "jonas valanciunus"
+    score = similarity(a, b)
+    assert FUZZY_THRESHOLD <= score < 1
+    assert match_players([a], [b])["method"].item() == "fuzzy"
+    report = match_players([a], [b], threshold=score + 0.01)
+    assert report["method"].item() == "unmatched"
+    assert pd.isna(report["match"].item())
+
+
+def test_exact_and_normalized():
+    report = match_players(["Kyle Lowry", "Wendell Carter"],
+                           ["Kyle Lowry", "Wendell Carter Jr."])
+    assert report["method"].tolist() == ["exact", "normalized"]
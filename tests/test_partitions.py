@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+
+from src.data.partitions import PartitionStore, write_partitions
+
+
+@pytest.fixture
+def root(tmp_path):
+    for season in [2018, 2019]:
+        df = pd.DataFrame({
+            "Player": ["A", "B"],
+            "League": ["WNBA", "NBA"],
+            "PTS": [float(season), 1.0],
+        })
+        write_partitions(df, tmp_path, "players", season)
+    return tmp_path
+
+
+def test_lists_partitions(root):
+    store = PartitionStore(root)
+    assert store.leagues("players") == ["NBA", "WNBA"]
+    assert store.seasons("players") == [2018, 2019]
+    assert store.has("players", "WNBA", 2019)
+    assert not store.has("players", "WNBA", 2020)
+    with pytest.raises(KeyError):
+        store.get("players", "WNBA", 2020)
+
+
+def test_evicts_least_recently_used(root):
+    store = PartitionStore(root, max_partitions=2)
+    a = ("players", "WNBA", 2018)
+    b = ("players", "WNBA", 2019)
+    c = ("players", "NBA", 2019)
+    first = store.get(*a)
+    assert first["PTS"].tolist() == [2018.0]
+    store.get(*b)
+    assert store.get(*a) is first
+    store.get(*c)
+    assert store.cached() == [a, c]
+    assert store.get(*b)["PTS"].tolist() == [2019.0]
+    assert store.cached() == [c, b]
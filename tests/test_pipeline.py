@@ -0,0 +1,54 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from src.data import data_cleaning
+from src.data.pipeline import run_pipeline
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+OUTPUTS = [data_cleaning.OUTPUT_FILE, data_cleaning.CUBE_FILE,
+           data_cleaning.SPLITS_FILE]
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    input_dir, output_dir = tmp_path / "input", tmp_path / "output"
+    input_dir.mkdir()
+    for filename in [*data_cleaning.RAW_FILES.values(),
+                     data_cleaning.LEAGUE_SUMMARY_FILE]:
+        shutil.copy(DATA_DIR / filename, input_dir)
+    return input_dir, output_dir
+
+
+def test_each_stage_once_per_run(dirs):
+    cache = run_pipeline(*dirs)
+    assert len(cache.ran) == len(set(cache.ran))
+    assert cache.reused == []
+    for filename in OUTPUTS:
+        assert (dirs[1] / filename).read_bytes() == (
+            DATA_DIR / filename
+        ).read_bytes()
+
+
+def test_changed_input_reruns_its_stages(dirs):
+    input_dir, output_dir = dirs
+    run_pipeline(input_dir, output_dir)
+    with open(input_dir / data_cleaning.RAW_FILES["wnba_totals"], "a") as f:
+        f.write("\n")
+    cache = run_pipeline(input_dir, output_dir)
+    assert sorted(cache.ran) == ["cube", "wnba_totals_joined"]
+    assert sorted(cache.reused) == [
+        "merged", "nba_totals_joined", "splits", "wnba_matches",
+        "wnba_salary_names",
+    ]
+
+
+def test_rebuilds_a_deleted_store(dirs):
+    input_dir, output_dir = dirs
+    run_pipeline(input_dir, output_dir)
+    assert run_pipeline(input_dir, output_dir).reused == []
+    shutil.rmtree(output_dir / "store")
+    cache = run_pipeline(input_dir, output_dir)
+    assert cache.ran == []
+    assert (output_dir / "store" / "partitions").exists()
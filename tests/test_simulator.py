@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features.simulator import RATIO_GRID, SalarySimulator
+
+REVENUE = 60_000_000.0
+STATS = ["PTS"]
+
+
+def simulator():
+    wnba = pd.DataFrame({
+        "Player": ["A", "B", "C", "D"],
+        "Team": ["SEA", "LVA", "ATL", "SEA"],
+        "salary": [50_000, 100_000, 150_000, 200_000],
+        "PTS": [10.0, 30.0, np.nan, 0.0],
+    })
+    nba = pd.DataFrame({"salary": [1e6, 2e6, 3e6]})
+    return SalarySimulator(wnba, nba, REVENUE, STATS)
+
+
+@pytest.mark.parametrize("basis", ["salary", "PTS"])
+@pytest.mark.parametrize("ratio", [0.05, 0.2, 0.6])
+def test_pool_is_conserved(basis, ratio):
+    salaries = simulator().salaries(basis, ratio)
+    assert salaries.sum() == pytest.approx(REVENUE * ratio, rel=1e-6)
+
+
+def test_split_in_proportion_to_basis():
+    salaries = simulator().salaries("PTS", 0.2)
+    # missing and zero stats get no share of the pool
+    assert salaries.tolist() == pytest.approx(
+        [0.25 * REVENUE * 0.2, 0.75 * REVENUE * 0.2, 0, 0], rel=1e-6
+    )
+
+
+def test_revenue_scales_linearly():
+    sim = simulator()
+    base = sim.salaries("salary", 0.2)
+    np.testing.assert_array_equal(sim.salaries("salary", 0.2, REVENUE), base)
+    doubled = sim.salaries("salary", 0.2, 2 * REVENUE)
+    assert doubled.sum() == pytest.approx(2 * REVENUE * 0.2, rel=1e-6)
+    np.testing.assert_allclose(doubled, 2 * base, rtol=1e-6)
+
+
+def test_ratio_snaps_to_grid():
+    sim = simulator()
+    assert sim.ratios[sim.ratio_index(0.2013)] == 0.2
+    assert sim.ratio_index(0.0) == 0
+    assert sim.ratio_index(0.9) == len(RATIO_GRID) - 1
+    np.testing.assert_array_equal(
+        sim.salaries("salary", 0.2013), sim.salaries("salary", 0.2)
+    )
+
+
+def test_frame_lowest_first_with_nba_equivalent():
+    frame = simulator().frame("salary", 0.2)
+    assert frame["Player"].tolist() == ["A", "B", "C", "D"]
+    assert frame["percentile"].tolist() == pytest.approx([0, 100 / 3,
+                                                          200 / 3, 100])
+    assert frame["nba"].iloc[[0, -1]].tolist() == [1e6, 3e6]
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features.stats_cube import (
+    NORMALIZATIONS,
+    build_cube,
+    cube_column,
+    cube_frame,
+    league_pace,
+    normalized,
+)
+
+SUMMARY = pd.DataFrame({
+    "league": ["NBA", "WNBA", "NBA"],
+    "season": [2019, 2019, 2018],
+    "pace": [100.0, 80.0, 97.3],
+})
+PACE = {"NBA": 100.0, "WNBA": 80.0}
+STATS = ["G", "MP", "PTS", "FG%"]
+
+
+def totals():
+    return pd.DataFrame({
+        "Player": ["A", "B", "C"],
+        "League": ["NBA", "WNBA", "NBA"],
+        "Team": ["LAL", "SEA", "TOT"],
+        "G": [10, 20, 0],
+        "MP": [360.0, 400.0, 0.0],
+        "PTS": [200.0, 300.0, 0.0],
+        "FG%": [0.5, 0.45, np.nan],
+    })
+
+
+def test_league_pace_of_season():
+    assert league_pace(SUMMARY, 2019) == PACE
+    assert league_pace(SUMMARY, 2018) == {"NBA": 97.3}
+
+
+def test_league_pace_missing_season():
+    with pytest.raises(ValueError, match="2020"):
+        league_pace(SUMMARY, 2020)
+
+
+def test_normalizations():
+    df = totals()
+    cube = build_cube(df, STATS, df["League"], PACE)
+    pts = list(STATS).index("PTS")
+    per_game, total, per_36, per_100 = cube[0, pts]
+    assert per_game == pytest.approx(20.0)
+    assert total == pytest.approx(200.0)
+    assert per_36 == pytest.approx(20.0)
+    # 360 NBA minutes at 100 possessions per 48 minutes are 750 possessions
+    assert per_100 == pytest.approx(26.7, abs=0.05)
+    # 400 WNBA minutes at 80 possessions per 40 minutes are 800 possessions
+    assert cube[1, pts, 3] == pytest.approx(37.5, abs=0.05)
+
+
+def test_pace_scales_per_100():
+    df = totals()
+    slow = build_cube(df, STATS, df["League"], {"NBA": 50.0, "WNBA": 80.0})
+    fast = build_cube(df, STATS, df["League"], PACE)
+    pts = list(STATS).index("PTS")
+    # half the possessions: 200 points per 375 possessions
+    assert slow[0, pts, 3] == pytest.approx(53.3, abs=0.05)
+    assert fast[0, pts, 3] == pytest.approx(26.7, abs=0.05)
+    assert slow[1, pts, 3] == fast[1, pts, 3]
+
+
+def test_unscaled_and_no_minutes():
+    df = totals()
+    cube = build_cube(df, STATS, df["League"], PACE)
+    fg = list(STATS).index("FG%")
+    assert (cube[0, fg] == np.float32(0.5)).all()
+    # no games or minutes: the rates are missing rather than infinite
+    per_game, total, per_36, per_100 = cube[2, list(STATS).index("PTS")]
+    assert total == 0
+    assert np.isnan([per_game, per_36, per_100]).all()
+    assert cube.dtype == np.float32
+
+
+def test_missing_league_pace():
+    df = totals()
+    with pytest.raises(ValueError, match="WNBA"):
+        build_cube(df, STATS, df["League"], {"NBA": 100.0})
+
+
+def test_cube_frame_columns_and_alignment():
+    df = totals()
+    frame = cube_frame(df, df, STATS, PACE)
+    assert list(frame.columns[:3]) == ["Player", "League", "Team"]
+    assert cube_column("PTS", "per_36") in frame
+    assert len(frame.columns) == 3 + len(STATS) * len(NORMALIZATIONS)
+    with pytest.raises(ValueError, match="aligned"):
+        cube_frame(df, df.iloc[::-1], STATS, PACE)
+
+
+def test_normalized():
+    df = totals()
+    frame = cube_frame(df, df, STATS, PACE)
+    scaled = normalized(frame, STATS, "per_100")
+    assert "FG%" not in scaled and "G" not in scaled
+    assert scaled["PTS"].equals(frame["PTS/per_100"])
+    with pytest.raises(ValueError):
+        normalized(frame, STATS, "per_48")
+
+
+def test_minutes_per_game_in_rate_views():
+    df = totals()
+    cube = build_cube(df, STATS, df["League"], PACE)
+    mp = list(STATS).index("MP")
+    # 360 minutes in 10 games
+    assert cube[0, mp].tolist() == [36.0, 360.0, 36.0, 36.0]
+    assert cube[1, mp].tolist() == [20.0, 400.0, 20.0, 20.0]
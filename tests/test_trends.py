@@ -0,0 +1,113 @@
+import pandas as pd
+import pytest
+
+from src.data.columnar import load_trends, store_trends
+from src.features.trends import (
+    ALL_GAME_TYPES,
+    ALL_VENUES,
+    LEAGUE,
+    AttendanceTrends,
+    attendance_trends,
+    venue_games,
+)
+
+
+def games():
+    rows = [
+        # season, team, opponent, game type, attendance
+        (2018, "Dream", "Storm", "Regular season", 4000),
+        (2018, "Storm", "Dream", "Regular season", 8000),
+        (2019, "Dream", "Storm", "Regular season", 5000),
+        (2019, "Dream", "Storm", "Playoffs", 7000),
+        (2019, "Storm", "Dream", "Regular season", 9000),
+        (2019, "Dream", "Storm", "All star", 15000),
+        (2021, "Dream", "Storm", "Regular season", 3000),
+    ]
+    return pd.DataFrame(rows, columns=["season", "team", "opponent",
+                                       "game_type", "attendance"])
+
+
+@pytest.fixture
+def trends():
+    return attendance_trends(games(), window=2)
+
+
+def row(trends, team, venue, game_type, season):
+    rows = trends[
+        (trends["team"] == team) & (trends["venue"] == venue)
+        & (trends["game_type"] == game_type) & (trends["season"] == season)
+    ]
+    assert len(rows) == 1
+    return rows.iloc[0]
+
+
+def test_venue_games_twice_without_all_star():
+    long = venue_games(games())
+    assert len(long) == 2 * 6
+    assert 15000 not in set(long["attendance"])
+    away = long[long["venue"] == "away"]
+    assert set(away["team"]) == {"Dream", "Storm"}
+
+
+def test_team_venue_rollup(trends):
+    home = row(trends, "Dream", "home", ALL_GAME_TYPES, 2019)
+    assert (home["games"], home["total"]) == (2, 12000)
+    everywhere = row(trends, "Dream", ALL_VENUES, ALL_GAME_TYPES, 2019)
+    assert (everywhere["games"], everywhere["total"]) == (3, 21000)
+    assert everywhere["mean"] == 7000
+
+
+def test_league_counts_each_game_once(trends):
+    league = row(trends, LEAGUE, ALL_VENUES, ALL_GAME_TYPES, 2019)
+    assert (league["games"], league["total"]) == (3, 21000)
+    season = row(trends, LEAGUE, ALL_VENUES, "Regular season", 2019)
+    assert season["total"] == 14000
+
+
+def test_rolling_and_yoy(trends):
+    dream = trends[
+        (trends["team"] == "Dream") & (trends["venue"] == "home")
+        & (trends["game_type"] == "Regular season")
+    ]
+    assert dream["season"].tolist() == [2018, 2019, 2021]
+    assert dream["rolling_mean"].tolist() == [4000, 4500, 4000]
+    # 2021 follows 2019, there was no 2020 season
+    assert pd.isna(dream["yoy_change"].iloc[0])
+    assert dream["yoy_change"].iloc[1:].tolist() == pytest.approx(
+        [0.25, -0.4]
+    )
+
+
+def test_series_lookup(trends):
+    series = AttendanceTrends(trends)
+    assert series.teams[0] == LEAGUE
+    assert series.game_types[0] == ALL_GAME_TYPES
+    assert series.series("Dream", "home", "Playoffs")["season"].tolist() == [
+        2019
+    ]
+    assert series.series("Nobody").empty
+
+
+def test_store_and_load(tmp_path):
+    data_dir, store_dir = tmp_path / "data", tmp_path / "store"
+    data_dir.mkdir()
+    games().to_csv(data_dir / "wnba_attendance.csv", index=False)
+    stored = store_trends(games(), data_dir, store_dir)
+    (store_dir / "attendance_trends" / "0-old").mkdir()
+    store_trends(games(), data_dir, store_dir)
+    # older keys are deleted
+    assert len(list((store_dir / "attendance_trends").iterdir())) == 1
+    loaded = load_trends(data_dir, store_dir)
+    pd.testing.assert_frame_equal(
+        loaded[["season", "games", "total"]].astype("int64"),
+        stored[["season", "games", "total"]].astype("int64"),
+    )
+
+
+def test_load_never_writes(tmp_path):
+    data_dir, store_dir = tmp_path / "data", tmp_path / "store"
+    data_dir.mkdir()
+    games().to_csv(data_dir / "wnba_attendance.csv", index=False)
+    trends = load_trends(data_dir, store_dir)
+    assert not store_dir.exists()
+    assert len(trends) == len(attendance_trends(games()))